@@ -15,32 +15,72 @@ Usage:
     # Target a specific session (defaults to c1d607d3)
     ./venv/bin/python scripts/cleanup_duplicate_topics.py --session d1614fc0
 
+    # Clean up several sessions with a single pass over the log
+    ./venv/bin/python scripts/cleanup_duplicate_topics.py --session d1614fc0 c1d607d3
+
     # Use a different log file
     ./venv/bin/python scripts/cleanup_duplicate_topics.py --log /path/to/log
+
+    # Only scan the last 64 MiB of a large log (older duplicates are skipped)
+    ./venv/bin/python scripts/cleanup_duplicate_topics.py --tail-bytes 67108864
 """
 
 import argparse
 import asyncio
+import functools
 import json
 import logging
+import mmap
+import os
 import re
 import sys
-import time
+from collections import defaultdict
+from datetime import timedelta
 from pathlib import Path
 
-import yaml
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
 
-# Telegram rate limit: ~30 requests/second, but be conservative
-RATE_LIMIT_DELAY = 0.1  # 100ms between deletions
+# Telegram rate limit: ~30 requests/second bot-wide, but stay below it
+MAX_DELETES_PER_SECOND = 25
+# Telegram also rate-limits per group chat (~20/minute)
+PER_CHAT_DELETES_PER_MINUTE = 20
+MAX_CONCURRENT_DELETES = 10
+# Transient network failures are retried with exponential backoff
+MAX_NETWORK_RETRIES = 3
+NETWORK_BACKOFF_SECONDS = 1.0
+# Enough pooled connections that concurrent deletes never wait on the pool
+BOT_CONNECTION_POOL_SIZE = 20
+
+# Cheap substring check run before the regex so non-matching lines (the vast
+# majority of the log) never reach the regex engine.
+TOPIC_LINE_MARKER = b"Auto-created topic for session "
+LOG_READ_BUFFER = 1 << 20
+DEFAULT_TAIL_BYTES = 0  # Full scan; a tail window would miss older duplicates
+# Below this many bytes, worker startup costs more than the scan itself
+PARALLEL_SCAN_MIN_BYTES = 16 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=8)
+def _topic_pattern(session_ids: tuple[str, ...]) -> re.Pattern[bytes]:
+    """Compiled bytes pattern matching topic-creation lines for any of the sessions.
+
+    Group 1 is the session id, group 2 the chat id, group 3 the thread id.
+    """
+    alternation = b"|".join(re.escape(sid.encode()) for sid in session_ids)
+    return re.compile(
+        TOPIC_LINE_MARKER
+        + b"(" + alternation + b")"
+        + rb": chat=(-?\d+), thread=(\d+)"
+    )
 
 
 def load_config() -> dict:
+    import yaml
+
     config_path = Path(__file__).parent.parent / "config.yaml"
     if not config_path.exists():
         logger.error(f"Config not found: {config_path}")
@@ -49,92 +89,376 @@ def load_config() -> dict:
         return yaml.safe_load(f) or {}
 
 
-def extract_thread_ids(log_path: str, session_id: str) -> list[tuple[int, int]]:
-    """Extract (chat_id, thread_id) pairs from log for a given session.
+def _parse_topic_line(line: bytes) -> tuple[str, int, int] | None:
+    """Parse `<marker><session>: chat=<chat>, thread=<thread>` without the regex engine.
 
     Returns:
-        List of (chat_id, thread_id) tuples, ordered by appearance in log.
+        (session_id, chat_id, thread_id) or None if the line is not a match
     """
-    pattern = re.compile(
-        rf"Auto-created topic for session {re.escape(session_id)}: "
-        rf"chat=(-?\d+), thread=(\d+)"
-    )
-    results = []
-    with open(log_path) as f:
-        for line in f:
-            m = pattern.search(line)
-            if m:
-                chat_id = int(m.group(1))
-                thread_id = int(m.group(2))
-                results.append((chat_id, thread_id))
-    return results
+    idx = line.find(TOPIC_LINE_MARKER)
+    if idx < 0:
+        return None
+    session_id, sep, rest = line[idx + len(TOPIC_LINE_MARKER):].partition(b": chat=")
+    if not sep:
+        return None
+    chat_str, sep, rest = rest.partition(b", thread=")
+    if not sep:
+        return None
+    # Like the regex, take the leading digits and ignore anything after them
+    digits = len(rest) - len(rest.lstrip(b"0123456789"))
+    if not digits:
+        return None
+    try:
+        return session_id.decode(), int(chat_str), int(rest[:digits])
+    except ValueError:
+        return None
+
+
+def _scan_range(
+    log_path: str,
+    session_ids: tuple[str, ...],
+    start: int,
+    end: int,
+    use_regex: bool = False,
+) -> list[tuple[str, int, int]]:
+    """Scan bytes [start, end) of the log via mmap (runs in a worker process)."""
+    with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if use_regex:
+            pattern = _topic_pattern(session_ids)
+            return [
+                (m.group(1).decode(), int(m.group(2)), int(m.group(3)))
+                for m in pattern.finditer(mm, start, end)
+            ]
+        matches = []
+        pos = mm.find(TOPIC_LINE_MARKER, start, end)
+        while pos != -1:
+            line_end = mm.find(b"\n", pos, end)
+            if line_end == -1:
+                line_end = end
+            match = _parse_topic_line(mm[pos:line_end])
+            if match and match[0] in session_ids:
+                matches.append(match)
+            pos = mm.find(TOPIC_LINE_MARKER, line_end, end)
+        return matches
+
+
+def _split_on_lines(log_path: str, start: int, end: int, parts: int) -> list[tuple[int, int]]:
+    """Split [start, end) into ~equal byte ranges whose edges fall on line starts."""
+    step = (end - start) // parts
+    with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        edges = [start]
+        for i in range(1, parts):
+            nl = mm.find(b"\n", start + i * step, end)
+            edge = end if nl == -1 else nl + 1
+            if edge > edges[-1]:
+                edges.append(edge)
+    if edges[-1] != end:
+        edges.append(end)
+    return list(zip(edges, edges[1:]))
+
+
+def _scan_parallel(
+    log_path: str,
+    session_ids: tuple[str, ...],
+    start: int,
+    end: int,
+    workers: int,
+    use_regex: bool = False,
+) -> list[tuple[str, int, int]]:
+    """Scan [start, end) across worker processes, preserving log order."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = _split_on_lines(log_path, start, end, workers)
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        chunks = pool.map(
+            _scan_range,
+            [log_path] * len(ranges),
+            [session_ids] * len(ranges),
+            [s for s, _ in ranges],
+            [e for _, e in ranges],
+            [use_regex] * len(ranges),
+        )
+        return [match for chunk in chunks for match in chunk]
+
+
+def extract_thread_ids_by_session(
+    log_path: str,
+    session_ids: list[str],
+    tail_bytes: int = 0,
+    workers: int = 1,
+    use_regex: bool = False,
+) -> dict[str, list[tuple[int, int]]]:
+    """Extract unique (chat_id, thread_id) pairs for several sessions in one pass.
+
+    The crash loop logs the same topic many times, so pairs are deduplicated
+    as they are found. Thread IDs are scoped per chat, so the key is the
+    full (chat_id, thread_id) tuple.
+
+    Args:
+        log_path: Path to the session manager log
+        session_ids: Sessions whose topic-creation lines to collect
+        tail_bytes: Only scan the last N bytes of the log (0 scans the whole file)
+        workers: Processes to split large scans across (small scans stay in-process)
+        use_regex: Match lines with the regex instead of the byte splitter
+
+    Returns:
+        Mapping of session_id to (chat_id, thread_id) tuples, ordered by first
+        appearance in log. Every requested session has an entry.
+    """
+    wanted = tuple(dict.fromkeys(session_ids))
+    results: dict[str, dict[tuple[int, int], None]] = {sid: {} for sid in wanted}
+    with open(log_path, "rb", buffering=LOG_READ_BUFFER) as f:
+        size = os.fstat(f.fileno()).st_size
+        if 0 < tail_bytes < size:
+            # Back up one byte so a window starting exactly on a line start
+            # keeps that line; otherwise discard the partial line we land in.
+            f.seek(size - tail_bytes - 1)
+            f.readline()
+        start = f.tell()
+        if start:
+            logger.info(f"Scanning last {size - start} bytes of {log_path}; skipped the first {start} bytes")
+        if workers > 1 and size - start >= PARALLEL_SCAN_MIN_BYTES:
+            for sid, chat_id, thread_id in _scan_parallel(log_path, wanted, start, size, workers, use_regex):
+                results[sid][(chat_id, thread_id)] = None
+        elif use_regex:
+            pattern = _topic_pattern(wanted)
+            for line in f:
+                if TOPIC_LINE_MARKER not in line:
+                    continue
+                m = pattern.search(line)
+                if m:
+                    results[m.group(1).decode()][(int(m.group(2)), int(m.group(3)))] = None
+        else:
+            for line in f:
+                if TOPIC_LINE_MARKER not in line:
+                    continue
+                match = _parse_topic_line(line)
+                if match and match[0] in results:
+                    results[match[0]][(match[1], match[2])] = None
+    return {sid: list(pairs) for sid, pairs in results.items()}
+
+
+def extract_thread_ids(
+    log_path: str,
+    session_id: str,
+    tail_bytes: int = 0,
+    workers: int = 1,
+    use_regex: bool = False,
+) -> list[tuple[int, int]]:
+    """Extract unique (chat_id, thread_id) pairs from log for a given session.
+
+    Returns:
+        List of (chat_id, thread_id) tuples, ordered by first appearance in log.
+    """
+    return extract_thread_ids_by_session(
+        log_path,
+        [session_id],
+        tail_bytes=tail_bytes,
+        workers=workers,
+        use_regex=use_regex,
+    )[session_id]
+
+
+def _iter_state_sessions(path: Path):
+    """Yield session dicts from the state file, streaming when ijson is installed."""
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+    if ijson is None:
+        with open(path) as f:
+            data = json.load(f)
+        yield from data.get("sessions", [])
+        return
+
+    with open(path, "rb") as f:
+        yield from ijson.items(f, "sessions.item")
 
 
 def get_current_topic(session_id: str, state_file: str) -> tuple[int, int] | None:
-    """Read the currently-persisted (chat_id, thread_id) for a session."""
+    """Read the currently-persisted (chat_id, thread_id) for a session.
+
+    Stops reading at the first matching session, so with ijson available
+    only the prefix of the state file up to that entry is parsed.
+    """
     path = Path(state_file)
     if not path.exists():
         return None
-    with open(path) as f:
-        data = json.load(f)
-    for s in data.get("sessions", []):
+    for s in _iter_state_sessions(path):
         if s.get("id") == session_id:
             chat_id = s.get("telegram_chat_id")
             thread_id = s.get("telegram_thread_id")
             if chat_id and thread_id:
-                return (chat_id, thread_id)
+                return (int(chat_id), int(thread_id))
             return None
     return None
 
 
+class RateLimiter:
+    """Leaky-bucket limiter: at most `max_rate` acquisitions per `time_period` seconds.
+
+    Bursts up to `max_rate` pass immediately; after that callers wait for
+    capacity to drain, in arrival order.
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self._max_rate = max_rate
+        self._drain_per_second = max_rate / time_period
+        self._level = 0.0
+        self._last_check = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                if self._level:
+                    drained = (now - self._last_check) * self._drain_per_second
+                    self._level = max(0.0, self._level - drained)
+                self._last_check = now
+                if self._level + 1 <= self._max_rate:
+                    self._level += 1
+                    return
+                await asyncio.sleep((self._level + 1 - self._max_rate) / self._drain_per_second)
+
+
+def _retry_after_seconds(retry_after: int | float | timedelta) -> float:
+    """Normalize RetryAfter.retry_after (int in older PTB, timedelta in newer)."""
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+def _build_bot(token: str):
+    """Create a Bot whose HTTP client is shared by every deletion.
+
+    Prefers HTTP/2 so concurrent deletes multiplex over one TLS connection;
+    without the h2 extra (python-telegram-bot[http2]) falls back to a pooled
+    HTTP/1.1 keep-alive client.
+    """
+    from telegram import Bot
+    from telegram.request import HTTPXRequest
+
+    try:
+        request = HTTPXRequest(connection_pool_size=BOT_CONNECTION_POOL_SIZE, http_version="2")
+    except RuntimeError:
+        request = HTTPXRequest(connection_pool_size=BOT_CONNECTION_POOL_SIZE)
+    return Bot(token=token, request=request)
+
+
+def dry_run_topics(to_delete: list[tuple[int, int]]) -> tuple[int, int]:
+    """Log what --execute would delete. Synchronous: no event loop needed.
+
+    Returns:
+        (would_delete_count, 0)
+    """
+    for i, (chat_id, thread_id) in enumerate(to_delete, 1):
+        logger.info(f"[DRY RUN] Would delete topic {thread_id} in chat {chat_id} ({i}/{len(to_delete)})")
+    return len(to_delete), 0
+
+
 async def delete_topics(
     token: str,
     to_delete: list[tuple[int, int]],
-    execute: bool,
+    per_chat_per_minute: float | None = None,
 ) -> tuple[int, int]:
     """Delete forum topics via the Telegram Bot API.
 
+    Topics are grouped by chat and each chat gets one worker, paced by its own
+    limiter (per_chat_per_minute, default PER_CHAT_DELETES_PER_MINUTE; 0
+    disables). Workers share a bot-wide limiter (MAX_DELETES_PER_SECOND) and
+    at most MAX_CONCURRENT_DELETES requests are in flight at once.
+    A 429 backs off for the server-provided retry_after and retries the same
+    topic; transient network errors retry with exponential backoff up to
+    MAX_NETWORK_RETRIES times.
+
     Returns:
         (deleted_count, failed_count)
     """
-    if not execute:
-        for i, (chat_id, thread_id) in enumerate(to_delete, 1):
-            logger.info(f"[DRY RUN] Would delete topic {thread_id} in chat {chat_id} ({i}/{len(to_delete)})")
-        return len(to_delete), 0
+    from telegram.error import BadRequest, NetworkError, RetryAfter
 
-    from telegram import Bot
+    if per_chat_per_minute is None:
+        per_chat_per_minute = PER_CHAT_DELETES_PER_MINUTE
 
-    bot = Bot(token=token)
+    by_chat: dict[int, list[int]] = defaultdict(list)
+    for chat_id, thread_id in to_delete:
+        by_chat[chat_id].append(thread_id)
+
+    bot = _build_bot(token)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DELETES)
+    global_limiter = RateLimiter(MAX_DELETES_PER_SECOND)
+    total = len(to_delete)
     deleted = 0
     failed = 0
 
-    for i, (chat_id, thread_id) in enumerate(to_delete, 1):
-        try:
-            await bot.delete_forum_topic(chat_id=chat_id, message_thread_id=thread_id)
+    def record_error(chat_id: int, thread_id: int, e: Exception) -> None:
+        nonlocal deleted, failed
+        error_str = str(e)
+        # Only treat topic-specific "not found" as idempotent success;
+        # broader matches like "chat not found" indicate real failures.
+        if "TOPIC_NOT_MODIFIED" in error_str or "TOPIC_ID_INVALID" in error_str:
             deleted += 1
-            if i % 50 == 0 or i == len(to_delete):
-                logger.info(f"Progress: {i}/{len(to_delete)} ({deleted} deleted, {failed} failed)")
-        except Exception as e:
-            error_str = str(e)
-            # Only treat topic-specific "not found" as idempotent success;
-            # broader matches like "chat not found" indicate real failures.
-            if "TOPIC_NOT_MODIFIED" in error_str or "TOPIC_ID_INVALID" in error_str:
+        else:
+            failed += 1
+            logger.warning(f"Failed to delete topic {thread_id} in chat {chat_id}: {e}")
+
+    async def delete_one(chat_id: int, thread_id: int, chat_limiter: RateLimiter | None) -> None:
+        nonlocal deleted
+        network_retries = 0
+        while True:
+            # Wait for this chat's budget before taking a global slot, so a
+            # throttled chat never holds slots other chats could use.
+            if chat_limiter:
+                await chat_limiter.acquire()
+            try:
+                async with semaphore:
+                    await global_limiter.acquire()
+                    await bot.delete_forum_topic(chat_id=chat_id, message_thread_id=thread_id)
                 deleted += 1
-            else:
-                failed += 1
-                logger.warning(f"Failed to delete topic {thread_id} in chat {chat_id}: {e}")
-
-        # Rate limiting
-        await asyncio.sleep(RATE_LIMIT_DELAY)
-
-    # Shut down the HTTP client. Do NOT call bot.close() — that invokes the
-    # Telegram close API (bot migration control) which can disrupt the
-    # active bot instance and trigger 429 errors.
-    await bot.shutdown()
+                break
+            except RetryAfter as e:
+                delay = _retry_after_seconds(e.retry_after)
+                logger.info(f"Rate limited deleting topic {thread_id}; retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except BadRequest as e:
+                # BadRequest subclasses NetworkError but is never transient
+                record_error(chat_id, thread_id, e)
+                break
+            except NetworkError as e:
+                if network_retries >= MAX_NETWORK_RETRIES:
+                    record_error(chat_id, thread_id, e)
+                    break
+                delay = NETWORK_BACKOFF_SECONDS * 2 ** network_retries
+                network_retries += 1
+                logger.info(f"Network error deleting topic {thread_id} ({e}); retry {network_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                record_error(chat_id, thread_id, e)
+                break
+        done = deleted + failed
+        if done % 50 == 0 or done == total:
+            logger.info(f"Progress: {done}/{total} ({deleted} deleted, {failed} failed)")
+
+    async def chat_worker(chat_id: int, thread_ids: list[int]) -> None:
+        chat_limiter = RateLimiter(per_chat_per_minute, 60) if per_chat_per_minute > 0 else None
+        for thread_id in thread_ids:
+            await delete_one(chat_id, thread_id, chat_limiter)
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for chat_id, thread_ids in by_chat.items():
+                tg.create_task(chat_worker(chat_id, thread_ids))
+    finally:
+        # Shut down the HTTP client. Do NOT call bot.close() — that invokes the
+        # Telegram close API (bot migration control) which can disrupt the
+        # active bot instance and trigger 429 errors.
+        await bot.shutdown()
     return deleted, failed
 
 
-async def main():
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Delete duplicate Telegram forum topics from crash-loop (issue #147)"
     )
@@ -145,14 +469,38 @@ async def main():
     )
     parser.add_argument(
         "--session",
-        default="c1d607d3",
-        help="Session ID to clean up (default: c1d607d3)",
+        nargs="+",
+        default=["c1d607d3"],
+        help="Session ID(s) to clean up; all are scanned in one log pass (default: c1d607d3)",
     )
     parser.add_argument(
         "--log",
         default="/tmp/session-manager.log",
         help="Path to session manager log file",
     )
+    parser.add_argument(
+        "--tail-bytes",
+        type=int,
+        default=DEFAULT_TAIL_BYTES,
+        help="Only scan the last N bytes of the log (default: 0, scan the whole file)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes used to scan large log windows (default: CPU count)",
+    )
+    parser.add_argument(
+        "--per-chat-rate",
+        type=float,
+        default=PER_CHAT_DELETES_PER_MINUTE,
+        help="Max deletions per minute in any one chat; 0 disables (default: 20)",
+    )
+    parser.add_argument(
+        "--regex",
+        action="store_true",
+        help="Match log lines with the regex instead of the byte splitter",
+    )
     parser.add_argument(
         "--state-file",
         default="/tmp/claude-sessions/sessions.json",
@@ -161,10 +509,23 @@ async def main():
     parser.add_argument(
         "--keep",
         default=None,
-        help="Explicit chat_id:thread_id to keep, e.g. -1003506774897:8654 (overrides state file lookup)",
+        help=(
+            "Explicit chat_id:thread_id to keep, e.g. --keep=-1003506774897:8654 "
+            "(overrides state file lookup; single --session only)"
+        ),
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.keep and len(args.session) > 1:
+        parser.error("--keep can only be used with a single --session")
+    return args
+
 
+def plan(args: argparse.Namespace) -> tuple[str, list[tuple[int, int]], list[tuple[int, int]]] | None:
+    """Scan the log and decide what to delete. Exits on unrecoverable input errors.
+
+    Returns:
+        (token, to_delete, kept_topics), or None when there is nothing to delete
+    """
     # Load config for bot token
     config = load_config()
     token = config.get("telegram", {}).get("token")
@@ -172,76 +533,86 @@ async def main():
         logger.error("No Telegram bot token found in config.yaml")
         sys.exit(1)
 
-    # Extract all thread IDs from log
+    # Extract all thread IDs from log — one pass for every session
     log_path = Path(args.log)
     if not log_path.exists():
         logger.error(f"Log file not found: {args.log}")
         sys.exit(1)
 
-    all_topics = extract_thread_ids(args.log, args.session)
-    if not all_topics:
-        logger.info(f"No topics found for session {args.session} in {args.log}")
-        return
-
-    logger.info(f"Found {len(all_topics)} topic(s) for session {args.session} in log")
+    topics_by_session = extract_thread_ids_by_session(
+        args.log,
+        args.session,
+        tail_bytes=args.tail_bytes,
+        workers=args.workers,
+        use_regex=args.regex,
+    )
 
-    # Determine which (chat_id, thread_id) to keep — abort if unknown
-    keep_topic: tuple[int, int] | None = None
+    explicit_keep: tuple[int, int] | None = None
     if args.keep:
         try:
             parts = args.keep.split(":")
-            keep_topic = (int(parts[0]), int(parts[1]))
+            explicit_keep = (int(parts[0]), int(parts[1]))
         except (ValueError, IndexError):
-            logger.error(f"Invalid --keep format: {args.keep!r}. Expected chat_id:thread_id, e.g. -1003506774897:8654")
+            logger.error(f"Invalid --keep format: {args.keep!r}. Expected chat_id:thread_id, e.g. --keep=-1003506774897:8654")
             sys.exit(1)
-    else:
-        keep_topic = get_current_topic(args.session, args.state_file)
 
-    logger.info(f"Topic to keep: chat_id={keep_topic[0]}, thread_id={keep_topic[1]}" if keep_topic else "Topic to keep: None")
+    to_delete: list[tuple[int, int]] = []
+    kept: list[tuple[int, int]] = []
+    for session_id, all_topics in topics_by_session.items():
+        if not all_topics:
+            logger.info(f"No topics found for session {session_id} in {args.log}")
+            continue
+
+        logger.info(f"Found {len(all_topics)} unique topic(s) for session {session_id} in log")
+
+        # Determine which (chat_id, thread_id) to keep — abort if unknown
+        keep_topic = explicit_keep or get_current_topic(session_id, args.state_file)
+        logger.info(f"Topic to keep: chat_id={keep_topic[0]}, thread_id={keep_topic[1]}" if keep_topic else "Topic to keep: None")
+
+        if keep_topic is None:
+            logger.error(
+                f"No persisted (chat_id, thread_id) for session {session_id}. "
+                "Cannot determine which topic to keep — aborting to avoid deleting the active topic. "
+                "Fix the session state first or pass --keep chat_id:thread_id to specify explicitly."
+            )
+            sys.exit(1)
 
-    if keep_topic is None:
-        logger.error(
-            f"No persisted (chat_id, thread_id) for session {args.session}. "
-            "Cannot determine which topic to keep — aborting to avoid deleting the active topic. "
-            "Fix the session state first or pass --keep chat_id:thread_id to specify explicitly."
-        )
-        sys.exit(1)
+        # Filter out the one to keep — compare full (chat_id, thread_id) tuple
+        session_delete = [(c, t) for c, t in all_topics if (c, t) != keep_topic]
+        logger.info(f"Topics to delete for {session_id}: {len(session_delete)} (keeping {keep_topic[0]}:{keep_topic[1]})")
+        to_delete.extend(session_delete)
+        kept.append(keep_topic)
 
-    # Deduplicate — same (chat_id, thread_id) may appear multiple times in
-    # the log.  Key on the tuple since thread IDs are scoped per chat.
-    seen: set[tuple[int, int]] = set()
-    unique_topics = []
-    for chat_id, thread_id in all_topics:
-        key = (chat_id, thread_id)
-        if key not in seen:
-            seen.add(key)
-            unique_topics.append((chat_id, thread_id))
+    if not to_delete:
+        logger.info("Nothing to delete!")
+        return None
 
-    logger.info(f"Unique topic IDs: {len(unique_topics)}")
+    return token, to_delete, kept
 
-    # Filter out the one to keep — compare full (chat_id, thread_id) tuple
-    to_delete = [(c, t) for c, t in unique_topics if (c, t) != keep_topic]
-    logger.info(f"Topics to delete: {len(to_delete)} (keeping {keep_topic[0]}:{keep_topic[1]})")
 
-    if not to_delete:
-        logger.info("Nothing to delete!")
-        return
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    cleanup = plan(args)
+    if cleanup is None:
+        return 0
+    token, to_delete, kept = cleanup
 
-    if not args.execute:
+    if args.execute:
+        deleted, failed = asyncio.run(delete_topics(token, to_delete, args.per_chat_rate))
+    else:
         logger.info("=" * 60)
         logger.info("DRY RUN — pass --execute to actually delete topics")
         logger.info("=" * 60)
-
-    deleted, failed = await delete_topics(token, to_delete, args.execute)
+        deleted, failed = dry_run_topics(to_delete)
 
     logger.info("=" * 60)
     mode = "EXECUTED" if args.execute else "DRY RUN"
-    logger.info(f"{mode}: {deleted} deleted, {failed} failed, 1 kept ({keep_topic[0]}:{keep_topic[1]})")
+    kept_str = ", ".join(f"{c}:{t}" for c, t in kept)
+    logger.info(f"{mode}: {deleted} deleted, {failed} failed, {len(kept)} kept ({kept_str})")
     logger.info("=" * 60)
 
-    if failed > 0:
-        sys.exit(1)
+    return 1 if failed > 0 else 0
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(main())
@@ -1,19 +1,26 @@
 """HTTP client for Session Manager API."""
 
+import http.client
 import os
 import sys
+import threading
 from typing import Optional
-import urllib.error
 import urllib.parse
-import urllib.request
 import json
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is the fallback
+    orjson = None
+
 # Default API endpoint
 DEFAULT_API_URL = "http://127.0.0.1:8420"
 DEFAULT_API_TIMEOUT = 5.0  # seconds
 DEFAULT_SEND_API_TIMEOUT = 15.0  # seconds
 DEFAULT_MUTATION_API_TIMEOUT = 15.0  # seconds
 KILL_TIMEOUT = 30  # seconds (kill triggers cleanup that may involve network I/O)
+# Safe to resend after the server may already have acted on the request
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
 
 
 def _read_api_timeout() -> float:
@@ -63,6 +70,20 @@ def _read_mutation_api_timeout() -> float:
 MUTATION_API_TIMEOUT = _read_mutation_api_timeout()
 
 
+def _json_dumps(data) -> bytes:
+    """Encode a request body as JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data).encode()
+
+
+def _json_loads(payload: bytes):
+    """Decode a JSON response body."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload.decode())
+
+
 class SessionManagerClient:
     """Client for Session Manager API."""
 
@@ -75,6 +96,79 @@ class SessionManagerClient:
         """
         self.api_url = api_url or os.environ.get("SM_API_URL", DEFAULT_API_URL)
         self.session_id = os.environ.get("CLAUDE_SESSION_MANAGER_ID")
+        # Keep-alive connection reused across calls; per-thread because the
+        # watch TUI shares one client with its background detail fetcher.
+        self._local = threading.local()
+
+    def _connection(self, timeout: float) -> tuple[http.client.HTTPConnection, str, bool]:
+        """
+        Return a keep-alive connection to the API.
+
+        Returns:
+            Tuple of (connection, base_path, reused)
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.api_url == self.api_url:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, self._local.base_path, True
+
+        self.close()
+        parts = urllib.parse.urlsplit(self.api_url)
+        conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        conn = conn_cls(parts.hostname or "127.0.0.1", parts.port, timeout=timeout)
+        self._local.conn = conn
+        self._local.api_url = self.api_url
+        self._local.base_path = parts.path.rstrip("/")
+        return conn, self._local.base_path, False
+
+    def close(self) -> None:
+        """Close this thread's keep-alive connection, if any."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _send(self, method: str, path: str, body: Optional[bytes], timeout: float) -> tuple[int, bytes]:
+        """
+        Send one request over the keep-alive connection.
+
+        A reused connection the server has since closed is reopened and the
+        request retried. Non-idempotent requests (POST, PATCH) are retried only
+        if the connection failed while the request was being written, so the
+        server cannot have acted on them; any other transport error propagates.
+
+        Returns:
+            Tuple of (status_code, response_body)
+        """
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        while True:
+            conn, base_path, reused = self._connection(timeout)
+            try:
+                conn.request(method, f"{base_path}{path}", body=body, headers=headers)
+            except (http.client.RemoteDisconnected, BrokenPipeError):
+                self.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                self.close()
+                raise
+            try:
+                response = conn.getresponse()
+                payload = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if reused and method in IDEMPOTENT_METHODS:
+                    continue
+                raise
+            except Exception:
+                self.close()
+                raise
+            if response.will_close:
+                self.close()
+            return response.status, payload
 
     def _request(self, method: str, path: str, data: Optional[dict] = None, timeout: Optional[int] = None) -> tuple[Optional[dict], bool, bool]:
         """
@@ -92,38 +186,33 @@ class SessionManagerClient:
             - success=False, unavailable=True: Transport error / timeout
             - success=False, unavailable=False: API error (4xx, 5xx response)
         """
-        url = f"{self.api_url}{path}"
         request_timeout = timeout if timeout is not None else API_TIMEOUT
 
+        # Important: some endpoints require an explicit JSON body even when empty ({}).
+        body = _json_dumps(data) if data is not None else None
         try:
-            headers = {"Content-Type": "application/json"}
-            # Important: some endpoints require an explicit JSON body even when empty ({}).
-            body = json.dumps(data).encode() if data is not None else None
-
-            req = urllib.request.Request(url, data=body, headers=headers, method=method)
-            with urllib.request.urlopen(req, timeout=request_timeout) as response:
-                if response.status in (200, 201):
-                    return json.loads(response.read().decode()), True, False
-                # API responded but with error status
-                return None, False, False
-
-        except urllib.error.HTTPError as e:
-            payload = e.read() if hasattr(e, "read") else b""
-            if payload:
-                try:
-                    decoded = json.loads(payload.decode())
-                    if isinstance(decoded, dict):
-                        return decoded, False, False
-                    return {"value": decoded}, False, False
-                except Exception:
-                    return {"error": payload.decode(errors="replace")}, False, False
-            return {"error": f"HTTP {getattr(e, 'code', 'error')}"}, False, False
-        except urllib.error.URLError as e:
+            status, payload = self._send(method, path, body, request_timeout)
+        except Exception:
             # Connection refused, timeout, etc. - treat as transport unavailable
             return None, False, True
-        except Exception as e:
-            # Other transport errors - treat as unavailable
-            return None, False, True
+
+        if status in (200, 201):
+            try:
+                return _json_loads(payload), True, False
+            except Exception:
+                return None, False, True
+        if status < 400:
+            # API responded but with a non-success status
+            return None, False, False
+        if payload:
+            try:
+                decoded = _json_loads(payload)
+                if isinstance(decoded, dict):
+                    return decoded, False, False
+                return {"value": decoded}, False, False
+            except Exception:
+                return {"error": payload.decode(errors="replace")}, False, False
+        return {"error": f"HTTP {status}"}, False, False
 
     def _request_with_status(
         self,
@@ -138,31 +227,23 @@ class SessionManagerClient:
         Returns:
             Tuple of (response_data, status_code, unavailable)
         """
-        url = f"{self.api_url}{path}"
         request_timeout = timeout if timeout is not None else API_TIMEOUT
-        headers = {"Content-Type": "application/json"}
-        body = json.dumps(data).encode() if data is not None else None
-        req = urllib.request.Request(url, data=body, headers=headers, method=method)
+        body = _json_dumps(data) if data is not None else None
 
         def _decode(payload: bytes) -> Optional[dict]:
             if not payload:
                 return None
             try:
-                decoded = json.loads(payload.decode())
+                decoded = _json_loads(payload)
                 return decoded if isinstance(decoded, dict) else {"value": decoded}
             except Exception:
                 return {"raw": payload.decode(errors="replace")}
 
         try:
-            with urllib.request.urlopen(req, timeout=request_timeout) as response:
-                return _decode(response.read()), response.status, False
-        except urllib.error.HTTPError as e:
-            payload = e.read() if hasattr(e, "read") else b""
-            return _decode(payload), e.code, False
-        except urllib.error.URLError:
-            return None, None, True
+            status, payload = self._send(method, path, body, request_timeout)
         except Exception:
             return None, None, True
+        return _decode(payload), status, False
 
     def get_session(self, session_id: str, timeout: Optional[float] = None) -> Optional[dict]:
         """Get session details."""
@@ -31,6 +31,9 @@ from ..codex_provider_policy import (
 # text; Enter must arrive as a separate event after the paste mode ends.
 _SEND_KEYS_SETTLE_SECONDS = 0.3
 _SM_ID_TOKEN_RE = re.compile(r"^[0-9a-fA-F]{8}$")
+_DURATION_PART_RE = re.compile(r'(\d+)([smhd])', re.IGNORECASE)
+_SAFE_MODEL_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._:/-]*$")
+_ANSI_ESCAPE_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
 
 
 def _tmux_command(args: list[str], tmux_socket_name: Optional[str] = None) -> list[str]:
@@ -148,8 +151,7 @@ def parse_duration(duration_str: str) -> int:
         return seconds
 
     total_seconds = 0
-    pattern = re.compile(r'(\d+)([smhd])', re.IGNORECASE)
-    matches = pattern.findall(duration_str)
+    matches = _DURATION_PART_RE.findall(duration_str)
 
     if not matches:
         raise ValueError(f"Invalid duration format: {duration_str}")
@@ -2361,17 +2363,16 @@ def cmd_spawn(
         2: Session manager unavailable
     """
     import json as json_lib
-    safe_model_pattern = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._:/-]*$")
     if track_seconds is not None and track_seconds <= 0:
         print("Error: --track interval must be > 0", file=sys.stderr)
         return 1
-    if provider == "claude" and model is not None and not safe_model_pattern.match(model):
+    if provider == "claude" and model is not None and not _SAFE_MODEL_RE.match(model):
         print(
             "Error: Invalid Claude model. Allowed characters: letters, numbers, ., _, :, /, -",
             file=sys.stderr,
         )
         return 1
-    if provider in {"codex", "codex-fork", "codex-app"} and model is not None and not safe_model_pattern.match(model):
+    if provider in {"codex", "codex-fork", "codex-app"} and model is not None and not _SAFE_MODEL_RE.match(model):
         print(
             "Error: Invalid Codex model. Allowed characters: letters, numbers, ., _, :, /, -",
             file=sys.stderr,
@@ -3780,8 +3781,7 @@ def cmd_tail(
             return 1
 
         # Strip ANSI escape codes
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        clean = ansi_escape.sub('', output)
+        clean = _ANSI_ESCAPE_RE.sub('', output)
         print(clean, end="")
         return 0
 
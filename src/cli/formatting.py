@@ -3,20 +3,27 @@
 from datetime import datetime
 from typing import Optional
 
+# Statuses counted as "others in this workspace" by format_status_list
+_ACTIVE_STATUSES = frozenset({"running", "waiting_permission"})
+_SUMMARY_LINE_PREFIX = "\n  → "
 
-def format_relative_time(timestamp_str: str) -> str:
+
+def format_relative_time(timestamp_str: str, now: Optional[datetime] = None) -> str:
     """
     Format timestamp as relative time (e.g., '2min ago', '5min ago').
 
     Args:
         timestamp_str: ISO format timestamp string
+        now: Reference time (defaults to datetime.now(); pass one in when
+            formatting many timestamps for the same render)
 
     Returns:
         Relative time string
     """
     try:
         timestamp = datetime.fromisoformat(timestamp_str)
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
         delta = now - timestamp
 
         # Convert to minutes
@@ -46,10 +53,12 @@ def format_relative_time(timestamp_str: str) -> str:
 
 def format_session_line(
     session: dict,
+    *,
     show_working_dir: bool = False,
     show_summary: bool = False,
     summary: Optional[str] = None,
-    index: Optional[int] = None
+    index: Optional[int] = None,
+    now: Optional[datetime] = None,
 ) -> str:
     """
     Format a session as a single line.
@@ -60,6 +69,7 @@ def format_session_line(
         show_summary: Show summary on next line
         summary: Optional summary text
         index: Optional menu index number
+        now: Reference time for relative timestamps (defaults to datetime.now())
 
     Returns:
         Formatted session line(s)
@@ -76,35 +86,23 @@ def format_session_line(
 
     # Format last activity
     if last_activity:
-        time_str = format_relative_time(last_activity)
+        time_str = format_relative_time(last_activity, now)
     else:
         time_str = "unknown"
 
     # Build line
-    parts = []
-
-    if index is not None:
-        parts.append(f"{index}.")
-
-    parts.append(display_name)
-    parts.append(f"[{session_id}]")
-    parts.append(f"- {status}")
-    parts.append(f"- {time_str}")
+    prefix = f"{index}. " if index is not None else ""
+    line = f"{prefix}{display_name} [{session_id}] - {status} - {time_str}"
 
     if show_working_dir:
         working_dir = session.get("working_dir", "")
         if working_dir:
-            parts.append(f"({working_dir})")
-
-    # Format main line
-    line = " ".join(parts)
+            line = f"{line} ({working_dir})"
 
     # Add summary if requested
     if show_summary and summary:
-        # Indent summary
-        summary_lines = summary.split('\n')
-        summary_text = '\n'.join(f"  → {line}" for line in summary_lines)
-        line = f"{line}\n{summary_text}"
+        # Indent every summary line under the session line
+        line = line + _SUMMARY_LINE_PREFIX + summary.replace("\n", _SUMMARY_LINE_PREFIX)
 
     return line
 
@@ -121,29 +119,32 @@ def format_status_list(sessions: list, current_session_id: str) -> str:
         Formatted status text
     """
     lines = []
+    now = datetime.now()
+
+    # One pass: find the current session and group active peers by workspace
+    current = None
+    active_by_dir: dict[str, list[dict]] = {}
+    for s in sessions:
+        if s["id"] == current_session_id:
+            if current is None:
+                current = s
+        elif s["status"] in _ACTIVE_STATUSES:
+            active_by_dir.setdefault(s["working_dir"], []).append(s)
 
-    # Current session
-    current = next((s for s in sessions if s["id"] == current_session_id), None)
     if current:
-        lines.append("You: " + format_session_line(current, show_working_dir=True))
+        lines.append("You: " + format_session_line(current, show_working_dir=True, now=now))
     else:
         lines.append("You: Session not found")
 
     # Other sessions in same workspace
     if current:
-        working_dir = current["working_dir"]
-        others = [
-            s for s in sessions
-            if s["id"] != current_session_id
-            and s["working_dir"] == working_dir
-            and s["status"] in ["running", "waiting_permission"]
-        ]
+        others = active_by_dir.get(current["working_dir"], [])
 
         if others:
             lines.append("")
             lines.append("Others in this workspace:")
             for session in others:
-                lines.append("  " + format_session_line(session))
+                lines.append("  " + format_session_line(session, now=now))
         else:
             lines.append("")
             lines.append("Others in this workspace: none")
@@ -50,6 +50,9 @@ class CodexObservabilityLogger:
         if self._conn is None:
             self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
             self._conn.execute("PRAGMA journal_mode=WAL")
+            # Every streamed item event commits on its own; under WAL, NORMAL
+            # syncs at checkpoints instead of on each of those commits.
+            self._conn.execute("PRAGMA synchronous=NORMAL")
             self._conn.execute("PRAGMA busy_timeout=5000")
         return self._conn
 
@@ -12,6 +12,7 @@ logger = logging.getLogger(__name__)
 
 LOCK_FILE_NAME = ".claude/workspace.lock"
 STALE_THRESHOLD_MINUTES = 30
+STALE_THRESHOLD = timedelta(minutes=STALE_THRESHOLD_MINUTES)
 
 
 def get_git_root(file_path: str) -> Optional[str]:
@@ -43,6 +44,41 @@ def get_git_root(file_path: str) -> Optional[str]:
     return None
 
 
+def _find_git_root_from(path: Path) -> Optional[Path]:
+    """Walk up from path to the nearest directory containing .git (dir or worktree file)."""
+    for candidate in (path, *path.parents):
+        if (candidate / ".git").exists():
+            return candidate
+    return None
+
+
+def _read_head_branch(repo_root: str) -> Optional[str]:
+    """
+    Read the checked-out branch from the repo's HEAD file without forking git.
+
+    Args:
+        repo_root: Path to git repository root (main checkout or worktree)
+
+    Returns:
+        Branch name, "" for a detached HEAD, or None if HEAD could not be read
+    """
+    git_path = Path(repo_root) / ".git"
+    try:
+        if git_path.is_file():
+            # Worktree: .git is a file containing "gitdir: <path>"
+            git_dir = Path(git_path.read_text().strip().removeprefix("gitdir:").strip())
+            if not git_dir.is_absolute():
+                git_dir = git_path.parent / git_dir
+        else:
+            git_dir = git_path
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return None
+    if head.startswith("ref: refs/heads/"):
+        return head[len("ref: refs/heads/"):]
+    return ""
+
+
 def is_worktree(repo_root: str) -> bool:
     """
     Check if a path is a git worktree (not the main working tree).
@@ -122,7 +158,7 @@ class LockInfo:
     def is_stale(self) -> bool:
         """Check if lock is older than threshold."""
         age = datetime.now() - self.started
-        return age > timedelta(minutes=STALE_THRESHOLD_MINUTES)
+        return age > STALE_THRESHOLD
 
 
 @dataclass
@@ -148,18 +184,9 @@ class LockManager:
         self.lock_file = self.repo_root / LOCK_FILE_NAME if self.repo_root else None
 
     def _find_repo_root(self) -> Optional[Path]:
-        """Find git repository root."""
+        """Find git repository root by walking up to the nearest .git."""
         try:
-            result = subprocess.run(
-                ["git", "rev-parse", "--show-toplevel"],
-                cwd=self.working_dir,
-                capture_output=True,
-                text=True,
-                timeout=2,
-            )
-            if result.returncode == 0:
-                return Path(result.stdout.strip())
-            return None
+            return _find_git_root_from(self.working_dir)
         except Exception as e:
             logger.debug(f"Failed to find git root: {e}")
             return None
@@ -208,6 +235,11 @@ class LockManager:
 
     def _get_current_branch_for_path(self, repo_root: str) -> str:
         """Get current git branch for a specific repo path."""
+        branch = _read_head_branch(repo_root)
+        if branch is not None:
+            return branch or "unknown"
+
+        # Unusual layouts (e.g. GIT_DIR elsewhere): ask git
         try:
             result = subprocess.run(
                 ["git", "branch", "--show-current"],
@@ -224,19 +256,9 @@ class LockManager:
 
     def _get_current_branch(self) -> str:
         """Get current git branch."""
-        try:
-            result = subprocess.run(
-                ["git", "branch", "--show-current"],
-                cwd=self.working_dir,
-                capture_output=True,
-                text=True,
-                timeout=2,
-            )
-            if result.returncode == 0:
-                return result.stdout.strip() or "unknown"
-            return "unknown"
-        except Exception:
+        if not self.repo_root:
             return "unknown"
+        return self._get_current_branch_for_path(str(self.repo_root))
 
     def acquire_lock(self, session_id: str, task: str) -> bool:
         """
@@ -326,18 +348,13 @@ class LockManager:
         Returns:
             LockInfo if lock exists and is valid, None otherwise
         """
-        if not lock_file.exists():
-            return None
-
         try:
-            with open(lock_file) as f:
-                lines = f.readlines()
-
+            # Single read; a missing file is the common "no lock" case
+            data = lock_file.read_bytes()
             lock_data = {}
-            for line in lines:
-                line = line.strip()
-                if "=" in line:
-                    key, value = line.split("=", 1)
+            for line in data.decode().splitlines():
+                key, sep, value = line.strip().partition("=")
+                if sep:
                     lock_data[key] = value
 
             if not all(k in lock_data for k in ["session", "task", "branch", "started"]):
@@ -350,6 +367,8 @@ class LockManager:
                 branch=lock_data["branch"],
                 started=datetime.fromisoformat(lock_data["started"]),
             )
+        except FileNotFoundError:
+            return None
         except Exception as e:
             logger.error(f"Failed to read lock file {lock_file}: {e}")
             return None
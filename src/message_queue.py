@@ -9,6 +9,7 @@ import shlex
 import sqlite3
 import subprocess
 import threading
+import time
 import uuid
 from collections import deque
 from datetime import datetime, timedelta, timezone
@@ -52,6 +53,14 @@ class MessageQueueManager:
     _STOP_SUPPRESS_WINDOW_SECONDS = 10
     _REMIND_CHECK_INTERVAL_SECONDS = 5
     _TRACK_STATUS_NUDGE_MAX_LEAD_SECONDS = 60
+    _STATE_SAVE_DEBOUNCE_SECONDS = 0.5
+    # Served by the idx_pending partial index, so each monitor tick scans only
+    # undelivered rows rather than every session that ever queued a message.
+    _PENDING_SESSIONS_SQL = """
+        SELECT DISTINCT target_session_id
+        FROM message_queue
+        WHERE delivered_at IS NULL
+    """
 
     def __init__(
         self,
@@ -83,6 +92,7 @@ class MessageQueueManager:
         self.input_poll_interval = sm_send_config.get("input_poll_interval", 5)  # seconds
         self.input_stale_timeout = sm_send_config.get("input_stale_timeout", 120)  # seconds
         self.max_batch_size = sm_send_config.get("max_batch_size", 10)
+        self.max_pending_per_session = sm_send_config.get("max_pending_per_session", 0)  # 0 = unbounded
         self.urgent_delay_ms = sm_send_config.get("urgent_delay_ms", 500)
         self.telegram_mirror_max_queue = sm_send_config.get("telegram_mirror_max_queue", 256)
 
@@ -113,6 +123,11 @@ class MessageQueueManager:
         # Background task
         self._running = False
         self._monitor_task: Optional[asyncio.Task] = None
+        # Set when new work is queued so the monitor loop wakes immediately
+        self._monitor_wake = asyncio.Event()
+        # Deliveries mark session state dirty; one debounced save covers a burst
+        self._state_dirty = False
+        self._state_save_handle: Optional[asyncio.TimerHandle] = None
         self._scheduled_tasks: Dict[str, asyncio.Task] = {}  # reminder_id -> task
 
         # Durable external job watches (#377): keyed by watch_id
@@ -239,6 +254,13 @@ class MessageQueueManager:
         if "response_relay_source" not in columns:
             cursor.execute("ALTER TABLE message_queue ADD COLUMN response_relay_source TEXT DEFAULT NULL")
             logger.info("Migrated message_queue: added response_relay_source column")
+        # After the message_category migration: sm clear cancels a sender's
+        # undelivered context-monitor alerts (#241)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pending_sender
+            ON message_queue(sender_session_id, message_category)
+            WHERE delivered_at IS NULL
+        """)
         cursor.execute("PRAGMA table_info(scheduled_reminders)")
         reminder_columns = [col[1] for col in cursor.fetchall()]
         if "recurring_interval_seconds" not in reminder_columns:
@@ -295,6 +317,9 @@ class MessageQueueManager:
                 is_active INTEGER DEFAULT 1
             )
         """)
+        # Lookups go through the child_session_id UNIQUE index; a partial index
+        # on is_active only added write cost, so drop it where it was created.
+        cursor.execute("DROP INDEX IF EXISTS idx_parent_wake_active")
 
         # Durable external job watches (#377)
         cursor.execute("""
@@ -1597,11 +1622,11 @@ class MessageQueueManager:
             task.cancel()
         self._codex_idle_reconcile_tasks.clear()
         if self._monitor_task:
+            # Cancelling the monitor also cancels any in-flight per-session
+            # checks it is gathering, so none outlive shutdown.
             self._monitor_task.cancel()
-            try:
-                await self._monitor_task
-            except asyncio.CancelledError:
-                pass
+            await asyncio.gather(self._monitor_task, return_exceptions=True)
+            self._monitor_task = None
         if self._telegram_mirror_worker_task:
             self._telegram_mirror_worker_task.cancel()
             await asyncio.gather(self._telegram_mirror_worker_task, return_exceptions=True)
@@ -1619,6 +1644,8 @@ class MessageQueueManager:
         for task in self._remind_tasks.values():
             task.cancel()
         self._remind_tasks.clear()
+        # Don't lose delivery-driven session updates still waiting on the debounce
+        self._flush_state()
         # Close database connection
         if self._db_conn:
             self._db_conn.close()
@@ -1673,14 +1700,15 @@ class MessageQueueManager:
         # Stop hook from the new task is not silently dropped.
         if from_stop_hook and state.stop_notify_skip_count > 0:
             armed_at = state.skip_count_armed_at
-            if armed_at and (datetime.now() - armed_at).total_seconds() < self.skip_fence_window_seconds:
+            if (
+                armed_at
+                and (datetime.now() - armed_at).total_seconds() < self.skip_fence_window_seconds
+                and state.consume_stop_notify_skip()
+            ):
                 # Within window: absorb this /clear Stop hook.
                 # Do NOT set is_idle here — agent may already be processing new task.
                 # Preserves is_idle=False if mark_session_active already ran.
                 # Do NOT cancel remind/parent_wake — agent is still running (sm#263).
-                state.stop_notify_skip_count -= 1
-                if state.stop_notify_skip_count == 0:
-                    state.skip_count_armed_at = None  # hygiene: clear when fence fully consumed
                 logger.debug(
                     f"Session {session_id}: skip_count decremented to {state.stop_notify_skip_count}; "
                     f"stop notification deferred (sender_id preserved: {state.stop_notify_sender_id})"
@@ -1690,8 +1718,7 @@ class MessageQueueManager:
             else:
                 # Stale arm (hook was lost): reset entire fence atomically and fall through
                 # so the next real Stop hook sets is_idle=True correctly (sm#232).
-                state.stop_notify_skip_count = 0
-                state.skip_count_armed_at = None
+                state.reset_stop_notify_skip()
                 logger.warning(
                     f"Session {session_id}: skip fence was stale "
                     f"(armed >{self.skip_fence_window_seconds}s ago), resetting"
@@ -1842,6 +1869,23 @@ class MessageQueueManager:
             if self._codex_idle_reconcile_tasks.get(session_id) is current_task:
                 self._codex_idle_reconcile_tasks.pop(session_id, None)
 
+    def _mark_state_dirty(self) -> None:
+        """Schedule one debounced SessionManager save for a burst of deliveries."""
+        self._state_dirty = True
+        if self._state_save_handle is None:
+            self._state_save_handle = asyncio.get_running_loop().call_later(
+                self._STATE_SAVE_DEBOUNCE_SECONDS, self._flush_state
+            )
+
+    def _flush_state(self) -> None:
+        """Write session state now if a delivery marked it dirty."""
+        if self._state_save_handle is not None:
+            self._state_save_handle.cancel()
+            self._state_save_handle = None
+        if self._state_dirty:
+            self._state_dirty = False
+            self.session_manager._save_state()
+
     def is_session_idle(self, session_id: str) -> bool:
         """Check if a session is idle."""
         state = self.delivery_states.get(session_id)
@@ -2003,15 +2047,53 @@ class MessageQueueManager:
             msg.message_category,
             msg.response_relay_source,
         ))
+        if self.max_pending_per_session:
+            self._drop_overflow_messages(target_session_id)
 
-        queue_len = self.get_queue_length(target_session_id)
-        logger.info(f"Queued message {msg.id} for {target_session_id} (mode={delivery_mode}, queue={queue_len})")
+        self._monitor_wake.set()
+
+        # get_queue_length re-reads every pending row, so only pay for it when
+        # the INFO record will actually be emitted.
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Queued message %s for %s (mode=%s, queue=%d)",
+                msg.id,
+                target_session_id,
+                delivery_mode,
+                self.get_queue_length(target_session_id),
+            )
 
         if trigger_delivery:
             self._trigger_delivery(target_session_id, delivery_mode, msg)
 
         return msg
 
+    def _drop_overflow_messages(self, session_id: str) -> None:
+        """Drop the oldest pending sequential messages beyond max_pending_per_session.
+
+        Opt-in (off by default): bounds a stuck session's backlog so the queue
+        and every pending scan stay a predictable size regardless of producer
+        rate. Urgent and important messages are never dropped.
+        """
+        rows = self._execute_query("""
+            SELECT id FROM message_queue
+            WHERE target_session_id = ? AND delivered_at IS NULL
+              AND delivery_mode = 'sequential'
+            ORDER BY queued_at DESC, rowid DESC
+            LIMIT -1 OFFSET ?
+        """, (session_id, self.max_pending_per_session))
+        if not rows:
+            return
+        dropped_ids = [row[0] for row in rows]
+        self._execute(
+            f"DELETE FROM message_queue WHERE id IN ({','.join('?' * len(dropped_ids))})",
+            tuple(dropped_ids),
+        )
+        logger.warning(
+            "Queue full for %s (max %d); dropped %d oldest pending message(s): %s",
+            session_id, self.max_pending_per_session, len(dropped_ids), ", ".join(dropped_ids),
+        )
+
     def _prepare_nonurgent_delivery(self, target_session_id: str) -> None:
         """Apply provider-specific state needed before non-urgent direct delivery."""
         session = self.session_manager.get_session(target_session_id)
@@ -2228,20 +2310,16 @@ class MessageQueueManager:
         Returns:
             Number of messages cancelled.
         """
-        rows = self._execute_query(
-            "SELECT COUNT(*) FROM message_queue "
+        cursor = self._execute(
+            "DELETE FROM message_queue "
             "WHERE sender_session_id = ? AND message_category = 'context_monitor' AND delivered_at IS NULL",
             (sender_session_id,)
         )
-        count = rows[0][0] if rows else 0
+        count = cursor.rowcount
         if count:
-            self._execute(
-                "DELETE FROM message_queue "
-                "WHERE sender_session_id = ? AND message_category = 'context_monitor' AND delivered_at IS NULL",
-                (sender_session_id,)
-            )
             logger.info(
-                f"Cancelled {count} stale context-monitor message(s) from cleared session {sender_session_id}"
+                "Cancelled %d stale context-monitor message(s) from cleared session %s",
+                count, sender_session_id,
             )
         return count
 
@@ -2353,13 +2431,32 @@ class MessageQueueManager:
         while self._running:
             try:
                 while self._running:
-                    # Check each session with pending messages
+                    # Check each deliverable session with pending messages. Paused
+                    # sessions can't take delivery, so clearing their input line
+                    # (and spawning a tmux capture for them) would be wasted work.
                     sessions_with_pending = self._get_sessions_with_pending()
 
-                    for session_id in sessions_with_pending:
-                        await self._check_stale_input(session_id)
-
-                    await asyncio.sleep(self.input_poll_interval)
+                    # Sessions are checked concurrently so one slow tmux capture
+                    # or delivery doesn't hold up the rest; the first failure is
+                    # re-raised once all checks finish so backoff still applies.
+                    now = time.monotonic()
+                    results = await asyncio.gather(
+                        *(
+                            self._check_stale_input(session_id, now)
+                            for session_id in sessions_with_pending
+                            if session_id not in self._paused_sessions
+                        ),
+                        return_exceptions=True,
+                    )
+                    for result in results:
+                        if isinstance(result, BaseException):
+                            raise result
+
+                    # Nothing pending: sleep until queue_message wakes us rather
+                    # than re-querying an empty queue every poll interval.
+                    await self._wait_for_monitor_wake(
+                        self.input_poll_interval if sessions_with_pending else None
+                    )
                     retry_count = 0  # Reset on successful iteration
             except asyncio.CancelledError:
                 logger.info("Monitor loop cancelled")
@@ -2383,36 +2480,50 @@ class MessageQueueManager:
                     self._running = False
                     break
 
+    async def _wait_for_monitor_wake(self, timeout: Optional[float]) -> None:
+        """Block until new work is queued or the timeout (None = forever) elapses."""
+        try:
+            await asyncio.wait_for(self._monitor_wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._monitor_wake.clear()
+
     def _get_sessions_with_pending(self) -> List[str]:
         """Get list of session IDs with pending messages."""
-        rows = self._execute_query("""
-            SELECT DISTINCT target_session_id
-            FROM message_queue
-            WHERE delivered_at IS NULL
-        """)
+        rows = self._execute_query(self._PENDING_SESSIONS_SQL)
         return [row[0] for row in rows]
 
-    async def _check_stale_input(self, session_id: str):
-        """Check if user input has become stale and trigger delivery."""
+    async def _check_stale_input(self, session_id: str, now: Optional[float] = None):
+        """Check if user input has become stale and trigger delivery.
+
+        Args:
+            session_id: Session to check
+            now: time.monotonic() reading shared across one monitor tick
+        """
         state = self._get_or_create_state(session_id)
 
         session = self.session_manager.get_session(session_id)
         if not session:
             return
+        if session.status == SessionStatus.STOPPED:
+            # No live pane to capture; messages stay queued for a restore
+            return
         if getattr(session, "provider", "claude") == "codex-app":
             # Codex app-server has no tmux input line to inspect
             return
 
         current_input = await self._get_pending_user_input_async(session.tmux_session)
+        if now is None:
+            now = time.monotonic()
 
         if current_input:
             # User has typed something
             if state.pending_user_input == current_input:
                 # Same text - check if stale
-                if state.pending_input_first_seen:
-                    elapsed = (datetime.now() - state.pending_input_first_seen).total_seconds()
+                if state.pending_input_first_seen is not None:
+                    elapsed = now - state.pending_input_first_seen
                     if elapsed >= self.input_stale_timeout:
-                        logger.info(f"User input stale after {elapsed:.0f}s, saving and delivering")
+                        logger.info("User input stale after %.0fs, saving and delivering", elapsed)
                         # Save the input
                         state.saved_user_input = current_input
                         # Clear the line
@@ -2422,13 +2533,20 @@ class MessageQueueManager:
             else:
                 # Text changed - reset timer
                 state.pending_user_input = current_input
-                state.pending_input_first_seen = datetime.now()
-                logger.debug(f"User input detected, starting stale timer: {current_input[:30]}...")
+                state.pending_input_first_seen = now
+                logger.debug("User input detected, starting stale timer: %.30s...", current_input)
         else:
             # No input - clear tracking
             state.pending_user_input = None
             state.pending_input_first_seen = None
 
+    def _get_delivery_lock(self, session_id: str) -> asyncio.Lock:
+        """Return the per-session delivery lock, creating it on first use."""
+        lock = self._delivery_locks.get(session_id)
+        if lock is None:
+            lock = self._delivery_locks[session_id] = asyncio.Lock()
+        return lock
+
     async def _try_deliver_messages(self, session_id: str, important_only: bool = False):
         """
         Attempt to deliver pending messages to a session.
@@ -2442,17 +2560,22 @@ class MessageQueueManager:
         """
         # Skip delivery if session is paused for recovery
         if session_id in self._paused_sessions:
-            logger.debug(f"Session {session_id} paused for recovery, skipping delivery")
+            logger.debug("Session %s paused for recovery, skipping delivery", session_id)
             return
 
         # Acquire per-session lock to prevent concurrent delivery
-        lock = self._delivery_locks.setdefault(session_id, asyncio.Lock())
+        lock = self._get_delivery_lock(session_id)
         async with lock:
             state = self._get_or_create_state(session_id)
             session = self.session_manager.get_session(session_id)
 
             if not session:
-                logger.warning(f"Session {session_id} not found, cannot deliver")
+                logger.warning("Session %s not found, cannot deliver", session_id)
+                return
+            if session.status == SessionStatus.STOPPED:
+                # Injecting into a stopped session's pane can't succeed; leave the
+                # messages queued so a restore can still deliver them.
+                logger.debug("Session %s is stopped, deferring delivery", session_id)
                 return
 
             # Get pending messages
@@ -2467,13 +2590,15 @@ class MessageQueueManager:
                     return
             # No idle gate for sequential or important: tty buffer handles ordering (sm#244)
 
+            provider = getattr(session, "provider", "claude")
+
             # Check for user input (final gate)
             current_input = None
-            if getattr(session, "provider", "claude") != "codex-app":
+            if provider != "codex-app":
                 current_input = await self._get_pending_user_input_async(session.tmux_session)
             if current_input and not state.saved_user_input:
                 # User is typing - don't inject
-                logger.debug(f"User typing detected at final gate, aborting delivery")
+                logger.debug("User typing detected at final gate, aborting delivery")
                 return
 
             # Batch messages (up to max_batch_size), but keep native slash-control
@@ -2487,6 +2612,7 @@ class MessageQueueManager:
                 batch = batch[:1]
             elif native_rename_index is not None:
                 batch = batch[:native_rename_index]
+            is_native_rename = native_rename_index == 0
 
             # Format batch payload
             if len(batch) == 1:
@@ -2502,8 +2628,8 @@ class MessageQueueManager:
             was_idle = state.is_idle
 
             # Inject the message (use async version to avoid blocking event loop)
-            logger.info(f"Delivering {len(batch)} message(s) to {session_id}")
-            if len(batch) == 1 and batch[0].message_category == "native_rename":
+            logger.info("Delivering %d message(s) to %s", len(batch), session_id)
+            if is_native_rename:
                 friendly_name = self.session_manager.extract_provider_native_rename_name(payload)
                 success = bool(
                     friendly_name
@@ -2525,7 +2651,7 @@ class MessageQueueManager:
                 for msg in batch:
                     delivered_at = self._mark_delivered(msg.id)
                     self._record_response_relay_inbound(msg, delivered_at)
-                    logger.info(f"Delivered message {msg.id}")
+                    logger.info("Delivered message %s", msg.id)
 
                     if msg.sender_session_id and msg.message_category is None:
                         self.cancel_tracked_remind_on_reply(
@@ -2590,10 +2716,10 @@ class MessageQueueManager:
                 # Update session activity
                 session.last_activity = datetime.now()
                 session.status = SessionStatus.RUNNING
-                self.session_manager._save_state()
-                if getattr(session, "provider", "claude") == "codex":
+                self._mark_state_dirty()
+                if provider == "codex":
                     self._schedule_codex_idle_reconcile(session_id)
-            elif len(batch) == 1 and batch[0].message_category == "native_rename":
+            elif is_native_rename:
                 # Provider-native renames are display-sync hints, not user
                 # messages. If the provider control path is unavailable, do
                 # not retry slash-command fallbacks into an active prompt
@@ -2605,7 +2731,7 @@ class MessageQueueManager:
                     session_id,
                 )
             else:
-                logger.error(f"Failed to deliver messages to {session_id}")
+                logger.error("Failed to deliver messages to %s", session_id)
 
     async def _deliver_urgent(self, session_id: str, msg: QueuedMessage):
         """Deliver an urgent message immediately using provider-specific interrupt behavior."""
@@ -2680,7 +2806,7 @@ class MessageQueueManager:
             # Without this, a Stop hook firing during prompt polling can cause
             # _try_deliver_messages to deliver sequential messages before the urgent
             # message, producing out-of-order delivery.
-            lock = self._delivery_locks.setdefault(session_id, asyncio.Lock())
+            lock = self._get_delivery_lock(session_id)
             async with lock:
                 # If session is completed, wake it up first (like cmd_clear does)
                 from src.models import CompletionStatus
@@ -4282,13 +4408,12 @@ class MessageQueueManager:
         logger.info(f"Executing handoff for {session_id}: {file_path}")
 
         # Acquire delivery lock to prevent _try_deliver_messages from interleaving
-        lock = self._delivery_locks.setdefault(session_id, asyncio.Lock())
+        lock = self._get_delivery_lock(session_id)
         async with lock:
             try:
                 # 1. Arm skip fence for /clear Stop hook + clear stale notification state
                 state = self._get_or_create_state(session_id)
-                state.stop_notify_skip_count += 1
-                state.skip_count_armed_at = datetime.now()  # sm#232
+                state.arm_stop_notify_skip()  # sm#232
                 self._cancel_pending_stop_notification(session_id)
                 state.stop_notify_sender_id = None
                 state.stop_notify_sender_name = None
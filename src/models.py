@@ -1,19 +1,36 @@
 """Data models for Claude Session Manager."""
 
-from dataclasses import dataclass, field
+from dataclasses import MISSING, dataclass, field, fields
 from datetime import datetime
 from enum import Enum
+from operator import itemgetter
 from typing import Optional, List
+import secrets
 import uuid
 
 
-class SessionStatus(Enum):
+class SessionStatus(str, Enum):
     """Session lifecycle status."""
     RUNNING = "running"  # Actively working
     IDLE = "idle"        # Waiting for input
     STOPPED = "stopped"  # Terminated
 
 
+# Persisted status values that no longer exist, mapped to their replacements
+_LEGACY_SESSION_STATUSES = {
+    "starting": "running",
+    "waiting_input": "idle",
+    "waiting_permission": "idle",
+    "error": "idle",  # Error state no longer exists, treat as idle
+}
+
+# Keys every persisted session carries; fetched in one C-level call by from_dict
+_SESSION_REQUIRED_KEYS = itemgetter(
+    "id", "name", "working_dir", "tmux_session", "log_file",
+    "status", "created_at", "last_activity",
+)
+
+
 class DeliveryMode(Enum):
     """Message delivery modes for sm send."""
     SEQUENTIAL = "sequential"
@@ -29,7 +46,7 @@ class DeliveryResult(Enum):
     FAILED = "failed"        # Message delivery failed
 
 
-class NotificationChannel(Enum):
+class NotificationChannel(str, Enum):
     """Available notification channels."""
     TELEGRAM = "telegram"
     EMAIL = "email"
@@ -287,10 +304,10 @@ class Subagent:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     """Represents a Claude Code session in tmux."""
-    id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    id: str = field(default_factory=lambda: secrets.token_hex(4))
     name: str = ""  # Internal identifier (auto-generated: claude-{id})
     working_dir: str = ""
     tmux_session: str = ""
@@ -460,6 +477,33 @@ class Session:
     @classmethod
     def from_dict(cls, data: dict) -> "Session":
         """Create session from dictionary."""
+        return cls(**cls._init_kwargs_from_dict(data))
+
+    @classmethod
+    def _from_dict_fast(cls, data: dict) -> "Session":
+        """Restore a persisted session without re-running __post_init__.
+
+        State written by to_dict already carries the derived name and
+        tmux_session, so the defaulting branches are skipped. Records missing
+        either field still go through the regular constructor.
+        """
+        kwargs = cls._init_kwargs_from_dict(data)
+        if not kwargs["name"] or not kwargs["tmux_session"]:
+            return cls(**kwargs)
+        session = cls.__new__(cls)
+        for name, value in kwargs.items():
+            setattr(session, name, value)
+        for runtime_field in _SESSION_RUNTIME_FIELDS:
+            if runtime_field.default is MISSING:
+                value = runtime_field.default_factory()
+            else:
+                value = runtime_field.default
+            setattr(session, runtime_field.name, value)
+        return session
+
+    @staticmethod
+    def _init_kwargs_from_dict(data: dict) -> dict:
+        """Map a persisted session dictionary to constructor keyword arguments."""
         subagents_data = data.get("subagents", [])
         subagents = [Subagent.from_dict(s) for s in subagents_data] if subagents_data else []
 
@@ -474,27 +518,25 @@ class Session:
         if completion_status is not None and isinstance(completion_status, str):
             completion_status = CompletionStatus(completion_status)
 
+        (
+            session_id, name, working_dir, tmux_session, log_file,
+            raw_status, created_at, last_activity,
+        ) = _SESSION_REQUIRED_KEYS(data)
+
         # Backward compatibility: map removed status values to current ones
-        raw_status = data["status"]
-        status_mapping = {
-            "starting": "running",
-            "waiting_input": "idle",
-            "waiting_permission": "idle",
-            "error": "idle",  # Error state no longer exists, treat as idle
-        }
-        mapped_status = status_mapping.get(raw_status, raw_status)
+        mapped_status = _LEGACY_SESSION_STATUSES.get(raw_status, raw_status)
 
-        return cls(
-            id=data["id"],
-            name=data["name"],
-            working_dir=data["working_dir"],
-            tmux_session=data["tmux_session"],
+        return dict(
+            id=session_id,
+            name=name,
+            working_dir=working_dir,
+            tmux_session=tmux_session,
             tmux_socket_name=data.get("tmux_socket_name"),
             provider=data.get("provider", "claude"),
-            log_file=data["log_file"],
+            log_file=log_file,
             status=SessionStatus(mapped_status),
-            created_at=datetime.fromisoformat(data["created_at"]),
-            last_activity=datetime.fromisoformat(data["last_activity"]),
+            created_at=datetime.fromisoformat(created_at),
+            last_activity=datetime.fromisoformat(last_activity),
             telegram_chat_id=data.get("telegram_chat_id"),
             telegram_thread_id=telegram_thread_id,
             error_message=data.get("error_message"),
@@ -556,7 +598,11 @@ class Session:
         )
 
 
-@dataclass
+# Runtime-only Session fields (init=False); _from_dict_fast resets them to defaults
+_SESSION_RUNTIME_FIELDS = tuple(f for f in fields(Session) if not f.init)
+
+
+@dataclass(slots=True)
 class NotificationEvent:
     """An event that should trigger a notification."""
     session_id: str
@@ -568,7 +614,7 @@ class NotificationEvent:
     review_result: Optional["ReviewResult"] = None  # Structured review data
 
 
-@dataclass
+@dataclass(slots=True)
 class UserInput:
     """Input received from user via Telegram or Email."""
     session_id: str
@@ -829,7 +875,7 @@ class CodexReviewRequestRegistration:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionDeliveryState:
     """Tracks delivery state for a session."""
     session_id: str
@@ -837,7 +883,7 @@ class SessionDeliveryState:
     last_idle_at: Optional[datetime] = None
     saved_user_input: Optional[str] = None  # Saved input during delivery
     pending_user_input: Optional[str] = None  # Currently detected input
-    pending_input_first_seen: Optional[datetime] = None  # When we first saw the pending input
+    pending_input_first_seen: Optional[float] = None  # time.monotonic() when we first saw the pending input
     stop_notify_sender_id: Optional[str] = None  # Sender to notify on Stop hook
     stop_notify_sender_name: Optional[str] = None  # Sender name for notification
     stop_notify_skip_count: int = 0  # Absorb /clear Stop hooks before firing notification
@@ -849,6 +895,29 @@ class SessionDeliveryState:
     paste_buffered_notify_sender_name: Optional[str] = None  # Sender name for the above (sm#244)
     stop_notify_delay_seconds: float = 0.0  # Delay spawn-armed stop notify so real dispatch can supersede it (#379)
 
+    def arm_stop_notify_skip(self, slots: int = 1) -> None:
+        """Arm the /clear skip fence to absorb ``slots`` more Stop hooks (#174, sm#232)."""
+        self.stop_notify_skip_count += slots
+        self.skip_count_armed_at = datetime.now()
+
+    def consume_stop_notify_skip(self) -> bool:
+        """Absorb one Stop hook if the fence has a slot left.
+
+        Check and decrement happen in one call, so no caller can observe a
+        positive count and then decrement a fence someone else already drained.
+        """
+        if self.stop_notify_skip_count <= 0:
+            return False
+        self.stop_notify_skip_count -= 1
+        if self.stop_notify_skip_count == 0:
+            self.skip_count_armed_at = None  # hygiene: clear when fence fully consumed
+        return True
+
+    def reset_stop_notify_skip(self) -> None:
+        """Drop the whole skip fence (e.g. when its arm time has gone stale)."""
+        self.stop_notify_skip_count = 0
+        self.skip_count_armed_at = None
+
 
 @dataclass
 class MonitorState:
@@ -22,6 +22,7 @@ import hmac
 import re
 import struct
 import termios
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
@@ -1208,8 +1209,7 @@ def _invalidate_session_cache(app: FastAPI, session_id: str, arm_skip: bool = Fa
             # 1 = /clear Stop hook only (agent idle → no in-flight prev-task hook)
             slots = 2 if agent_explicitly_running else 1
             state = queue_mgr._get_or_create_state(session_id)
-            state.stop_notify_skip_count += slots
-            state.skip_count_armed_at = datetime.now()  # sm#232
+            state.arm_stop_notify_skip(slots)  # sm#232
         else:
             state = queue_mgr.delivery_states.get(session_id)
         if state:
@@ -4850,7 +4850,7 @@ def create_app(
         )
         stop_event = asyncio.Event()
         counters = {"input_bytes": 0, "output_bytes": 0}
-        pending_client_frames: list[dict[str, Any]] = []
+        pending_client_frames: deque[dict[str, Any]] = deque()
         active = getattr(app.state, "mobile_terminal_active_attaches", {})
         if attach_id not in active or not _mobile_terminal_enabled():
             await websocket.send_json({
@@ -4900,7 +4900,7 @@ def create_app(
 
         async def receive_client_frame() -> dict[str, Any]:
             if pending_client_frames:
-                return pending_client_frames.pop(0)
+                return pending_client_frames.popleft()
             return await websocket.receive_json()
 
         async def wait_for_initial_resize() -> None:
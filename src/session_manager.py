@@ -20,6 +20,11 @@ from typing import Optional, Callable, Awaitable, Any
 
 import yaml
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is the fallback
+    orjson = None
+
 from .human_recipients import HumanRecipientConfigError, HumanRecipientRegistry
 from .models import (
     AgentRegistration,
@@ -121,6 +126,13 @@ INLINE_SECRET_PATTERN = re.compile(
 )
 
 
+def _encode_state(data: dict) -> bytes:
+    """Encode a state snapshot as indented JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2).encode()
+
+
 def _coerce_rollout_flag(value: Any, default: bool = True) -> bool:
     """Parse rollout config values robustly (supports bools and common string forms)."""
     if value is None:
@@ -156,6 +168,9 @@ class SessionManager:
         self.config = config or {}
         self.process_generation = uuid.uuid4().hex[:12]
         self._state_save_lock = threading.Lock()
+        # (payload, (st_ino, st_size, st_mtime_ns)) of the last snapshot written,
+        # so an unchanged snapshot over an untouched file can skip the rewrite.
+        self._last_saved_state: Optional[tuple[bytes, tuple[int, int, int]]] = None
         mq_timeouts = self.config.get("timeouts", {}).get("message_queue", {})
         self.input_delivery_wait_seconds = float(
             mq_timeouts.get("input_delivery_wait_seconds", 1.0)
@@ -790,7 +805,7 @@ class SessionManager:
                 )
                 continue
             cleaned_sessions.append(session_data)
-            session = Session.from_dict(session_data)
+            session = Session._from_dict_fast(session_data)
             if session.telegram_chat_id and session.telegram_thread_id:
                 key = (session.telegram_chat_id, session.telegram_thread_id)
                 if key not in self.telegram_topic_registry:
@@ -964,31 +979,56 @@ class SessionManager:
             ],
         }
 
+    def _state_file_unchanged(self, state_path: Path, payload: bytes) -> bool:
+        """True if state_path still holds exactly the last payload this manager wrote."""
+        last = self._last_saved_state
+        if last is None or last[0] != payload:
+            return False
+        try:
+            st = state_path.stat()
+        except OSError:
+            return False
+        return (st.st_ino, st.st_size, st.st_mtime_ns) == last[1]
+
     def _write_state_snapshot(self, data: dict) -> bool:
         temp_file: Optional[Path] = None
-        with self._state_save_lock:
-            try:
+        try:
+            # Encode before taking the lock: serialization is the expensive part
+            # and touches only this caller's snapshot, so concurrent savers
+            # contend only for the write + rename.
+            payload = _encode_state(data)
+
+            with self._state_save_lock:
                 state_path = Path(self.state_file)
+                if self._state_file_unchanged(state_path, payload):
+                    return True
+
                 temp_file = state_path.with_name(
                     f"{state_path.name}.tmp.{os.getpid()}.{threading.get_ident()}"
                 )
 
-                with open(temp_file, "w") as f:
-                    json.dump(data, f, indent=2)
+                with open(temp_file, "wb") as f:
+                    f.write(payload)
+                    f.flush()
+                    written = os.fstat(f.fileno())
 
                 # Atomic replace (POSIX guarantees atomicity).
                 temp_file.replace(state_path)
+                self._last_saved_state = (
+                    payload,
+                    (written.st_ino, written.st_size, written.st_mtime_ns),
+                )
                 return True
 
-            except Exception as e:
-                logger.error(f"CRITICAL: Failed to save state to {self.state_file}: {e}")
-                logger.error(f"Session state NOT persisted! Data may be lost on restart.")
-                try:
-                    if temp_file is not None and temp_file.exists():
-                        temp_file.unlink()
-                except Exception:
-                    pass
-                return False
+        except Exception as e:
+            logger.error(f"CRITICAL: Failed to save state to {self.state_file}: {e}")
+            logger.error("Session state NOT persisted! Data may be lost on restart.")
+            try:
+                if temp_file is not None and temp_file.exists():
+                    temp_file.unlink()
+            except Exception:
+                pass
+            return False
 
     def _save_state(self) -> bool:
         """
@@ -79,7 +79,7 @@ class TestSessionLifecycle:
         # Verify session was created
         assert session is not None
         assert session.id is not None
-        assert len(session.id) == 8  # UUID hex[:8]
+        assert len(session.id) == 8  # 4 random bytes, hex-encoded
         assert session.name == f"claude-{session.id}"
         assert session.tmux_session == f"claude-{session.id}"
         assert session.working_dir == "/tmp/test-workspace"
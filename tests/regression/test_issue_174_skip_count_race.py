@@ -17,6 +17,7 @@ from src.models import SessionDeliveryState, Session, SessionStatus
 from src.message_queue import MessageQueueManager
 from src.cli.commands import cmd_clear
 from src.cli.client import SessionManagerClient
+from src.server import _invalidate_session_cache
 
 
 def noop_create_task(coro):
@@ -33,8 +34,6 @@ def noop_create_task(coro):
 @pytest.fixture
 def app_with_state():
     """Create a mock FastAPI app with state fields for _invalidate_session_cache."""
-    from src.server import _invalidate_session_cache
-
     app = Mock()
     app.state.last_claude_output = {}
     app.state.pending_stop_notifications = set()
@@ -115,8 +114,6 @@ def test_race_scenario_skip_count_absorbs_late_clear_hook(app_with_state, messag
     3. Late /clear Stop hook fires mark_session_idle(from_stop_hook=True) → absorbed
     4. Task B Stop hook fires mark_session_idle(from_stop_hook=True) → notification sent
     """
-    from src.server import _invalidate_session_cache
-
     app, _ = app_with_state
     session_id = "engineer-174"
 
@@ -173,8 +170,6 @@ def test_happy_path_skip_count_consumed_before_send(app_with_state, message_queu
     skip_count is consumed by the /clear hook, then sm send sets sender_id,
     and task B hook fires the notification normally.
     """
-    from src.server import _invalidate_session_cache
-
     app, _ = app_with_state
     session_id = "engineer-happy"
 
@@ -223,8 +218,6 @@ def test_skip_count_consumed_even_without_pending_notification(app_with_state, m
     When skip_count > 0 but stop_notify_sender_id is None, skip_count is still
     decremented and no spurious notification is sent.
     """
-    from src.server import _invalidate_session_cache
-
     app, _ = app_with_state
     session_id = "engineer-no-sender"
 
@@ -261,8 +254,6 @@ def test_sequential_delivery_does_not_consume_skip_count(app_with_state, message
     without from_stop_hook. That call must NOT consume skip_count, otherwise the
     real /clear Stop hook will slip through and steal stop_notify_sender_id.
     """
-    from src.server import _invalidate_session_cache
-
     app, _ = app_with_state
     session_id = "engineer-seq-race"
 
@@ -319,8 +310,6 @@ def test_arm_skip_false_does_not_increment_skip_count(app_with_state):
     Calling _invalidate_session_cache with arm_skip=False (default, e.g. /clear
     endpoint for codex-app) does NOT increment stop_notify_skip_count.
     """
-    from src.server import _invalidate_session_cache
-
     app, queue_mgr = app_with_state
     session_id = "codex-app-001"
 
@@ -339,8 +328,6 @@ def test_arm_skip_true_increments_skip_count(app_with_state):
     Calling _invalidate_session_cache with arm_skip=True (/invalidate-cache
     endpoint, tmux CLI path) DOES increment stop_notify_skip_count.
     """
-    from src.server import _invalidate_session_cache
-
     app, queue_mgr = app_with_state
     session_id = "tmux-agent-001"
 
@@ -355,8 +342,6 @@ def test_arm_skip_true_creates_state_if_absent(app_with_state):
     arm_skip=True creates delivery state via _get_or_create_state if it doesn't
     exist yet (closes the state-missing gap).
     """
-    from src.server import _invalidate_session_cache
-
     app, queue_mgr = app_with_state
     session_id = "new-session-no-state"
 
@@ -372,8 +357,6 @@ def test_arm_skip_false_does_not_create_state(app_with_state):
     """
     arm_skip=False (default) does NOT create delivery state if absent.
     """
-    from src.server import _invalidate_session_cache
-
     app, queue_mgr = app_with_state
     session_id = "absent-session"
 
@@ -394,8 +377,6 @@ def test_consecutive_clears_increment_skip_count(app_with_state, message_queue):
     Two consecutive sm clear calls should set skip_count=2, absorbing
     two /clear Stop hooks correctly.
     """
-    from src.server import _invalidate_session_cache
-
     app, _ = app_with_state
     session_id = "engineer-double-clear"
 
@@ -512,8 +493,6 @@ def test_invalidate_still_clears_stop_notify_sender(app_with_state):
     Regression for #167: _invalidate_session_cache (both arm_skip=True and
     arm_skip=False) still clears stop_notify_sender_id and sender_name.
     """
-    from src.server import _invalidate_session_cache
-
     app, queue_mgr = app_with_state
     session_id = "regression-167"
 
@@ -530,8 +509,6 @@ def test_invalidate_still_clears_stop_notify_sender(app_with_state):
 
 def test_invalidate_arm_skip_also_clears_sender(app_with_state):
     """arm_skip=True also clears sender fields (in addition to arming skip)."""
-    from src.server import _invalidate_session_cache
-
     app, queue_mgr = app_with_state
     session_id = "arm-skip-sender"
 
@@ -7,11 +7,10 @@ messages mid-turn once tool calls begin.
 
 import pytest
 import asyncio
-from datetime import datetime
 from unittest.mock import MagicMock, AsyncMock, patch
 
 from src.message_queue import MessageQueueManager
-from src.models import SessionDeliveryState, SessionStatus
+from src.models import Session, SessionDeliveryState, SessionStatus
 
 
 @pytest.fixture
@@ -25,28 +24,33 @@ def mock_session_manager():
 
 
 @pytest.fixture
-def mq(mock_session_manager, tmp_path):
-    return MessageQueueManager(
+def mq(mock_session_manager):
+    mq = MessageQueueManager(
         session_manager=mock_session_manager,
-        db_path=str(tmp_path / "test_mq.db"),
+        db_path=":memory:",
         config={
             "sm_send": {"input_poll_interval": 1, "input_stale_timeout": 30},
             "timeouts": {"message_queue": {"subprocess_timeout_seconds": 1}},
         },
         notifier=None,
     )
+    # No user input pending on the target pane in any of these scenarios
+    mq._get_pending_user_input_async = AsyncMock(return_value=None)
+    yield mq
+    mq._db_conn.close()
 
 
 def _make_session(session_id="target183", provider="claude"):
-    s = MagicMock()
-    s.id = session_id
-    s.provider = provider
-    s.tmux_session = f"tmux-{session_id}"
-    s.friendly_name = "test-agent"
-    s.name = "claude-agent"
-    s.status = SessionStatus.RUNNING
-    s.last_activity = datetime.now()
-    return s
+    # A real (slotted) Session: cheaper to build than a mock, and assigning an
+    # attribute the model doesn't have fails loudly.
+    return Session(
+        id=session_id,
+        provider=provider,
+        tmux_session=f"tmux-{session_id}",
+        friendly_name="test-agent",
+        name="claude-agent",
+        status=SessionStatus.RUNNING,
+    )
 
 
 class TestPreToolUseClearsStaleIdle:
@@ -63,7 +67,7 @@ class TestPreToolUseClearsStaleIdle:
 
         assert state.is_idle is False
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_important_delivers_regardless_of_is_idle(self, mq, mock_session_manager):
         """sm#244: Important delivery proceeds even when is_idle=False (no idle gate)."""
         session = _make_session()
@@ -75,7 +79,6 @@ class TestPreToolUseClearsStaleIdle:
         mq.mark_session_active("target183")
 
         mq.queue_message("target183", "Hello", delivery_mode="important")
-        mq._get_pending_user_input_async = AsyncMock(return_value=None)
 
         # No idle gate — delivery proceeds (message buffers in tty if mid-turn)
         await mq._try_deliver_messages("target183", important_only=True)
@@ -83,7 +86,7 @@ class TestPreToolUseClearsStaleIdle:
         mock_session_manager._deliver_direct.assert_called_once()
         assert mq.get_queue_length("target183") == 0
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_sequential_delivers_regardless_of_is_idle(self, mq, mock_session_manager):
         """sm#244: Sequential delivery proceeds even when is_idle=False (no idle gate)."""
         session = _make_session()
@@ -94,7 +97,6 @@ class TestPreToolUseClearsStaleIdle:
         mq.mark_session_active("target183")
 
         mq.queue_message("target183", "Hello", delivery_mode="sequential")
-        mq._get_pending_user_input_async = AsyncMock(return_value=None)
 
         await mq._try_deliver_messages("target183")
 
@@ -105,7 +107,7 @@ class TestPreToolUseClearsStaleIdle:
 class TestIdleDeliveryUnaffected:
     """Regression: delivery to genuinely idle agents still works."""
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_important_delivers_when_idle(self, mq, mock_session_manager):
         """Important message delivers immediately when is_idle=True (genuine)."""
         session = _make_session()
@@ -116,14 +118,13 @@ class TestIdleDeliveryUnaffected:
         state.is_idle = True
 
         mq.queue_message("target183", "Important msg", delivery_mode="important")
-        mq._get_pending_user_input_async = AsyncMock(return_value=None)
 
         await mq._try_deliver_messages("target183", important_only=True)
 
         mock_session_manager._deliver_direct.assert_called_once()
         assert mq.get_queue_length("target183") == 0
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_sequential_delivers_when_idle(self, mq, mock_session_manager):
         """Sequential message delivers when is_idle=True (genuine)."""
         session = _make_session()
@@ -133,7 +134,6 @@ class TestIdleDeliveryUnaffected:
         state.is_idle = True
 
         mq.queue_message("target183", "Sequential msg", delivery_mode="sequential")
-        mq._get_pending_user_input_async = AsyncMock(return_value=None)
 
         await mq._try_deliver_messages("target183")
 
@@ -144,7 +144,7 @@ class TestIdleDeliveryUnaffected:
 class TestStopHookResetsIdle:
     """Stop hook → mark_session_idle sets is_idle and schedules delivery."""
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_direct_delivery_and_stop_hook_marks_idle(self, mq, mock_session_manager):
         """sm#244: Sequential message delivers immediately; stop hook marks idle."""
         session = _make_session()
@@ -152,7 +152,6 @@ class TestStopHookResetsIdle:
 
         mq.queue_message("target183", "Direct msg", delivery_mode="sequential")
         mq.mark_session_active("target183")
-        mq._get_pending_user_input_async = AsyncMock(return_value=None)
 
         # Direct delivery: no idle gate — proceeds immediately
         await mq._try_deliver_messages("target183")
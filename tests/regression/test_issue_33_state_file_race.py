@@ -8,6 +8,7 @@ import pytest
 import json
 import asyncio
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import Mock
 
@@ -51,20 +52,19 @@ def test_concurrent_save_state_no_corruption(session_manager, temp_state_file):
         )
         session_manager.sessions[session.id] = session
 
-    # Call _save_state concurrently from multiple threads
-    def save_state_multiple_times():
-        for _ in range(10):
-            session_manager._save_state()
+    # Call _save_state concurrently from multiple threads. The barrier
+    # releases every thread into its first save together, so the writes
+    # genuinely contend instead of running one after another.
+    thread_count = 5
+    barrier = threading.Barrier(thread_count)
 
-    threads = []
-    for _ in range(5):  # 5 threads
-        thread = threading.Thread(target=save_state_multiple_times)
-        threads.append(thread)
-        thread.start()
+    def save_state_multiple_times(_):
+        barrier.wait()
+        for _ in range(3):
+            session_manager._save_state()
 
-    # Wait for all threads to complete
-    for thread in threads:
-        thread.join()
+    with ThreadPoolExecutor(max_workers=thread_count) as pool:
+        list(pool.map(save_state_multiple_times, range(thread_count)))
 
     # Verify the state file is valid JSON and contains all sessions
     state_path = Path(temp_state_file)
@@ -104,12 +104,8 @@ def test_atomic_write_no_partial_file(session_manager, temp_state_file):
     assert not temp_file.exists(), "Temp file should be cleaned up after rename"
 
 
-def test_temp_file_cleanup_on_error(session_manager, temp_state_file):
+def test_temp_file_cleanup_on_error(monkeypatch, session_manager, temp_state_file):
     """Test that temp file is cleaned up if an error occurs during write."""
-    import tempfile
-
-    # Add a session with data that will cause an error during serialization
-    # (We'll mock json.dump to raise an error)
     session = Session(
         id="test-1",
         tmux_session="tmux-1",
@@ -118,25 +114,131 @@ def test_temp_file_cleanup_on_error(session_manager, temp_state_file):
     )
     session_manager.sessions[session.id] = session
 
-    # Mock json.dump to raise an error
+    # Fail after the temp file has been written, at the atomic rename
+    def failing_replace(self, target):
+        raise OSError("Simulated rename failure")
+
+    monkeypatch.setattr(Path, "replace", failing_replace)
+
+    # This should fail but not leave a temp file
+    assert session_manager._save_state() is False
+
+    leftovers = list(Path(temp_state_file).parent.glob("sessions.json.tmp*"))
+    assert leftovers == [], "Temp file should be cleaned up on error"
+
+
+def test_serialization_error_leaves_state_file_untouched(monkeypatch, session_manager, temp_state_file):
+    """A failing encoder aborts the save before any file is created."""
     import src.session_manager
-    original_json_dump = src.session_manager.json.dump
 
-    def failing_json_dump(*args, **kwargs):
+    session_manager.sessions["test-1"] = Session(
+        id="test-1",
+        tmux_session="tmux-1",
+        working_dir="/tmp",
+        status=SessionStatus.RUNNING
+    )
+    before = Path(temp_state_file).read_bytes()
+
+    def failing_encode_state(*args, **kwargs):
         raise ValueError("Simulated serialization error")
 
-    src.session_manager.json.dump = failing_json_dump
+    monkeypatch.setattr(src.session_manager, "_encode_state", failing_encode_state)
 
-    try:
-        # This should fail but not leave a temp file
-        session_manager._save_state()
+    assert session_manager._save_state() is False
+    assert Path(temp_state_file).read_bytes() == before
+    assert list(Path(temp_state_file).parent.glob("sessions.json.tmp*")) == []
 
-        # Verify temp file was cleaned up
-        temp_file = Path(temp_state_file).with_suffix('.tmp')
-        assert not temp_file.exists(), "Temp file should be cleaned up on error"
-    finally:
-        # Restore original json.dump
-        src.session_manager.json.dump = original_json_dump
+
+def test_state_encoded_outside_save_lock(monkeypatch, session_manager, temp_state_file):
+    """Serialization runs before the save lock is taken; only write + rename hold it."""
+    import src.session_manager
+
+    lock_held_during_encode = []
+    original_encode_state = src.session_manager._encode_state
+
+    def recording_encode_state(data):
+        lock_held_during_encode.append(session_manager._state_save_lock.locked())
+        return original_encode_state(data)
+
+    monkeypatch.setattr(src.session_manager, "_encode_state", recording_encode_state)
+
+    assert session_manager._save_state() is True
+    assert lock_held_during_encode == [False]
+
+
+def test_unchanged_snapshot_skips_rewrite(monkeypatch, session_manager, temp_state_file):
+    """Saving an identical snapshot over the file we last wrote is a no-op."""
+    session_manager.sessions["test-1"] = Session(
+        id="test-1",
+        tmux_session="tmux-1",
+        working_dir="/tmp",
+        status=SessionStatus.RUNNING
+    )
+    assert session_manager._save_state() is True
+
+    replace_calls = []
+    original_replace = Path.replace
+
+    def counting_replace(self, target):
+        replace_calls.append(target)
+        return original_replace(self, target)
+
+    monkeypatch.setattr(Path, "replace", counting_replace)
+
+    assert session_manager._save_state() is True
+    assert replace_calls == []
+
+    session_manager.sessions["test-1"].friendly_name = "renamed"
+    assert session_manager._save_state() is True
+    assert len(replace_calls) == 1
+
+
+def test_unchanged_snapshot_rewritten_when_file_changed_externally(session_manager, temp_state_file):
+    """The skip only applies while the file is still the one this manager wrote."""
+    session_manager.sessions["test-1"] = Session(
+        id="test-1",
+        tmux_session="tmux-1",
+        working_dir="/tmp",
+        status=SessionStatus.RUNNING
+    )
+    assert session_manager._save_state() is True
+    expected = Path(temp_state_file).read_bytes()
+
+    Path(temp_state_file).unlink()
+    assert session_manager._save_state() is True
+    assert Path(temp_state_file).read_bytes() == expected
+
+    Path(temp_state_file).write_text('{"sessions": []}')
+    assert session_manager._save_state() is True
+    assert Path(temp_state_file).read_bytes() == expected
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_backends_write_identical_state(monkeypatch, session_manager, temp_state_file, use_orjson):
+    """orjson (fast-json extra) and stdlib json persist the same state."""
+    import src.session_manager
+
+    if not use_orjson:
+        monkeypatch.setattr(src.session_manager, "orjson", None)
+    elif src.session_manager.orjson is None:
+        pytest.skip("orjson not installed")
+
+    session = Session(
+        id="test-1",
+        tmux_session="tmux-1",
+        working_dir="/tmp",
+        status=SessionStatus.RUNNING,
+        friendly_name="caf\u00e9",
+    )
+    session_manager.sessions[session.id] = session
+
+    assert session_manager._save_state() is True
+
+    with open(temp_state_file, "r") as f:
+        data = json.load(f)
+
+    assert data == json.loads(json.dumps(session_manager._build_state_snapshot()))
+    assert data["sessions"][0]["friendly_name"] == "caf\u00e9"
 
 
 @pytest.mark.asyncio
@@ -433,6 +433,7 @@ async def test_monitor_loop_restarts_on_error(tmp_path):
             return []
 
     queue_mgr._get_sessions_with_pending = mock_get_pending
+    queue_mgr._monitor_wake.set()  # Idle monitor waits for queued work
 
     # Wait for errors and recovery (need time for 2 errors + backoff + recovery)
     # Error 1: 1s backoff, Error 2: 2s backoff, then success
@@ -466,6 +467,7 @@ async def test_monitor_loop_gives_up_after_max_retries(tmp_path, caplog):
         raise RuntimeError("Persistent error")
 
     queue_mgr._get_sessions_with_pending = always_fail
+    queue_mgr._monitor_wake.set()  # Idle monitor waits for queued work
 
     # Mock asyncio.sleep so exponential backoff runs instantly.
     # We use the real asyncio.sleep(0) inside so the event loop still switches
@@ -514,6 +516,7 @@ async def test_monitor_loop_exponential_backoff(tmp_path, caplog):
         return []
 
     queue_mgr._get_sessions_with_pending = fail_then_succeed
+    queue_mgr._monitor_wake.set()  # Idle monitor waits for queued work
 
     with caplog.at_level("WARNING"):
         await asyncio.sleep(5)
@@ -557,9 +560,10 @@ async def test_monitor_loop_resets_retry_count_on_success(tmp_path):
         # Fail on calls 1, 4, 7 (never consecutively)
         if call_count in (1, 4, 7):
             raise RuntimeError(f"Intermittent error {call_count}")
-        return []
+        return ["pending-session"]  # Keep the loop polling between failures
 
     queue_mgr._get_sessions_with_pending = intermittent_failure
+    queue_mgr._monitor_wake.set()  # Idle monitor waits for queued work
 
     await asyncio.sleep(2)  # Shorter wait with faster retries
     await queue_mgr.stop()
@@ -592,6 +596,7 @@ async def test_monitor_loop_logs_critical_on_error(tmp_path, caplog):
         return []
 
     queue_mgr._get_sessions_with_pending = fail_once
+    queue_mgr._monitor_wake.set()  # Idle monitor waits for queued work
 
     with caplog.at_level("ERROR"):
         await asyncio.sleep(0.3)
@@ -217,7 +217,7 @@ class TestHelperFunctions:
 class TestPreToolUseHook:
     """Test PreToolUse hook auto-lock acquisition."""
 
-    def test_edit_tool_acquires_lock(self, test_client, session_manager, tmp_path):
+    def test_edit_tool_acquires_lock(self, test_client, session_manager, tmp_path, monkeypatch):
         """Edit tool should trigger lock acquisition."""
         # Create session
         session = Session(id="test", working_dir=str(tmp_path))
@@ -227,24 +227,25 @@ class TestPreToolUseHook:
         git_dir = tmp_path / ".git"
         git_dir.mkdir()
 
+        monkeypatch.setattr("src.lock_manager.get_git_root", lambda file_path: str(tmp_path))
+
         # Send PreToolUse hook for Edit
-        with patch("src.lock_manager.get_git_root", return_value=str(tmp_path)):
-            response = test_client.post(
-                "/hooks/tool-use",
-                json={
-                    "session_manager_id": "test",
-                    "hook_event_name": "PreToolUse",
-                    "tool_name": "Edit",
-                    "tool_input": {"file_path": str(tmp_path / "test.py")},
-                    "cwd": str(tmp_path),
-                }
-            )
+        response = test_client.post(
+            "/hooks/tool-use",
+            json={
+                "session_manager_id": "test",
+                "hook_event_name": "PreToolUse",
+                "tool_name": "Edit",
+                "tool_input": {"file_path": str(tmp_path / "test.py")},
+                "cwd": str(tmp_path),
+            }
+        )
 
         assert response.status_code == 200
         # Session should have tracked the repo
         assert str(tmp_path) in session.touched_repos
 
-    def test_write_tool_acquires_lock(self, test_client, session_manager, tmp_path):
+    def test_write_tool_acquires_lock(self, test_client, session_manager, tmp_path, monkeypatch):
         """Write tool should trigger lock acquisition."""
         session = Session(id="test", working_dir=str(tmp_path))
         session_manager.sessions["test"] = session
@@ -252,22 +253,22 @@ class TestPreToolUseHook:
         git_dir = tmp_path / ".git"
         git_dir.mkdir()
 
-        with patch("src.lock_manager.get_git_root", return_value=str(tmp_path)):
-            response = test_client.post(
-                "/hooks/tool-use",
-                json={
-                    "session_manager_id": "test",
-                    "hook_event_name": "PreToolUse",
-                    "tool_name": "Write",
-                    "tool_input": {"file_path": str(tmp_path / "new.py")},
-                    "cwd": str(tmp_path),
-                }
-            )
+        monkeypatch.setattr("src.lock_manager.get_git_root", lambda file_path: str(tmp_path))
+        response = test_client.post(
+            "/hooks/tool-use",
+            json={
+                "session_manager_id": "test",
+                "hook_event_name": "PreToolUse",
+                "tool_name": "Write",
+                "tool_input": {"file_path": str(tmp_path / "new.py")},
+                "cwd": str(tmp_path),
+            }
+        )
 
         assert response.status_code == 200
         assert str(tmp_path) in session.touched_repos
 
-    def test_lock_error_returned_when_locked_by_other(self, test_client, session_manager, tmp_path):
+    def test_lock_error_returned_when_locked_by_other(self, test_client, session_manager, tmp_path, monkeypatch):
         """Hook should return error when repo is locked by another session."""
         # Create two sessions
         session1 = Session(id="session1", working_dir=str(tmp_path), friendly_name="Engineer")
@@ -278,31 +279,31 @@ class TestPreToolUseHook:
         git_dir = tmp_path / ".git"
         git_dir.mkdir()
 
+        monkeypatch.setattr("src.lock_manager.get_git_root", lambda file_path: str(tmp_path))
+
         # Session1 acquires lock
-        with patch("src.lock_manager.get_git_root", return_value=str(tmp_path)):
-            test_client.post(
-                "/hooks/tool-use",
-                json={
-                    "session_manager_id": "session1",
-                    "hook_event_name": "PreToolUse",
-                    "tool_name": "Edit",
-                    "tool_input": {"file_path": str(tmp_path / "test.py")},
-                    "cwd": str(tmp_path),
-                }
-            )
+        test_client.post(
+            "/hooks/tool-use",
+            json={
+                "session_manager_id": "session1",
+                "hook_event_name": "PreToolUse",
+                "tool_name": "Edit",
+                "tool_input": {"file_path": str(tmp_path / "test.py")},
+                "cwd": str(tmp_path),
+            }
+        )
 
         # Session2 tries to acquire - should get error
-        with patch("src.lock_manager.get_git_root", return_value=str(tmp_path)):
-            response = test_client.post(
-                "/hooks/tool-use",
-                json={
-                    "session_manager_id": "session2",
-                    "hook_event_name": "PreToolUse",
-                    "tool_name": "Edit",
-                    "tool_input": {"file_path": str(tmp_path / "test.py")},
-                    "cwd": str(tmp_path),
-                }
-            )
+        response = test_client.post(
+            "/hooks/tool-use",
+            json={
+                "session_manager_id": "session2",
+                "hook_event_name": "PreToolUse",
+                "tool_name": "Edit",
+                "tool_input": {"file_path": str(tmp_path / "test.py")},
+                "cwd": str(tmp_path),
+            }
+        )
 
         data = response.json()
         assert data["status"] == "error"
@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+
+SCRIPT_PATH = (
+    Path(__file__).resolve().parents[2]
+    / "scripts"
+    / "cleanup_duplicate_topics.py"
+)
+SPEC = importlib.util.spec_from_file_location("cleanup_duplicate_topics", SCRIPT_PATH)
+assert SPEC and SPEC.loader
+cleanup_script = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = cleanup_script
+SPEC.loader.exec_module(cleanup_script)
+
+
+def _write_log(path: Path, lines: list[str]) -> Path:
+    path.write_text("".join(f"{line}\n" for line in lines))
+    return path
+
+
+def test_extract_thread_ids_returns_matches_in_log_order(tmp_path: Path) -> None:
+    log = _write_log(
+        tmp_path / "sm.log",
+        [
+            "2026-01-01 - INFO - Server started",
+            "2026-01-01 - INFO - Auto-created topic for session c1d607d3: chat=-1001, thread=10",
+            "2026-01-01 - INFO - Auto-created topic for session deadbeef: chat=-1001, thread=99",
+            "2026-01-01 - INFO - Auto-created topic for session c1d607d3: chat=-1001, thread=11",
+        ],
+    )
+
+    assert cleanup_script.extract_thread_ids(str(log), "c1d607d3") == [(-1001, 10), (-1001, 11)]
+
+
+def test_extract_thread_ids_ignores_non_utf8_noise(tmp_path: Path) -> None:
+    log = tmp_path / "sm.log"
+    log.write_bytes(
+        b"\xff\xfe garbage line\n"
+        b"INFO - Auto-created topic for session c1d607d3: chat=-42, thread=7\n"
+    )
+
+    assert cleanup_script.extract_thread_ids(str(log), "c1d607d3") == [(-42, 7)]
+
+
+def test_extract_thread_ids_escapes_session_id(tmp_path: Path) -> None:
+    log = _write_log(
+        tmp_path / "sm.log",
+        ["INFO - Auto-created topic for session abcXdef: chat=-1, thread=2"],
+    )
+
+    assert cleanup_script.extract_thread_ids(str(log), "abc.def") == []
+
+
+def test_extract_thread_ids_tail_bytes_skips_head_and_partial_line(tmp_path: Path) -> None:
+    early = "INFO - Auto-created topic for session c1d607d3: chat=-1, thread=1\n"
+    late = "INFO - Auto-created topic for session c1d607d3: chat=-1, thread=2\n"
+    log = tmp_path / "sm.log"
+    log.write_text(early + "x" * 1000 + "\n" + late)
+
+    # Window starts mid-way through the padding line, which must be discarded.
+    tail = len(late) + 10
+    assert cleanup_script.extract_thread_ids(str(log), "c1d607d3", tail_bytes=tail) == [(-1, 2)]
+    assert cleanup_script.extract_thread_ids(str(log), "c1d607d3", tail_bytes=0) == [(-1, 1), (-1, 2)]
+
+
+def test_extract_thread_ids_tail_bytes_on_line_start_keeps_line(tmp_path: Path) -> None:
+    line = "INFO - Auto-created topic for session c1d607d3: chat=-1, thread=2\n"
+    log = tmp_path / "sm.log"
+    log.write_text("INFO - heartbeat\n" + line)
+
+    assert cleanup_script.extract_thread_ids(str(log), "c1d607d3", tail_bytes=len(line)) == [(-1, 2)]
+
+
+def test_extract_thread_ids_parallel_scan_matches_serial(tmp_path: Path, monkeypatch) -> None:
+    lines = []
+    for i in range(200):
+        lines.append(f"INFO - heartbeat {i}")
+        if i % 7 == 0:
+            lines.append(f"INFO - Auto-created topic for session c1d607d3: chat=-5, thread={i}")
+    log = _write_log(tmp_path / "sm.log", lines)
+    serial = cleanup_script.extract_thread_ids(str(log), "c1d607d3")
+
+    monkeypatch.setattr(cleanup_script, "PARALLEL_SCAN_MIN_BYTES", 0)
+    parallel = cleanup_script.extract_thread_ids(str(log), "c1d607d3", workers=4)
+
+    assert parallel == serial
+    assert len(serial) == 29
+
+
+def test_split_on_lines_edges_fall_on_line_starts(tmp_path: Path) -> None:
+    log = _write_log(tmp_path / "sm.log", ["a" * 10, "b" * 10, "c" * 10])
+    size = log.stat().st_size
+
+    ranges = cleanup_script._split_on_lines(str(log), 0, size, 3)
+
+    data = log.read_bytes()
+    assert ranges[0][0] == 0 and ranges[-1][1] == size
+    for start, end in ranges:
+        assert start == 0 or data[start - 1:start] == b"\n"
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(ranges, ranges[1:]))
+
+
+def test_parse_topic_line_handles_crlf_and_rejects_garbage() -> None:
+    assert cleanup_script._parse_topic_line(
+        b"INFO - Auto-created topic for session c1d607d3: chat=-100, thread=55\r\n"
+    ) == ("c1d607d3", -100, 55)
+    assert cleanup_script._parse_topic_line(
+        b"INFO - Auto-created topic for session c1d607d3: chat=-100\n"
+    ) is None
+    assert cleanup_script._parse_topic_line(
+        b"INFO - Auto-created topic for session c1d607d3: chat=abc, thread=1\n"
+    ) is None
+
+
+def test_parse_topic_line_ignores_text_after_thread_id() -> None:
+    assert cleanup_script._parse_topic_line(
+        b"INFO - Auto-created topic for session c1d607d3: chat=-1, thread=2 (name=x)\n"
+    ) == ("c1d607d3", -1, 2)
+    assert cleanup_script._parse_topic_line(
+        b"INFO - Auto-created topic for session c1d607d3: chat=-1, thread=x2\n"
+    ) is None
+
+
+def test_extract_thread_ids_regex_and_splitter_agree(tmp_path: Path) -> None:
+    log = _write_log(
+        tmp_path / "sm.log",
+        [
+            "INFO - Auto-created topic for session c1d607d3: chat=-1001, thread=10",
+            "INFO - Auto-created topic for session c1d607d3x: chat=-1001, thread=11",
+            "INFO - Auto-created topic for session c1d607d3: chat=-1001, thread=12",
+        ],
+    )
+
+    fast = cleanup_script.extract_thread_ids(str(log), "c1d607d3")
+    slow = cleanup_script.extract_thread_ids(str(log), "c1d607d3", use_regex=True)
+
+    assert fast == slow == [(-1001, 10), (-1001, 12)]
+
+
+@pytest.mark.parametrize("use_regex", [False, True], ids=["splitter", "regex"])
+def test_scan_range_matches_in_process_scan(tmp_path: Path, use_regex: bool) -> None:
+    log = _write_log(
+        tmp_path / "sm.log",
+        [
+            "INFO - heartbeat",
+            "INFO - Auto-created topic for session c1d607d3: chat=-1001, thread=10 (retry)",
+            "INFO - Auto-created topic for session c1d607d3x: chat=-1001, thread=11",
+            "INFO - Auto-created topic for session c1d607d3: chat=-1001, thread=12",
+        ],
+    )
+    size = log.stat().st_size
+
+    matches = cleanup_script._scan_range(str(log), ("c1d607d3",), 0, size, use_regex)
+
+    assert matches == [("c1d607d3", -1001, 10), ("c1d607d3", -1001, 12)]
+
+
+class FakeBot:
+    def __init__(self, token: str, request=None) -> None:
+        self.token = token
+        self.request = request
+        self.calls: list[tuple[int, int]] = []
+        self.shutdown_called = False
+        FakeBot.instance = self
+
+    async def delete_forum_topic(self, chat_id: int, message_thread_id: int) -> bool:
+        from telegram.error import BadRequest, RetryAfter
+
+        self.calls.append((chat_id, message_thread_id))
+        if message_thread_id == 2 and self.calls.count((chat_id, 2)) == 1:
+            raise RetryAfter(0)
+        if message_thread_id == 3:
+            raise BadRequest("TOPIC_ID_INVALID")
+        if message_thread_id == 4:
+            raise BadRequest("Chat not found")
+        return True
+
+    async def shutdown(self) -> None:
+        self.shutdown_called = True
+
+
+async def test_delete_topics_retries_rate_limits_and_counts_results(monkeypatch) -> None:
+    import telegram
+
+    monkeypatch.setattr(telegram, "Bot", FakeBot)
+    monkeypatch.setattr(cleanup_script, "MAX_DELETES_PER_SECOND", 10_000)
+    monkeypatch.setattr(cleanup_script, "PER_CHAT_DELETES_PER_MINUTE", 0)
+
+    deleted, failed = await cleanup_script.delete_topics(
+        "token", [(-1, 1), (-1, 2), (-1, 3), (-1, 4)]
+    )
+
+    bot = FakeBot.instance
+    assert (deleted, failed) == (3, 1)
+    assert bot.calls.count((-1, 2)) == 2
+    assert bot.shutdown_called
+
+
+class FlakyNetworkBot(FakeBot):
+    async def delete_forum_topic(self, chat_id: int, message_thread_id: int) -> bool:
+        from telegram.error import NetworkError
+
+        self.calls.append((chat_id, message_thread_id))
+        # Thread 1 recovers on its third attempt; thread 2 never does.
+        if message_thread_id == 2 or self.calls.count((chat_id, 1)) < 3:
+            raise NetworkError("connection reset")
+        return True
+
+
+async def test_delete_topics_backs_off_on_network_errors(monkeypatch) -> None:
+    import telegram
+
+    monkeypatch.setattr(telegram, "Bot", FlakyNetworkBot)
+    monkeypatch.setattr(cleanup_script, "MAX_DELETES_PER_SECOND", 10_000)
+    monkeypatch.setattr(cleanup_script, "NETWORK_BACKOFF_SECONDS", 0)
+
+    deleted, failed = await cleanup_script.delete_topics(
+        "token", [(-1, 1), (-1, 2)], per_chat_per_minute=0
+    )
+
+    bot = FlakyNetworkBot.instance
+    assert (deleted, failed) == (1, 1)
+    assert bot.calls.count((-1, 1)) == 3
+    assert bot.calls.count((-1, 2)) == cleanup_script.MAX_NETWORK_RETRIES + 1
+
+
+async def test_delete_topics_backlogged_chat_does_not_delay_other_chats(monkeypatch) -> None:
+    import asyncio
+    import telegram
+
+    monkeypatch.setattr(telegram, "Bot", FakeBot)
+    monkeypatch.setattr(cleanup_script, "MAX_DELETES_PER_SECOND", 10_000)
+    monkeypatch.setattr(cleanup_script, "MAX_CONCURRENT_DELETES", 2)
+
+    # One delete a minute per chat: chat -1's backlog is stuck behind its own
+    # limiter, but chat -2's topic (queued last) must still go through promptly.
+    backlog = [(-1, thread_id) for thread_id in range(100, 120)]
+    task = asyncio.create_task(
+        cleanup_script.delete_topics("token", backlog + [(-2, 100)], per_chat_per_minute=1)
+    )
+    try:
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if (-2, 100) in FakeBot.instance.calls:
+                break
+    finally:
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    bot = FakeBot.instance
+    assert [call for call in bot.calls if call[0] == -1] == [(-1, 100)]
+    assert (-2, 100) in bot.calls
+    assert bot.shutdown_called
+
+
+async def test_rate_limiter_allows_burst_then_paces(monkeypatch) -> None:
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    clock = [0.0]
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+        clock[0] += delay
+
+    monkeypatch.setattr(loop, "time", lambda: clock[0])
+    monkeypatch.setattr(cleanup_script.asyncio, "sleep", fake_sleep)
+    limiter = cleanup_script.RateLimiter(3, 60)
+
+    for _ in range(4):
+        await limiter.acquire()
+
+    # Three pass as a burst; the fourth waits for one slot (60s / 3) to drain.
+    assert sleeps == [pytest.approx(20.0)]
+
+
+def _run_main(tmp_path: Path, monkeypatch, *extra: str) -> int:
+    log = _write_log(
+        tmp_path / "sm.log",
+        [
+            f"INFO - Auto-created topic for session c1d607d3: chat=-1, thread={thread}"
+            for thread in (1, 2, 3, 2)
+        ],
+    )
+    monkeypatch.setattr(cleanup_script, "load_config", lambda: {"telegram": {"token": "t"}})
+    return cleanup_script.main(["--log", str(log), "--keep=-1:3", *extra])
+
+
+def test_main_dry_run_never_starts_event_loop(tmp_path: Path, monkeypatch) -> None:
+    def _no_loop(coro):
+        coro.close()
+        raise AssertionError("dry run must not start an event loop")
+
+    monkeypatch.setattr(cleanup_script.asyncio, "run", _no_loop)
+
+    assert _run_main(tmp_path, monkeypatch) == 0
+
+
+def test_main_execute_deletes_all_but_kept_topic(tmp_path: Path, monkeypatch) -> None:
+    deleted: list[list[tuple[int, int]]] = []
+
+    async def fake_delete(token, to_delete, per_chat_per_minute=None):
+        deleted.append(to_delete)
+        return len(to_delete), 0
+
+    monkeypatch.setattr(cleanup_script, "delete_topics", fake_delete)
+
+    assert _run_main(tmp_path, monkeypatch, "--execute") == 0
+    assert deleted == [[(-1, 1), (-1, 2)]]
+
+
+def test_build_bot_falls_back_to_pooled_http11_without_h2(monkeypatch) -> None:
+    import telegram
+    import telegram.request
+
+    attempts: list[dict] = []
+
+    class FakeRequest:
+        def __init__(self, **kwargs) -> None:
+            attempts.append(kwargs)
+            if kwargs.get("http_version") == "2":
+                raise RuntimeError("h2 not installed")
+
+    monkeypatch.setattr(telegram, "Bot", FakeBot)
+    monkeypatch.setattr(telegram.request, "HTTPXRequest", FakeRequest)
+
+    bot = cleanup_script._build_bot("token")
+
+    pool = cleanup_script.BOT_CONNECTION_POOL_SIZE
+    assert attempts == [
+        {"connection_pool_size": pool, "http_version": "2"},
+        {"connection_pool_size": pool},
+    ]
+    assert isinstance(bot.request, FakeRequest)
+
+
+def test_import_defers_heavy_dependencies() -> None:
+    import subprocess
+
+    probe = (
+        "import importlib.util, sys\n"
+        f"spec = importlib.util.spec_from_file_location('probe', {str(SCRIPT_PATH)!r})\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        "print(sorted(m for m in ('yaml', 'telegram', 'concurrent.futures.process') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("mode", ["splitter", "regex", "parallel"])
+def test_extract_thread_ids_by_session_buckets_in_one_pass(tmp_path: Path, monkeypatch, mode) -> None:
+    line = "INFO - Auto-created topic for session {sid}: chat=-1, thread={thread}"
+    log = _write_log(
+        tmp_path / "sm.log",
+        [
+            line.format(sid="aaaa1111", thread=1),
+            line.format(sid="bbbb2222", thread=2),
+            line.format(sid="cccc3333", thread=3),
+            line.format(sid="aaaa1111", thread=4),
+        ],
+    )
+    kwargs = {"use_regex": mode == "regex"}
+    if mode == "parallel":
+        monkeypatch.setattr(cleanup_script, "PARALLEL_SCAN_MIN_BYTES", 0)
+        kwargs["workers"] = 2
+
+    result = cleanup_script.extract_thread_ids_by_session(
+        str(log), ["aaaa1111", "bbbb2222", "dddd4444"], **kwargs
+    )
+
+    assert result == {
+        "aaaa1111": [(-1, 1), (-1, 4)],
+        "bbbb2222": [(-1, 2)],
+        "dddd4444": [],
+    }
+
+
+def test_main_multiple_sessions_keep_each_persisted_topic(tmp_path: Path, monkeypatch) -> None:
+    line = "INFO - Auto-created topic for session {sid}: chat=-1, thread={thread}"
+    log = _write_log(
+        tmp_path / "sm.log",
+        [line.format(sid=sid, thread=t) for sid, t in [("aaaa1111", 1), ("bbbb2222", 2), ("aaaa1111", 3), ("bbbb2222", 4)]],
+    )
+    state = tmp_path / "sessions.json"
+    state.write_text(json.dumps({
+        "sessions": [
+            {"id": "aaaa1111", "telegram_chat_id": -1, "telegram_thread_id": 3},
+            {"id": "bbbb2222", "telegram_chat_id": -1, "telegram_thread_id": 2},
+        ]
+    }))
+    deleted: list[list[tuple[int, int]]] = []
+
+    async def fake_delete(token, to_delete, per_chat_per_minute=None):
+        deleted.append(to_delete)
+        return len(to_delete), 0
+
+    monkeypatch.setattr(cleanup_script, "load_config", lambda: {"telegram": {"token": "t"}})
+    monkeypatch.setattr(cleanup_script, "delete_topics", fake_delete)
+
+    rc = cleanup_script.main([
+        "--log", str(log), "--state-file", str(state), "--session", "aaaa1111", "bbbb2222", "--execute",
+    ])
+
+    assert rc == 0
+    assert deleted == [[(-1, 1), (-1, 4)]]
+
+
+def test_keep_rejected_with_multiple_sessions() -> None:
+    with pytest.raises(SystemExit):
+        cleanup_script.parse_args(["--session", "a", "b", "--keep=-1:2"])
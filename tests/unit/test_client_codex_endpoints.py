@@ -1,6 +1,5 @@
 """Unit tests for codex-specific SessionManagerClient helpers used by codex-tui."""
 
-import urllib.request
 from unittest.mock import patch
 
 from src.cli.client import MUTATION_API_TIMEOUT, SessionManagerClient
@@ -187,24 +186,11 @@ def test_kill_session_uses_longer_timeout():
 def test_request_sends_explicit_empty_json_body():
     client = SessionManagerClient(api_url="http://127.0.0.1:8420")
 
-    def _fake_urlopen(req: urllib.request.Request, timeout: int | None = None):
-        assert req.data == b"{}"
+    def _fake_send(method: str, path: str, body: bytes | None, timeout: float):
+        assert body == b"{}"
+        return 200, b"{}"
 
-        class _Resp:
-            status = 200
-
-            def read(self):
-                return b"{}"
-
-            def __enter__(self):
-                return self
-
-            def __exit__(self, exc_type, exc, tb):
-                return False
-
-        return _Resp()
-
-    with patch("urllib.request.urlopen", side_effect=_fake_urlopen):
+    with patch.object(client, "_send", side_effect=_fake_send):
         data, success, unavailable = client._request("POST", "/noop", data={})
 
     assert data == {}
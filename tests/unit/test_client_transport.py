@@ -0,0 +1,123 @@
+"""Unit tests for SessionManagerClient's keep-alive HTTP transport."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.cli.client import SessionManagerClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.client_ports.append(self.client_address[1])
+        if self.path == "/missing":
+            self._reply(404, {"detail": "nope"})
+        elif self.path == "/drop":
+            # Answer as keep-alive, then close the socket behind the client's back.
+            self._reply(200, {"path": self.path})
+            self.close_connection = True
+        else:
+            self._reply(200, {"path": self.path})
+
+    def do_POST(self):
+        self.server.client_ports.append(self.client_address[1])
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if self.path == "/reset":
+            # Act on the request, then drop the connection without answering.
+            self.close_connection = True
+            return
+        self._reply(200, {"echo": json.loads(body or b"null")})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.client_ports = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client_for(server) -> SessionManagerClient:
+    host, port = server.server_address
+    return SessionManagerClient(api_url=f"http://{host}:{port}")
+
+
+def test_requests_reuse_one_connection(api_server):
+    client = _client_for(api_server)
+
+    assert client._request("GET", "/sessions/a") == ({"path": "/sessions/a"}, True, False)
+    assert client._request("POST", "/sessions/a/input", {"text": "hi"}) == ({"echo": {"text": "hi"}}, True, False)
+    assert client._request_with_status("GET", "/missing") == ({"detail": "nope"}, 404, False)
+    client.close()
+
+    assert len(api_server.client_ports) == 3
+    assert len(set(api_server.client_ports)) == 1
+
+
+def test_reconnects_when_server_dropped_idle_connection(api_server):
+    client = _client_for(api_server)
+    client._request("GET", "/drop")
+
+    assert client._request("GET", "/second") == ({"path": "/second"}, True, False)
+    client.close()
+
+    assert len(set(api_server.client_ports)) == 2
+
+
+def test_post_not_resent_when_connection_drops_after_send(api_server):
+    client = _client_for(api_server)
+    client._request("GET", "/first")
+
+    # The server may have acted on the POST before the reset, so it is not retried.
+    assert client._request("POST", "/reset", {"text": "hi"}) == (None, False, True)
+    client.close()
+
+    assert len(api_server.client_ports) == 2
+
+
+def test_error_status_returns_api_error_payload(api_server):
+    client = _client_for(api_server)
+
+    assert client._request("GET", "/missing") == ({"detail": "nope"}, False, False)
+    client.close()
+
+
+def test_unreachable_server_is_unavailable():
+    client = SessionManagerClient(api_url="http://127.0.0.1:1")
+
+    assert client._request("GET", "/sessions") == (None, False, True)
+    assert client._request_with_status("GET", "/sessions") == (None, None, True)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_backends_round_trip_identically(monkeypatch, api_server, use_orjson):
+    from src.cli import client as client_module
+
+    if not use_orjson:
+        monkeypatch.setattr(client_module, "orjson", None)
+    elif client_module.orjson is None:
+        pytest.skip("orjson not installed")
+    client = _client_for(api_server)
+    payload = {"text": "héllo → world", "n": [1, 2.5, None, True], "nested": {"k": "v"}}
+
+    assert client._request("POST", "/echo", payload) == ({"echo": payload}, True, False)
+    client.close()
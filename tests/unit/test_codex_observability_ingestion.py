@@ -31,24 +31,29 @@ def _codex_fork_relay_manager(tmp_path):
     return manager, session
 
 
-async def _ingest_and_relay(manager: SessionManager, session_id: str, event: dict):
-    manager.ingest_codex_fork_event(session_id, event)
-    await manager._handle_codex_fork_assistant_relay_event(session_id, event)
-
-
-@pytest.mark.asyncio
-async def test_structured_request_and_response_logged(tmp_path):
+def _codex_app_manager(tmp_path, session_id: str, thread_id: str):
     manager = SessionManager(log_dir=str(tmp_path), state_file=str(tmp_path / "state.json"))
     session = Session(
-        id="obsreq1",
-        name="codex-app-obsreq1",
+        id=session_id,
+        name=f"codex-app-{session_id}",
         working_dir=str(tmp_path),
         provider="codex-app",
         status=SessionStatus.RUNNING,
-        codex_thread_id="thread-req",
+        codex_thread_id=thread_id,
     )
     manager.sessions[session.id] = session
-    manager.codex_sessions[session.id] = SimpleNamespace(thread_id="thread-req")
+    manager.codex_sessions[session.id] = SimpleNamespace(thread_id=thread_id)
+    return manager, session
+
+
+async def _ingest_and_relay(manager: SessionManager, session_id: str, event: dict):
+    manager.ingest_codex_fork_event(session_id, event)
+    await manager._handle_codex_fork_assistant_relay_event(session_id, event)
+
+
+@pytest.mark.asyncio
+async def test_structured_request_and_response_logged(tmp_path):
+    manager, session = _codex_app_manager(tmp_path, "obsreq1", "thread-req")
 
     request_task = asyncio.create_task(
         manager._handle_codex_server_request(
@@ -58,8 +63,14 @@ async def test_structured_request_and_response_logged(tmp_path):
             {"turnId": "turn-req", "item": {"id": "item-req"}},
         )
     )
-    await asyncio.sleep(0)
-    pending = manager.list_codex_pending_requests(session.id)
+    # Yield until the handler has registered the request, however many ticks it takes
+    for _ in range(100):
+        pending = manager.list_codex_pending_requests(session.id)
+        if pending:
+            break
+        await asyncio.sleep(0)
+    else:
+        pytest.fail("pending codex request never registered")
     assert len(pending) == 1
 
     request_id = pending[0]["request_id"]
@@ -77,53 +88,46 @@ async def test_structured_request_and_response_logged(tmp_path):
 
 @pytest.mark.asyncio
 async def test_item_lifecycle_notifications_logged(tmp_path):
-    manager = SessionManager(log_dir=str(tmp_path), state_file=str(tmp_path / "state.json"))
-    session = Session(
-        id="obsitem1",
-        name="codex-app-obsitem1",
-        working_dir=str(tmp_path),
-        provider="codex-app",
-        status=SessionStatus.RUNNING,
-        codex_thread_id="thread-item",
-    )
-    manager.sessions[session.id] = session
-    manager.codex_sessions[session.id] = SimpleNamespace(thread_id="thread-item")
+    manager, session = _codex_app_manager(tmp_path, "obsitem1", "thread-item")
 
-    await manager._handle_codex_item_notification(
-        session.id,
-        "item/started",
-        {
-            "turnId": "turn-item",
-            "item": {"id": "item-1", "type": "commandExecution", "command": "ls", "cwd": str(tmp_path)},
-        },
-    )
-    await manager._handle_codex_item_notification(
-        session.id,
-        "item/commandExecution/outputDelta",
-        {
-            "turnId": "turn-item",
-            "item": {"id": "item-1", "type": "commandExecution"},
-            "delta": "stdout line",
-        },
-    )
-    await manager._handle_codex_item_notification(
-        session.id,
-        "item/completed",
-        {
-            "turnId": "turn-item",
-            "item": {
-                "id": "item-1",
-                "type": "commandExecution",
-                "status": "failed",
-                "exitCode": 2,
-                "errorCode": "command_failed",
-                "errorMessage": "non-zero exit",
+    notifications = [
+        (
+            "item/started",
+            {
+                "turnId": "turn-item",
+                "item": {"id": "item-1", "type": "commandExecution", "command": "ls", "cwd": str(tmp_path)},
             },
-        },
-    )
-
-    tool_events = manager.codex_observability_logger.list_recent_tool_events(session.id, limit=20)
-    assert [row["event_type"] for row in tool_events][-3:] == ["started", "output_delta", "failed"]
+        ),
+        (
+            "item/commandExecution/outputDelta",
+            {
+                "turnId": "turn-item",
+                "item": {"id": "item-1", "type": "commandExecution"},
+                "delta": "stdout line",
+            },
+        ),
+        (
+            "item/completed",
+            {
+                "turnId": "turn-item",
+                "item": {
+                    "id": "item-1",
+                    "type": "commandExecution",
+                    "status": "failed",
+                    "exitCode": 2,
+                    "errorCode": "command_failed",
+                    "errorMessage": "non-zero exit",
+                },
+            },
+        ),
+    ]
+    # Sequential on purpose: the lifecycle rows must land in notification order
+    for method, params in notifications:
+        await manager._handle_codex_item_notification(session.id, method, params)
+
+    # list_recent_tool_events returns the newest rows oldest-first
+    tool_events = manager.codex_observability_logger.list_recent_tool_events(session.id, limit=3)
+    assert [row["event_type"] for row in tool_events] == ["started", "output_delta", "failed"]
     assert tool_events[-1]["final_status"] == "failed"
     assert tool_events[-1]["error_code"] == "command_failed"
 
@@ -106,3 +106,11 @@ def test_prune_uses_provider_specific_age_boundary(tmp_path):
 
     assert "codex-fork" in providers
     assert "codex-app" not in providers
+
+
+def test_connection_uses_wal_with_normal_sync(tmp_path):
+    logger = CodexObservabilityLogger(db_path=str(tmp_path / "codex_observability.db"))
+
+    conn = logger._get_conn()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
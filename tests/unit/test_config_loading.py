@@ -4,9 +4,8 @@ Verifies that timeout and delay values are correctly loaded from config.yaml
 and that fallback defaults work when config is not provided.
 """
 
-import tempfile
 from pathlib import Path
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -19,21 +18,25 @@ from src.message_queue import MessageQueueManager
 class TestTmuxControllerConfig:
     """Test TmuxController loads config values correctly."""
 
-    def test_default_values_without_config(self):
-        """Verify default fallback values when no config provided."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            controller = TmuxController(log_dir=temp_dir)
-
-            assert controller.shell_export_settle_seconds == 0.1
-            assert controller.claude_init_seconds == 3
-            assert controller.claude_init_no_prompt_seconds == 1
-            assert controller.send_keys_timeout_seconds == 5
-            assert controller.send_keys_settle_seconds == 0.3
-            assert controller.socket_name is None
-            assert controller.native_scrollback is False
-            assert controller.history_limit == 100000
+    @pytest.fixture(scope="class")
+    def log_dir(self, tmp_path_factory):
+        """One log directory for the class; TmuxController only mkdirs it."""
+        return str(tmp_path_factory.mktemp("tmux-logs"))
 
-    def test_config_values_loaded(self):
+    def test_default_values_without_config(self, log_dir):
+        """Verify default fallback values when no config provided."""
+        controller = TmuxController(log_dir=log_dir)
+
+        assert controller.shell_export_settle_seconds == 0.1
+        assert controller.claude_init_seconds == 3
+        assert controller.claude_init_no_prompt_seconds == 1
+        assert controller.send_keys_timeout_seconds == 5
+        assert controller.send_keys_settle_seconds == 0.3
+        assert controller.socket_name is None
+        assert controller.native_scrollback is False
+        assert controller.history_limit == 100000
+
+    def test_config_values_loaded(self, log_dir):
         """Verify config values override defaults."""
         config = {
             "timeouts": {
@@ -47,16 +50,15 @@ class TestTmuxControllerConfig:
             }
         }
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            controller = TmuxController(log_dir=temp_dir, config=config)
+        controller = TmuxController(log_dir=log_dir, config=config)
 
-            assert controller.shell_export_settle_seconds == 0.5
-            assert controller.claude_init_seconds == 5
-            assert controller.claude_init_no_prompt_seconds == 2
-            assert controller.send_keys_timeout_seconds == 10
-            assert controller.send_keys_settle_seconds == 0.5
+        assert controller.shell_export_settle_seconds == 0.5
+        assert controller.claude_init_seconds == 5
+        assert controller.claude_init_no_prompt_seconds == 2
+        assert controller.send_keys_timeout_seconds == 10
+        assert controller.send_keys_settle_seconds == 0.5
 
-    def test_tmux_config_values_loaded(self):
+    def test_tmux_config_values_loaded(self, log_dir):
         """Verify tmux socket/native-scrollback/history values load from config."""
         config = {
             "tmux": {
@@ -66,20 +68,19 @@ class TestTmuxControllerConfig:
             }
         }
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            controller = TmuxController(log_dir=temp_dir, config=config)
+        controller = TmuxController(log_dir=log_dir, config=config)
 
-            assert controller.socket_name == "session-manager-test"
-            assert controller.native_scrollback is True
-            assert controller.history_limit == 12345
-            assert controller.tmux_cmd("list-sessions") == [
-                "tmux",
-                "-L",
-                "session-manager-test",
-                "list-sessions",
-            ]
+        assert controller.socket_name == "session-manager-test"
+        assert controller.native_scrollback is True
+        assert controller.history_limit == 12345
+        assert controller.tmux_cmd("list-sessions") == [
+            "tmux",
+            "-L",
+            "session-manager-test",
+            "list-sessions",
+        ]
 
-    def test_partial_config_uses_defaults(self):
+    def test_partial_config_uses_defaults(self, log_dir):
         """Verify missing config values fall back to defaults."""
         config = {
             "timeouts": {
@@ -90,12 +91,11 @@ class TestTmuxControllerConfig:
             }
         }
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            controller = TmuxController(log_dir=temp_dir, config=config)
+        controller = TmuxController(log_dir=log_dir, config=config)
 
-            assert controller.shell_export_settle_seconds == 0.2  # From config
-            assert controller.claude_init_seconds == 3  # Default
-            assert controller.send_keys_timeout_seconds == 5  # Default
+        assert controller.shell_export_settle_seconds == 0.2  # From config
+        assert controller.claude_init_seconds == 3  # Default
+        assert controller.send_keys_timeout_seconds == 5  # Default
 
 
 class TestOutputMonitorConfig:
@@ -147,32 +147,28 @@ class TestMessageQueueManagerConfig:
     @pytest.fixture
     def mock_session_manager(self):
         """Create a mock session manager."""
-        mock = MagicMock()
-        mock.tmux = MagicMock()
-        mock.tmux.send_input_async = AsyncMock(return_value=True)
-        return mock
+        # Config tests only construct the manager; nothing is ever sent.
+        return MagicMock()
 
     def test_default_values_without_config(self, mock_session_manager):
         """Verify default fallback values when no config provided."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            db_path = Path(temp_dir) / "test.db"
-            manager = MessageQueueManager(
-                mock_session_manager,
-                db_path=str(db_path),
-            )
+        manager = MessageQueueManager(
+            mock_session_manager,
+            db_path=":memory:",
+        )
 
-            # sm_send defaults
-            assert manager.input_poll_interval == 5
-            assert manager.input_stale_timeout == 120
-            assert manager.max_batch_size == 10
-            assert manager.urgent_delay_ms == 500
+        # sm_send defaults
+        assert manager.input_poll_interval == 5
+        assert manager.input_stale_timeout == 120
+        assert manager.max_batch_size == 10
+        assert manager.urgent_delay_ms == 500
 
-            # timeout defaults
-            assert manager.subprocess_timeout == 2
-            assert manager.async_send_timeout == 5
-            assert manager.initial_retry_delay == 1.0
-            assert manager.max_retry_delay == 30
-            assert manager.watch_poll_interval == 2
+        # timeout defaults
+        assert manager.subprocess_timeout == 2
+        assert manager.async_send_timeout == 5
+        assert manager.initial_retry_delay == 1.0
+        assert manager.max_retry_delay == 30
+        assert manager.watch_poll_interval == 2
 
     def test_config_values_loaded(self, mock_session_manager):
         """Verify config values override defaults."""
@@ -194,26 +190,24 @@ class TestMessageQueueManagerConfig:
             }
         }
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            db_path = Path(temp_dir) / "test.db"
-            manager = MessageQueueManager(
-                mock_session_manager,
-                db_path=str(db_path),
-                config=config,
-            )
+        manager = MessageQueueManager(
+            mock_session_manager,
+            db_path=":memory:",
+            config=config,
+        )
 
-            # sm_send values
-            assert manager.input_poll_interval == 10
-            assert manager.input_stale_timeout == 240
-            assert manager.max_batch_size == 20
-            assert manager.urgent_delay_ms == 1000
+        # sm_send values
+        assert manager.input_poll_interval == 10
+        assert manager.input_stale_timeout == 240
+        assert manager.max_batch_size == 20
+        assert manager.urgent_delay_ms == 1000
 
-            # timeout values
-            assert manager.subprocess_timeout == 5
-            assert manager.async_send_timeout == 10
-            assert manager.initial_retry_delay == 2.0
-            assert manager.max_retry_delay == 60
-            assert manager.watch_poll_interval == 5
+        # timeout values
+        assert manager.subprocess_timeout == 5
+        assert manager.async_send_timeout == 10
+        assert manager.initial_retry_delay == 2.0
+        assert manager.max_retry_delay == 60
+        assert manager.watch_poll_interval == 5
 
     def test_partial_config_uses_defaults(self, mock_session_manager):
         """Verify missing config values fall back to defaults."""
@@ -230,19 +224,17 @@ class TestMessageQueueManagerConfig:
             }
         }
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            db_path = Path(temp_dir) / "test.db"
-            manager = MessageQueueManager(
-                mock_session_manager,
-                db_path=str(db_path),
-                config=config,
-            )
+        manager = MessageQueueManager(
+            mock_session_manager,
+            db_path=":memory:",
+            config=config,
+        )
 
-            # Mixed config and defaults
-            assert manager.input_poll_interval == 15  # From config
-            assert manager.input_stale_timeout == 120  # Default
-            assert manager.subprocess_timeout == 3  # From config
-            assert manager.async_send_timeout == 5  # Default
+        # Mixed config and defaults
+        assert manager.input_poll_interval == 15  # From config
+        assert manager.input_stale_timeout == 120  # Default
+        assert manager.subprocess_timeout == 3  # From config
+        assert manager.async_send_timeout == 5  # Default
 
 
 class TestLoadConfig:
@@ -0,0 +1,93 @@
+"""Unit tests for CLI output formatting helpers."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.cli import formatting
+from src.cli.formatting import format_relative_time, format_session_line, format_status_list
+
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _session(session_id: str, *, working_dir: str = "/repo", status: str = "running", minutes_ago: int = 0) -> dict:
+    return {
+        "id": session_id,
+        "name": f"claude-{session_id}",
+        "working_dir": working_dir,
+        "status": status,
+        "last_activity": (NOW - timedelta(minutes=minutes_ago)).isoformat(),
+    }
+
+
+class TestFormatRelativeTime:
+    def test_uses_explicit_reference_time(self):
+        stamp = (NOW - timedelta(hours=3)).isoformat()
+        assert format_relative_time(stamp, now=NOW) == "3hr ago"
+
+    def test_invalid_timestamp_is_unknown(self):
+        assert format_relative_time("not-a-time", now=NOW) == "unknown"
+
+
+class TestFormatStatusList:
+    def test_reads_clock_once_per_render(self):
+        sessions = [_session("me")] + [_session(f"peer{i}", minutes_ago=i) for i in range(5)]
+
+        with patch.object(formatting, "datetime", wraps=datetime) as mock_datetime:
+            mock_datetime.now.return_value = NOW
+            output = format_status_list(sessions, "me")
+
+        assert mock_datetime.now.call_count == 1
+        assert "peer4" in output and "4min ago" in output
+
+    def test_others_are_active_peers_in_same_workspace(self):
+        sessions = [
+            _session("peer1"),
+            _session("me"),
+            _session("waiting", status="waiting_permission"),
+            _session("idle", status="idle"),
+            _session("elsewhere", working_dir="/other"),
+        ]
+
+        with patch.object(formatting, "datetime", wraps=datetime) as mock_datetime:
+            mock_datetime.now.return_value = NOW
+            lines = format_status_list(sessions, "me").split("\n")
+
+        assert lines[0].startswith("You: claude-me [me]")
+        assert lines[2:] == [
+            "Others in this workspace:",
+            "  claude-peer1 [peer1] - running - just now",
+            "  claude-waiting [waiting] - waiting_permission - just now",
+        ]
+
+    def test_missing_current_session(self):
+        assert format_status_list([_session("peer1")], "me") == "You: Session not found"
+
+    def test_session_line_with_index_and_working_dir(self):
+        session = dict(_session("abc"), friendly_name="builder")
+        line = format_session_line(session, show_working_dir=True, index=3, now=NOW)
+        assert line == "3. builder [abc] - running - just now (/repo)"
+
+    def test_session_line_omits_empty_working_dir(self):
+        line = format_session_line(_session("abc", working_dir=""), show_working_dir=True, now=NOW)
+        assert line == "claude-abc [abc] - running - just now"
+
+    def test_session_line_threads_reference_time(self):
+        line = format_session_line(_session("abc", minutes_ago=2), now=NOW)
+        assert line == "claude-abc [abc] - running - 2min ago"
+
+
+class TestFormatSessionLineSummary:
+    def test_every_summary_line_is_indented(self):
+        line = format_session_line(
+            _session("abc"), show_summary=True, summary="first\n\nthird", now=NOW
+        )
+        assert line.split("\n") == [
+            "claude-abc [abc] - running - just now",
+            "  → first",
+            "  → ",
+            "  → third",
+        ]
+
+    def test_summary_ignored_unless_requested(self):
+        assert "→" not in format_session_line(_session("abc"), summary="text", now=NOW)
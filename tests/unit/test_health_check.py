@@ -11,43 +11,67 @@ Verifies all health check components:
 import json
 import sqlite3
 import tempfile
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 from unittest.mock import MagicMock, AsyncMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
 from src.server import create_app
-from src.models import Session, SessionStatus
+from src.models import SessionStatus
+
+_TMP_STATE_FILE = Path(tempfile.gettempdir()) / "test_sessions.json"
+
+EXPECTED_CHECKS = frozenset({
+    "state_file",
+    "tmux_sessions",
+    "message_queue",
+    "telegram",
+    "monitors",
+    "infrastructure",
+})
+
+
+@dataclass
+class _FakeTmux:
+    """tmux stand-in: the health check only lists session names."""
+
+    session_names: list[str] = field(default_factory=list)
+
+    def list_sessions(self) -> list[str]:
+        return self.session_names
+
+
+@dataclass
+class _FakeSessionManager:
+    """The slice of SessionManager that /health/detailed reads."""
+
+    sessions: dict[str, Any] = field(default_factory=dict)
+    state_file: Path = _TMP_STATE_FILE
+    tmux: _FakeTmux = field(default_factory=_FakeTmux)
+    message_queue_manager: Any = None
 
 
 @pytest.fixture
 def mock_session_manager():
-    """Create a mock session manager with basic structure."""
-    mock = MagicMock()
-    mock.sessions = {}
-    mock.state_file = Path(tempfile.gettempdir()) / "test_sessions.json"
-    mock.tmux = MagicMock()
-    mock.tmux.list_sessions.return_value = []
-    mock.message_queue_manager = None
-    return mock
+    """Create a fake session manager with basic structure."""
+    return _FakeSessionManager()
 
 
 @pytest.fixture
 def mock_output_monitor():
-    """Create a mock output monitor."""
-    mock = MagicMock()
-    mock._tasks = {}
-    return mock
+    """Create a fake output monitor with no monitored sessions."""
+    return SimpleNamespace(_tasks={})
 
 
 @pytest.fixture
 def mock_child_monitor():
-    """Create a mock child monitor."""
-    mock = MagicMock()
-    mock._running = True
-    return mock
+    """Create a fake running child monitor."""
+    return SimpleNamespace(_running=True)
 
 
 @pytest.fixture
@@ -58,16 +82,40 @@ def mock_notifier():
     return mock
 
 
+@pytest.fixture(scope="module")
+def health_app():
+    """One app for the module; endpoints read their components from app.state."""
+    return create_app()
+
+
+@pytest.fixture(scope="module")
+def health_client(health_app):
+    """One client for the module; entering it keeps a single portal thread alive."""
+    with TestClient(health_app) as client:
+        yield client
+
+
 @pytest.fixture
-def test_client(mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+def make_client(health_app, health_client, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    """Point the shared app at this test's mocks (plus overrides) and return a client."""
+    def _make_client(**overrides):
+        components = {
+            "session_manager": mock_session_manager,
+            "notifier": mock_notifier,
+            "output_monitor": mock_output_monitor,
+            "child_monitor": mock_child_monitor,
+            **overrides,
+        }
+        for name, component in components.items():
+            setattr(health_app.state, name, component)
+        return health_client
+    return _make_client
+
+
+@pytest.fixture
+def test_client(make_client):
     """Create a test client with all mocked components."""
-    app = create_app(
-        session_manager=mock_session_manager,
-        notifier=mock_notifier,
-        output_monitor=mock_output_monitor,
-        child_monitor=mock_child_monitor,
-    )
-    return TestClient(app)
+    return make_client()
 
 
 class TestHealthCheckBasic:
@@ -107,33 +155,18 @@ class TestHealthCheckBasic:
         response = test_client.get("/health/detailed")
         data = response.json()
 
-        expected_checks = [
-            "state_file",
-            "tmux_sessions",
-            "message_queue",
-            "telegram",
-            "monitors",
-            "infrastructure",
-        ]
-
-        for check in expected_checks:
-            assert check in data["checks"], f"Missing check: {check}"
+        missing = EXPECTED_CHECKS - data["checks"].keys()
+        assert not missing, f"Missing checks: {sorted(missing)}"
 
 
 class TestStateFileCheck:
     """Test state file integrity checks."""
 
-    def test_state_file_not_exists(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_state_file_not_exists(self, make_client, mock_session_manager):
         """Test when state file doesn't exist (fresh start)."""
         mock_session_manager.state_file = Path("/nonexistent/path/sessions.json")
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
@@ -141,96 +174,59 @@ class TestStateFileCheck:
         assert data["checks"]["state_file"]["status"] == "ok"
         assert "fresh start" in data["checks"]["state_file"]["message"].lower()
 
-    def test_state_file_valid(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_state_file_valid(self, make_client, mock_session_manager, tmp_path):
         """Test with valid state file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump({"sessions": [{"id": "test1"}, {"id": "test2"}]}, f)
-            temp_path = Path(f.name)
-
-        try:
-            mock_session_manager.state_file = temp_path
-
-            app = create_app(
-                session_manager=mock_session_manager,
-                notifier=mock_notifier,
-                output_monitor=mock_output_monitor,
-                child_monitor=mock_child_monitor,
-            )
-            client = TestClient(app)
+        state_file = tmp_path / "sessions.json"
+        state_file.write_text(json.dumps({"sessions": [{"id": "test1"}, {"id": "test2"}]}))
+        mock_session_manager.state_file = state_file
 
-            response = client.get("/health/detailed")
-            data = response.json()
+        client = make_client()
 
-            assert data["checks"]["state_file"]["status"] == "ok"
-            assert data["checks"]["state_file"]["details"]["sessions_in_file"] == 2
-        finally:
-            temp_path.unlink()
+        response = client.get("/health/detailed")
+        data = response.json()
 
-    def test_state_file_invalid_json(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+        assert data["checks"]["state_file"]["status"] == "ok"
+        assert data["checks"]["state_file"]["details"]["sessions_in_file"] == 2
+
+    def test_state_file_invalid_json(self, make_client, mock_session_manager, tmp_path):
         """Test with corrupted state file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            f.write("not valid json {{{")
-            temp_path = Path(f.name)
-
-        try:
-            mock_session_manager.state_file = temp_path
-
-            app = create_app(
-                session_manager=mock_session_manager,
-                notifier=mock_notifier,
-                output_monitor=mock_output_monitor,
-                child_monitor=mock_child_monitor,
-            )
-            client = TestClient(app)
+        state_file = tmp_path / "sessions.json"
+        state_file.write_text("not valid json {{{")
+        mock_session_manager.state_file = state_file
 
-            response = client.get("/health/detailed")
-            data = response.json()
+        client = make_client()
 
-            assert data["checks"]["state_file"]["status"] == "error"
-            assert data["status"] == "unhealthy"
-        finally:
-            temp_path.unlink()
+        response = client.get("/health/detailed")
+        data = response.json()
+
+        assert data["checks"]["state_file"]["status"] == "error"
+        assert data["status"] == "unhealthy"
 
 
 class TestSessionConsistencyCheck:
     """Test session consistency checks."""
 
-    def test_sessions_consistent(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_sessions_consistent(self, make_client, mock_session_manager):
         """Test when sessions are consistent."""
         # Setup: session in memory matches tmux
-        session = MagicMock(spec=Session)
-        session.id = "test123"
-        session.tmux_session = "claude-test123"
-        session.status = SessionStatus.RUNNING
+        session = SimpleNamespace(id="test123", tmux_session="claude-test123", status=SessionStatus.RUNNING)
 
         mock_session_manager.sessions = {"test123": session}
-        mock_session_manager.tmux.list_sessions.return_value = ["claude-test123"]
+        mock_session_manager.tmux.session_names = ["claude-test123"]
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
 
         assert data["checks"]["tmux_sessions"]["status"] == "ok"
 
-    def test_orphaned_tmux_session(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_orphaned_tmux_session(self, make_client, mock_session_manager):
         """Test when tmux session exists but not in memory."""
         mock_session_manager.sessions = {}
-        mock_session_manager.tmux.list_sessions.return_value = ["claude-orphaned123"]
+        mock_session_manager.tmux.session_names = ["claude-orphaned123"]
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
@@ -238,23 +234,14 @@ class TestSessionConsistencyCheck:
         assert data["checks"]["tmux_sessions"]["status"] == "warning"
         assert len(data["checks"]["tmux_sessions"]["details"]["orphaned_tmux"]) == 1
 
-    def test_session_missing_in_tmux(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_session_missing_in_tmux(self, make_client, mock_session_manager):
         """Test when session in memory but tmux doesn't exist."""
-        session = MagicMock(spec=Session)
-        session.id = "test123"
-        session.tmux_session = "claude-test123"
-        session.status = SessionStatus.RUNNING
+        session = SimpleNamespace(id="test123", tmux_session="claude-test123", status=SessionStatus.RUNNING)
 
         mock_session_manager.sessions = {"test123": session}
-        mock_session_manager.tmux.list_sessions.return_value = []
+        mock_session_manager.tmux.session_names = []
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
@@ -266,36 +253,24 @@ class TestSessionConsistencyCheck:
 class TestMessageQueueCheck:
     """Test message queue health checks."""
 
-    def test_message_queue_not_configured(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_message_queue_not_configured(self, make_client, mock_session_manager):
         """Test when message queue is not configured."""
         mock_session_manager.message_queue_manager = None
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
 
         assert data["checks"]["message_queue"]["status"] == "warning"
 
-    def test_message_queue_db_not_exists(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_message_queue_db_not_exists(self, make_client, mock_session_manager):
         """Test when message queue DB doesn't exist."""
         mock_mq = MagicMock()
         mock_mq.db_path = Path("/nonexistent/path/queue.db")
         mock_session_manager.message_queue_manager = mock_mq
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
@@ -303,69 +278,52 @@ class TestMessageQueueCheck:
         assert data["checks"]["message_queue"]["status"] == "warning"
         assert data["checks"]["message_queue"]["details"]["db_exists"] is False
 
-    def test_message_queue_uses_message_queue_table(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_message_queue_uses_message_queue_table(self, make_client, mock_session_manager, tmp_path):
         """Health check reads the real message_queue table, not a legacy messages table."""
-        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-            db_path = Path(f.name)
-
-        try:
-            with sqlite3.connect(str(db_path)) as conn:
-                conn.executescript(
-                    """
-                    CREATE TABLE message_queue (
-                        id TEXT PRIMARY KEY,
-                        target_session_id TEXT NOT NULL,
-                        sender_session_id TEXT,
-                        sender_name TEXT,
-                        text TEXT NOT NULL,
-                        delivery_mode TEXT DEFAULT 'sequential',
-                        queued_at TIMESTAMP NOT NULL,
-                        timeout_at TIMESTAMP,
-                        notify_on_delivery INTEGER DEFAULT 0,
-                        notify_after_seconds INTEGER,
-                        delivered_at TIMESTAMP
-                    );
-                    INSERT INTO message_queue (id, target_session_id, text, queued_at, delivered_at)
-                    VALUES ('msg-1', 'sess-1', 'hello', datetime('now', '-2 hours'), NULL);
-                    """
-                )
-
-            mock_mq = MagicMock()
-            mock_mq.db_path = db_path
-            mock_session_manager.message_queue_manager = mock_mq
-
-            app = create_app(
-                session_manager=mock_session_manager,
-                notifier=mock_notifier,
-                output_monitor=mock_output_monitor,
-                child_monitor=mock_child_monitor,
+        db_path = tmp_path / "queue.db"
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.executescript(
+                """
+                CREATE TABLE message_queue (
+                    id TEXT PRIMARY KEY,
+                    target_session_id TEXT NOT NULL,
+                    sender_session_id TEXT,
+                    sender_name TEXT,
+                    text TEXT NOT NULL,
+                    delivery_mode TEXT DEFAULT 'sequential',
+                    queued_at TIMESTAMP NOT NULL,
+                    timeout_at TIMESTAMP,
+                    notify_on_delivery INTEGER DEFAULT 0,
+                    notify_after_seconds INTEGER,
+                    delivered_at TIMESTAMP
+                );
+                INSERT INTO message_queue (id, target_session_id, text, queued_at, delivered_at)
+                VALUES ('msg-1', 'sess-1', 'hello', datetime('now', '-2 hours'), NULL);
+                """
             )
-            client = TestClient(app)
 
-            response = client.get("/health/detailed")
-            data = response.json()
+        mock_mq = MagicMock()
+        mock_mq.db_path = db_path
+        mock_session_manager.message_queue_manager = mock_mq
+
+        client = make_client()
+
+        response = client.get("/health/detailed")
+        data = response.json()
 
-            assert data["checks"]["message_queue"]["status"] == "warning"
-            assert data["checks"]["message_queue"]["details"]["pending"] == 1
-            assert data["checks"]["message_queue"]["details"]["stuck"] == 1
-        finally:
-            db_path.unlink(missing_ok=True)
+        assert data["checks"]["message_queue"]["status"] == "warning"
+        assert data["checks"]["message_queue"]["details"]["pending"] == 1
+        assert data["checks"]["message_queue"]["details"]["stuck"] == 1
 
 
 class TestTelegramCheck:
     """Test Telegram bot status checks."""
 
-    def test_telegram_not_configured(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_telegram_not_configured(self, make_client, mock_notifier):
         """Test when Telegram is not configured."""
         mock_notifier.telegram = None
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
@@ -373,7 +331,7 @@ class TestTelegramCheck:
         assert data["checks"]["telegram"]["status"] == "ok"
         assert data["checks"]["telegram"]["details"]["configured"] is False
 
-    def test_telegram_configured_and_running(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_telegram_configured_and_running(self, make_client, mock_notifier):
         """Test when Telegram bot is configured and running."""
         mock_telegram = MagicMock()
         mock_telegram.bot = MagicMock()
@@ -383,13 +341,7 @@ class TestTelegramCheck:
         mock_telegram._topic_sessions = {(123, 456): "session1"}
         mock_notifier.telegram = mock_telegram
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
@@ -402,33 +354,21 @@ class TestTelegramCheck:
 class TestMonitorsCheck:
     """Test output and child monitor checks."""
 
-    def test_monitors_running(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_monitors_running(self, make_client, mock_output_monitor, mock_child_monitor):
         """Test when monitors are running normally."""
         mock_output_monitor._tasks = {"session1": MagicMock()}
         mock_child_monitor._running = True
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
 
         assert data["checks"]["monitors"]["status"] == "ok"
 
-    def test_output_monitor_not_configured(self, mock_session_manager, mock_child_monitor, mock_notifier):
+    def test_output_monitor_not_configured(self, make_client):
         """Test when output monitor is not configured."""
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=None,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client(output_monitor=None)
 
         response = client.get("/health/detailed")
         data = response.json()
@@ -439,35 +379,22 @@ class TestMonitorsCheck:
 class TestResourceUsage:
     """Test resource usage reporting."""
 
-    def test_resource_counts(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_resource_counts(self, make_client, mock_session_manager, mock_output_monitor):
         """Test resource usage counts."""
         # Setup sessions with all required attributes
-        session1 = MagicMock(spec=Session)
-        session1.id = "s1"
-        session1.status = SessionStatus.RUNNING
-        session1.tmux_session = "claude-s1"
-
-        session2 = MagicMock(spec=Session)
-        session2.id = "s2"
-        session2.status = SessionStatus.STOPPED
-        session2.tmux_session = "claude-s2"
+        session1 = SimpleNamespace(id="s1", tmux_session="claude-s1", status=SessionStatus.RUNNING)
+        session2 = SimpleNamespace(id="s2", tmux_session="claude-s2", status=SessionStatus.STOPPED)
 
         mock_session_manager.sessions = {
             "s1": session1,
             "s2": session2,
         }
         # Tmux has the running session
-        mock_session_manager.tmux.list_sessions.return_value = ["claude-s1"]
+        mock_session_manager.tmux.session_names = ["claude-s1"]
 
         mock_output_monitor._tasks = {"s1": MagicMock()}
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
@@ -481,20 +408,14 @@ class TestResourceUsage:
 class TestOverallStatus:
     """Test overall status determination."""
 
-    def test_healthy_when_all_ok(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_healthy_when_all_ok(self, make_client, mock_session_manager):
         """Test overall status is healthy when all checks pass."""
         # Minimal valid setup
         mock_session_manager.state_file = Path("/nonexistent/state.json")  # Fresh start
-        mock_session_manager.tmux.list_sessions.return_value = []
+        mock_session_manager.tmux.session_names = []
         mock_session_manager.message_queue_manager = None
 
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
@@ -502,24 +423,15 @@ class TestOverallStatus:
         # Should be healthy or degraded (message queue not configured is a warning)
         assert data["status"] in ("healthy", "degraded")
 
-    def test_unhealthy_on_error(self, mock_session_manager, mock_output_monitor, mock_child_monitor, mock_notifier):
+    def test_unhealthy_on_error(self, make_client, mock_session_manager):
         """Test overall status is unhealthy when there's an error."""
         # Setup: session missing from tmux (error condition)
-        session = MagicMock(spec=Session)
-        session.id = "test123"
-        session.tmux_session = "claude-test123"
-        session.status = SessionStatus.RUNNING
+        session = SimpleNamespace(id="test123", tmux_session="claude-test123", status=SessionStatus.RUNNING)
 
         mock_session_manager.sessions = {"test123": session}
-        mock_session_manager.tmux.list_sessions.return_value = []  # Missing!
-
-        app = create_app(
-            session_manager=mock_session_manager,
-            notifier=mock_notifier,
-            output_monitor=mock_output_monitor,
-            child_monitor=mock_child_monitor,
-        )
-        client = TestClient(app)
+        mock_session_manager.tmux.session_names = []  # Missing!
+
+        client = make_client()
 
         response = client.get("/health/detailed")
         data = response.json()
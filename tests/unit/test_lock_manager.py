@@ -2,9 +2,7 @@
 
 import pytest
 from datetime import datetime, timedelta
-from pathlib import Path
-from unittest.mock import patch, MagicMock
-import subprocess
+from unittest.mock import patch
 
 from src.lock_manager import (
     LockManager,
@@ -18,278 +16,287 @@ from src.lock_manager import (
 class TestLockInfo:
     """Tests for LockInfo dataclass."""
 
-    def test_lock_info_is_stale_when_fresh(self):
-        """is_stale() returns False for fresh lock."""
+    @pytest.fixture
+    def frozen_now(self, monkeypatch):
+        """Pin the clock LockInfo.is_stale() reads, so boundary ages are exact."""
+        now = datetime(2024, 1, 1, 12, 0, 0)
+
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return now
+
+        monkeypatch.setattr("src.lock_manager.datetime", FrozenDatetime)
+        return now
+
+    @pytest.mark.parametrize(
+        "age, expected",
+        [
+            (timedelta(0), False),
+            (timedelta(minutes=STALE_THRESHOLD_MINUTES + 1), True),
+            # Boundary: the threshold itself is not stale, one microsecond past it is
+            (timedelta(minutes=STALE_THRESHOLD_MINUTES), False),
+            (timedelta(minutes=STALE_THRESHOLD_MINUTES, microseconds=1), True),
+        ],
+        ids=["fresh", "after_threshold", "at_threshold", "just_past_threshold"],
+    )
+    def test_lock_info_is_stale(self, frozen_now, age, expected):
+        """is_stale() flips only once the lock is older than the threshold."""
         lock = LockInfo(
             session_id="test123",
             task="testing",
             branch="main",
-            started=datetime.now(),
+            started=frozen_now - age,
         )
-        assert lock.is_stale() is False
+        assert lock.is_stale() is expected
 
-    def test_lock_info_is_stale_after_threshold(self):
-        """is_stale() returns True after threshold."""
-        # Create lock that started 31 minutes ago
-        old_time = datetime.now() - timedelta(minutes=STALE_THRESHOLD_MINUTES + 1)
-        lock = LockInfo(
-            session_id="test123",
-            task="testing",
-            branch="main",
-            started=old_time,
-        )
-        assert lock.is_stale() is True
 
-    def test_lock_info_is_stale_just_before_threshold(self):
-        """is_stale() returns False just before threshold (boundary test)."""
-        # Create lock 1 second before threshold - should not be stale yet
-        just_before_threshold = datetime.now() - timedelta(minutes=STALE_THRESHOLD_MINUTES) + timedelta(seconds=5)
-        lock = LockInfo(
-            session_id="test123",
-            task="testing",
-            branch="main",
-            started=just_before_threshold,
-        )
-        # Just before the threshold, it should not be stale
-        assert lock.is_stale() is False
+# Any start time far enough back is stale; a fixed one keeps the tests off the clock.
+_DEFINITELY_STALE_ISO = "2020-01-01T00:00:00"
 
 
-class TestLockManager:
-    """Tests for LockManager class."""
-
-    def test_acquire_lock_creates_file(self, tmp_path):
-        """acquire_lock creates .claude/workspace.lock."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
-
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch', return_value='main'):
-                manager = LockManager(working_dir=str(tmp_path))
-                result = manager.acquire_lock("session123", "test task")
+def _lock_bytes(started, session="old_session", task="old task", branch="main") -> bytes:
+    """Lock file contents for a lock taken at the ISO timestamp started."""
+    return f"session={session}\ntask={task}\nbranch={branch}\nstarted={started}\n".encode()
 
-        assert result is True
-        lock_file = tmp_path / ".claude" / "workspace.lock"
-        assert lock_file.exists()
-
-        # Verify lock file content
-        content = lock_file.read_text()
-        assert "session=session123" in content
-        assert "task=test task" in content
-        assert "branch=main" in content
-        assert "started=" in content
 
-    def test_acquire_lock_fails_if_already_locked(self, tmp_path):
-        """Cannot acquire lock held by another session."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
+def _read_lock_fields(lock_file) -> dict:
+    """Parse a lock file's key=value lines into a dict."""
+    return dict(line.split("=", 1) for line in lock_file.read_bytes().decode().splitlines())
 
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch', return_value='main'):
-                manager = LockManager(working_dir=str(tmp_path))
 
-                # First session acquires lock
-                result1 = manager.acquire_lock("session1", "task1")
-                assert result1 is True
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A fake git repo at tmp_path on branch 'main', with LockManager's git lookups patched."""
+    (tmp_path / ".git").mkdir()
+    monkeypatch.setattr(LockManager, '_find_repo_root', lambda self: tmp_path)
+    monkeypatch.setattr(LockManager, '_get_current_branch', lambda self: 'main')
+    monkeypatch.setattr(LockManager, '_get_current_branch_for_path', lambda self, repo_root: 'main')
+    return tmp_path
 
-                # Second session tries to acquire - should fail
-                result2 = manager.acquire_lock("session2", "task2")
-                assert result2 is False
 
-    def test_acquire_lock_succeeds_if_stale(self, tmp_path):
-        """Can acquire lock if existing lock is stale (>30 min)."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
-
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch', return_value='main'):
-                manager = LockManager(working_dir=str(tmp_path))
-
-                # Create stale lock manually
-                lock_dir = tmp_path / ".claude"
-                lock_dir.mkdir()
-                lock_file = lock_dir / "workspace.lock"
-                stale_time = (datetime.now() - timedelta(minutes=STALE_THRESHOLD_MINUTES + 5)).isoformat()
-                lock_file.write_text(f"session=old_session\ntask=old task\nbranch=main\nstarted={stale_time}\n")
-
-                # New session should be able to acquire lock
-                result = manager.acquire_lock("new_session", "new task")
-                assert result is True
-
-                # Verify the lock was overwritten
-                content = lock_file.read_text()
-                assert "session=new_session" in content
+class TestLockManager:
+    """Tests for LockManager class."""
 
-    def test_release_lock_removes_file(self, tmp_path):
+    @pytest.mark.parametrize(
+        "started, expected",
+        [
+            (None, True),
+            (datetime.now().isoformat(), False),
+            (_DEFINITELY_STALE_ISO, True),
+        ],
+        ids=["no_lock", "fresh_other", "stale_other"],
+    )
+    def test_acquire_lock(self, repo, started, expected):
+        """acquire_lock writes .claude/workspace.lock unless another session holds a fresh lock."""
+        manager = LockManager(working_dir=str(repo))
+        lock_file = repo / ".claude" / "workspace.lock"
+        if started is not None:
+            lock_file.parent.mkdir()
+            lock_file.write_bytes(_lock_bytes(started))
+
+        assert manager.acquire_lock("session123", "test task") is expected
+
+        fields = _read_lock_fields(lock_file)
+        if expected:
+            assert fields.pop("started")
+            assert fields == {"session": "session123", "task": "test task", "branch": "main"}
+        else:
+            assert fields["session"] == "old_session"
+
+    def test_release_lock_removes_file(self, repo):
         """release_lock deletes the lock file."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
+        manager = LockManager(working_dir=str(repo))
 
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch', return_value='main'):
-                manager = LockManager(working_dir=str(tmp_path))
-
-                # Acquire then release
-                manager.acquire_lock("session123", "test task")
-                lock_file = tmp_path / ".claude" / "workspace.lock"
-                assert lock_file.exists()
+        # Acquire then release
+        manager.acquire_lock("session123", "test task")
+        lock_file = repo / ".claude" / "workspace.lock"
+        assert lock_file.exists()
 
-                result = manager.release_lock()
-                assert result is True
-                assert not lock_file.exists()
+        result = manager.release_lock()
+        assert result is True
+        assert not lock_file.exists()
 
-    def test_release_lock_only_if_owner(self, tmp_path):
+    def test_release_lock_only_if_owner(self, repo):
         """Cannot release lock owned by another session."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
+        manager = LockManager(working_dir=str(repo))
 
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch', return_value='main'):
-                manager = LockManager(working_dir=str(tmp_path))
+        # Session 1 acquires lock
+        manager.acquire_lock("session1", "task1")
 
-                # Session 1 acquires lock
-                manager.acquire_lock("session1", "task1")
+        # Session 2 tries to release - should fail
+        result = manager.release_lock(repo_root=str(repo), session_id="session2")
+        assert result is False
 
-                # Session 2 tries to release - should fail
-                result = manager.release_lock(repo_root=str(tmp_path), session_id="session2")
-                assert result is False
-
-                # Lock file should still exist
-                lock_file = tmp_path / ".claude" / "workspace.lock"
-                assert lock_file.exists()
+        # Lock file should still exist
+        lock_file = repo / ".claude" / "workspace.lock"
+        assert lock_file.exists()
 
-    def test_check_lock_returns_info(self, tmp_path):
+    def test_check_lock_returns_info(self, repo, monkeypatch):
         """check_lock returns LockInfo with correct fields."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
-
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch', return_value='feature/test'):
-                manager = LockManager(working_dir=str(tmp_path))
+        monkeypatch.setattr(LockManager, '_get_current_branch', lambda self: 'feature/test')
+        manager = LockManager(working_dir=str(repo))
 
-                # Acquire lock
-                manager.acquire_lock("session123", "test task")
+        # Acquire lock
+        manager.acquire_lock("session123", "test task")
 
-                # Check lock
-                lock_info = manager.check_lock()
-                assert lock_info is not None
-                assert lock_info.session_id == "session123"
-                assert lock_info.task == "test task"
-                assert lock_info.branch == "feature/test"
-                assert isinstance(lock_info.started, datetime)
+        # Check lock
+        lock_info = manager.check_lock()
+        assert lock_info is not None
+        assert lock_info.session_id == "session123"
+        assert lock_info.task == "test task"
+        assert lock_info.branch == "feature/test"
+        assert isinstance(lock_info.started, datetime)
 
-    def test_check_lock_returns_none_when_no_lock(self, tmp_path):
+    def test_check_lock_returns_none_when_no_lock(self, repo):
         """check_lock returns None when no lock file exists."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
+        manager = LockManager(working_dir=str(repo))
+        lock_info = manager.check_lock()
+        assert lock_info is None
 
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            manager = LockManager(working_dir=str(tmp_path))
-            lock_info = manager.check_lock()
-            assert lock_info is None
-
-    def test_is_locked_false_when_no_lock(self, tmp_path):
+    def test_is_locked_false_when_no_lock(self, repo):
         """is_locked returns False when no lock file exists."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
-
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            manager = LockManager(working_dir=str(tmp_path))
-            assert manager.is_locked() is False
+        manager = LockManager(working_dir=str(repo))
+        assert manager.is_locked() is False
 
-    def test_is_locked_true_when_active_lock(self, tmp_path):
+    def test_is_locked_true_when_active_lock(self, repo):
         """is_locked returns True when active lock exists."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
+        manager = LockManager(working_dir=str(repo))
+        manager.acquire_lock("session123", "test task")
+        assert manager.is_locked() is True
+
+    @pytest.mark.parametrize(
+        "content, expected",
+        [
+            (_lock_bytes(_DEFINITELY_STALE_ISO), False),
+            (b"", False),
+            (_lock_bytes((datetime.now() + timedelta(hours=1)).isoformat()), True),
+        ],
+        ids=["stale", "empty_file", "future_dated"],
+    )
+    def test_is_locked_with_existing_file(self, repo, content, expected):
+        """Stale and empty lock files don't lock the workspace; a future-dated one does."""
+        manager = LockManager(working_dir=str(repo))
+        lock_file = repo / LOCK_FILE_NAME
+        lock_file.parent.mkdir(parents=True)
+        lock_file.write_bytes(content)
+
+        assert manager.is_locked() is expected
+
+    def test_check_lock_parses_fields_in_any_order(self, repo):
+        """check_lock tolerates reordered keys, CRLF endings, and '=' in values."""
+        manager = LockManager(working_dir=str(repo))
+
+        started = datetime(2026, 1, 1, 9, 30)
+        lock_file = repo / LOCK_FILE_NAME
+        lock_file.parent.mkdir(parents=True)
+        lock_file.write_bytes(
+            f"branch=main\r\ntask=fix a=b\r\nstarted={started.isoformat()}\r\nsession=s1\r\n".encode()
+        )
 
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch', return_value='main'):
-                manager = LockManager(working_dir=str(tmp_path))
-                manager.acquire_lock("session123", "test task")
-                assert manager.is_locked() is True
+        lock = manager.check_lock()
+        assert lock == LockInfo(session_id="s1", task="fix a=b", branch="main", started=started)
 
-    def test_is_locked_false_when_stale(self, tmp_path):
-        """is_locked returns False when lock is stale."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
-
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            manager = LockManager(working_dir=str(tmp_path))
+    def test_check_lock_none_when_missing_or_incomplete(self, repo):
+        """check_lock returns None for a missing file or one lacking required keys."""
+        manager = LockManager(working_dir=str(repo))
 
-            # Create stale lock manually
-            lock_dir = tmp_path / ".claude"
-            lock_dir.mkdir()
-            lock_file = lock_dir / "workspace.lock"
-            stale_time = (datetime.now() - timedelta(minutes=STALE_THRESHOLD_MINUTES + 5)).isoformat()
-            lock_file.write_text(f"session=old\ntask=old task\nbranch=main\nstarted={stale_time}\n")
+        assert manager.check_lock() is None
 
-            assert manager.is_locked() is False
+        lock_file = repo / LOCK_FILE_NAME
+        lock_file.parent.mkdir(parents=True)
+        lock_file.write_bytes(b"session=s1\ntask=t\n")
+        assert manager.check_lock() is None
 
 
 class TestTryAcquire:
     """Tests for try_acquire method used by auto-lock feature."""
 
-    def test_try_acquire_success(self, tmp_path):
+    def test_try_acquire_success(self, repo):
         """try_acquire returns LockResult with acquired=True on success."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
-
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch_for_path', return_value='main'):
-                manager = LockManager(working_dir=str(tmp_path))
-                result = manager.try_acquire(str(tmp_path), "session123")
+        manager = LockManager(working_dir=str(repo))
+        result = manager.try_acquire(str(repo), "session123")
 
-                assert isinstance(result, LockResult)
-                assert result.acquired is True
-                assert result.locked_by_other is False
-                assert result.owner_session_id is None
+        assert isinstance(result, LockResult)
+        assert result.acquired is True
+        assert result.locked_by_other is False
+        assert result.owner_session_id is None
 
-    def test_try_acquire_blocked_by_other(self, tmp_path):
+    def test_try_acquire_blocked_by_other(self, repo):
         """try_acquire returns LockResult indicating locked by another session."""
-        # Create a mock git repo
-        git_dir = tmp_path / ".git"
-        git_dir.mkdir()
+        manager = LockManager(working_dir=str(repo))
 
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch_for_path', return_value='main'):
-                manager = LockManager(working_dir=str(tmp_path))
+        # Session 1 acquires lock
+        manager.try_acquire(str(repo), "session1")
 
-                # Session 1 acquires lock
-                manager.try_acquire(str(tmp_path), "session1")
+        # Session 2 tries
+        result = manager.try_acquire(str(repo), "session2")
 
-                # Session 2 tries
-                result = manager.try_acquire(str(tmp_path), "session2")
-
-                assert result.acquired is False
-                assert result.locked_by_other is True
-                assert result.owner_session_id == "session1"
+        assert result.acquired is False
+        assert result.locked_by_other is True
+        assert result.owner_session_id == "session1"
 
-    def test_try_acquire_succeeds_for_same_session(self, tmp_path):
+    def test_try_acquire_succeeds_for_same_session(self, repo):
         """try_acquire succeeds if same session already holds lock."""
-        # Create a mock git repo
+        manager = LockManager(working_dir=str(repo))
+
+        # Session acquires lock twice
+        result1 = manager.try_acquire(str(repo), "session123")
+        result2 = manager.try_acquire(str(repo), "session123")
+
+        assert result1.acquired is True
+        assert result2.acquired is True
+
+
+class TestGitMetadataWithoutSubprocess:
+    """Repo root and branch are resolved from the filesystem, not by forking git."""
+
+    def test_find_repo_root_walks_up_from_subdirectory(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        nested = tmp_path / "src" / "pkg"
+        nested.mkdir(parents=True)
+
+        with patch("subprocess.run", side_effect=AssertionError("git should not run")):
+            manager = LockManager(working_dir=str(nested))
+
+        assert manager.repo_root == tmp_path
+        assert manager.lock_file == tmp_path / LOCK_FILE_NAME
+
+    def test_find_repo_root_none_outside_repo(self, tmp_path):
+        with patch("src.lock_manager._find_git_root_from", return_value=None):
+            manager = LockManager(working_dir=str(tmp_path))
+        assert manager.repo_root is None
+        assert manager._get_current_branch() == "unknown"
+
+    def test_branch_read_from_head(self, tmp_path):
         git_dir = tmp_path / ".git"
         git_dir.mkdir()
+        (git_dir / "HEAD").write_text("ref: refs/heads/feature/x\n")
 
-        with patch.object(LockManager, '_find_repo_root', return_value=tmp_path):
-            with patch.object(LockManager, '_get_current_branch_for_path', return_value='main'):
-                manager = LockManager(working_dir=str(tmp_path))
-
-                # Session acquires lock twice
-                result1 = manager.try_acquire(str(tmp_path), "session123")
-                result2 = manager.try_acquire(str(tmp_path), "session123")
+        with patch("subprocess.run", side_effect=AssertionError("git should not run")):
+            manager = LockManager(working_dir=str(tmp_path))
+            assert manager._get_current_branch() == "feature/x"
+            assert manager._get_current_branch_for_path(str(tmp_path)) == "feature/x"
+
+    def test_branch_read_from_worktree_gitdir(self, tmp_path):
+        main_git = tmp_path / "main" / ".git" / "worktrees" / "wt"
+        main_git.mkdir(parents=True)
+        (main_git / "HEAD").write_text("ref: refs/heads/wt-branch\n")
+        worktree = tmp_path / "wt"
+        worktree.mkdir()
+        (worktree / ".git").write_text("gitdir: ../main/.git/worktrees/wt\n")
+
+        with patch("subprocess.run", side_effect=AssertionError("git should not run")):
+            manager = LockManager(working_dir=str(worktree))
+            assert manager._get_current_branch() == "wt-branch"
+
+    def test_detached_head_is_unknown(self, tmp_path):
+        git_dir = tmp_path / ".git"
+        git_dir.mkdir()
+        (git_dir / "HEAD").write_text("3f2a9c0d1e2f3a4b5c6d7e8f9a0b1c2d3e4f5a6b\n")
 
-                assert result1.acquired is True
-                assert result2.acquired is True
+        manager = LockManager(working_dir=str(tmp_path))
+        assert manager._get_current_branch() == "unknown"
 
 
 class TestLockResult:
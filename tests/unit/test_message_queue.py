@@ -4,6 +4,7 @@ import pytest
 import asyncio
 import tempfile
 import sqlite3
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import MagicMock, AsyncMock, patch, PropertyMock
@@ -148,6 +149,55 @@ class TestQueueing:
         assert pending[1].text == "Second"
         assert pending[2].text == "Third"
 
+    def test_queue_message_skips_length_scan_when_info_disabled(self, message_queue):
+        """The queue-length log argument is only computed if INFO is emitted."""
+        message_queue.get_queue_length = MagicMock(return_value=1)
+        with patch('asyncio.create_task', noop_create_task), \
+                patch("src.message_queue.logger") as mock_logger:
+            mock_logger.isEnabledFor.return_value = False
+            message_queue.queue_message("target123", "Quiet")
+
+        message_queue.get_queue_length.assert_not_called()
+        mock_logger.info.assert_not_called()
+
+    def test_queue_drops_oldest_beyond_max_pending(self, message_queue):
+        """A stuck session's backlog is capped; the oldest pending messages go first."""
+        message_queue.max_pending_per_session = 2
+        with patch('asyncio.create_task', noop_create_task):
+            message_queue.queue_message("target123", "First")
+            message_queue.queue_message("target123", "Second")
+            message_queue.queue_message("target123", "Third")
+            message_queue.queue_message("other456", "Elsewhere")
+
+        assert [m.text for m in message_queue.get_pending_messages("target123")] == ["Second", "Third"]
+        assert message_queue.get_queue_length("other456") == 1
+
+    def test_queue_cap_ignores_delivered_messages(self, message_queue):
+        """Delivered history does not count toward the pending cap; 0 disables it."""
+        message_queue.max_pending_per_session = 1
+        with patch('asyncio.create_task', noop_create_task):
+            first = message_queue.queue_message("target123", "First")
+            message_queue._mark_delivered(first.id)
+            message_queue.queue_message("target123", "Second")
+            message_queue.max_pending_per_session = 0
+            message_queue.queue_message("target123", "Third")
+
+        assert [m.text for m in message_queue.get_pending_messages("target123")] == ["Second", "Third"]
+
+    def test_queue_cap_off_by_default_and_spares_urgent(self, message_queue):
+        """The cap is opt-in, and urgent/important messages never count or get dropped."""
+        assert message_queue.max_pending_per_session == 0
+        message_queue.max_pending_per_session = 1
+        with patch('asyncio.create_task', noop_create_task):
+            message_queue.queue_message("target123", "Urgent", delivery_mode="urgent")
+            message_queue.queue_message("target123", "Important", delivery_mode="important")
+            message_queue.queue_message("target123", "First")
+            message_queue.queue_message("target123", "Second")
+
+        assert sorted(m.text for m in message_queue.get_pending_messages("target123")) == [
+            "Important", "Second", "Urgent",
+        ]
+
 
 class TestDeliveryModes:
     """Tests for different delivery modes."""
@@ -470,6 +520,23 @@ class TestDatabaseOperations:
         finally:
             _close_message_queue(mq)
 
+    def test_pending_sessions_query_uses_partial_index(self, message_queue):
+        """The per-tick monitor query scans idx_pending, not the full table."""
+        plan = message_queue._execute_query(
+            "EXPLAIN QUERY PLAN " + message_queue._PENDING_SESSIONS_SQL
+        )
+
+        assert any("idx_pending" in row[-1] for row in plan)
+
+    def test_sessions_with_pending_excludes_delivered(self, message_queue):
+        """Sessions whose messages were all delivered drop out of the monitor set."""
+        with patch('asyncio.create_task', noop_create_task):
+            done = message_queue.queue_message("done123", "Delivered")
+            message_queue.queue_message("waiting456", "Pending")
+        message_queue._mark_delivered(done.id)
+
+        assert message_queue._get_sessions_with_pending() == ["waiting456"]
+
     def test_mark_delivered_updates_db(self, message_queue):
         """_mark_delivered updates delivered_at in database."""
         with patch('asyncio.create_task', noop_create_task):
@@ -524,8 +591,8 @@ class TestDeliveryLocks:
     def test_delivery_lock_created_per_session(self, message_queue):
         """Each session gets its own delivery lock."""
         # Access locks via internal method
-        lock1 = message_queue._delivery_locks.setdefault("session1", asyncio.Lock())
-        lock2 = message_queue._delivery_locks.setdefault("session2", asyncio.Lock())
+        lock1 = message_queue._get_delivery_lock("session1")
+        lock2 = message_queue._get_delivery_lock("session2")
 
         assert lock1 is not lock2
         assert "session1" in message_queue._delivery_locks
@@ -533,11 +600,20 @@ class TestDeliveryLocks:
 
     def test_same_session_gets_same_lock(self, message_queue):
         """Same session gets the same lock instance."""
-        lock1 = message_queue._delivery_locks.setdefault("session1", asyncio.Lock())
-        lock2 = message_queue._delivery_locks.setdefault("session1", asyncio.Lock())
+        lock1 = message_queue._get_delivery_lock("session1")
+        lock2 = message_queue._get_delivery_lock("session1")
 
         assert lock1 is lock2
 
+    def test_existing_lock_lookup_allocates_nothing(self, message_queue):
+        """Repeat deliveries reuse the lock without building a throwaway Lock."""
+        message_queue._get_delivery_lock("session1")
+
+        with patch("src.message_queue.asyncio.Lock") as mock_lock:
+            message_queue._get_delivery_lock("session1")
+
+        mock_lock.assert_not_called()
+
 
 class TestCodexIdleDetection:
     """Tests for Codex CLI idle detection in _watch_for_idle (#168)."""
@@ -1674,6 +1750,50 @@ class TestDirectDelivery244:
 
         mock_session_manager._deliver_direct.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_stopped_session_keeps_messages_without_injecting(self, mock_session_manager, temp_db_path):
+        """A stopped session gets no tmux capture or send; its messages wait for restore."""
+        mq = self._make_mq(mock_session_manager, temp_db_path)
+
+        session = MagicMock()
+        session.id = "target244s"
+        session.provider = "claude"
+        session.tmux_session = "claude-target244s"
+        session.status = SessionStatus.STOPPED
+        mock_session_manager.get_session = MagicMock(return_value=session)
+        mock_session_manager._deliver_direct = AsyncMock(return_value=True)
+        mq._get_pending_user_input_async = AsyncMock(return_value=None)
+        self._insert_pending_message(mq, "target244s")
+
+        await mq._check_stale_input("target244s")
+        await mq._try_deliver_messages("target244s")
+
+        mq._get_pending_user_input_async.assert_not_awaited()
+        mock_session_manager._deliver_direct.assert_not_called()
+        assert mq.get_queue_length("target244s") == 1
+
+    @pytest.mark.asyncio
+    async def test_deliver_now_injects_on_callers_task(self, mock_session_manager, temp_db_path):
+        """Queue-then-deliver-now injects inline; nothing waits on the monitor loop."""
+        mq = self._make_mq(mock_session_manager, temp_db_path)
+
+        session = MagicMock()
+        session.id = "target244n"
+        session.provider = "claude"
+        session.tmux_session = "claude-target244n"
+        mock_session_manager.get_session = MagicMock(return_value=session)
+        mock_session_manager._deliver_direct = AsyncMock(return_value=True)
+        mq._get_pending_user_input_async = AsyncMock(return_value=None)
+
+        with patch("asyncio.create_task", side_effect=noop_create_task) as create_task:
+            msg = mq.queue_message("target244n", "hello", trigger_delivery=False)
+            delivered = await mq.deliver_queued_message_now("target244n", msg.id, "sequential")
+
+        assert delivered is True
+        create_task.assert_not_called()
+        mock_session_manager._deliver_direct.assert_awaited_once_with(session, "hello")
+        assert mq.get_queue_length("target244n") == 0
+
     @pytest.mark.asyncio
     async def test_important_delivery_without_idle_gate(self, mock_session_manager, temp_db_path):
         """Important delivery proceeds even when is_idle=False (no idle gate, sm#244)."""
@@ -1884,7 +2004,7 @@ class TestDirectDelivery244:
         # Simulate user has been typing longer than input_stale_timeout
         stale_input = "> some text"
         state.pending_user_input = stale_input
-        state.pending_input_first_seen = datetime.now() - timedelta(seconds=60)
+        state.pending_input_first_seen = time.monotonic() - 60
 
         mq._get_pending_user_input_async = AsyncMock(return_value=stale_input)
         mq._clear_user_input_async = AsyncMock()
@@ -2536,3 +2656,185 @@ class TestSkipFence263:
             f"Expected 1 slot when session.status=IDLE overrides is_idle=False, "
             f"got {state.stop_notify_skip_count}"
         )
+
+
+class TestMonitorLoop:
+    """Monitor loop scheduling: event wake-ups and which sessions it checks."""
+
+    @pytest.mark.asyncio
+    async def test_idle_monitor_does_not_poll_until_message_queued(self, message_queue):
+        message_queue.input_poll_interval = 0.01
+        calls = []
+        original = message_queue._get_sessions_with_pending
+
+        def counting_get_pending():
+            calls.append(1)
+            return original()
+
+        message_queue._get_sessions_with_pending = counting_get_pending
+        message_queue._running = True
+        message_queue._monitor_task = asyncio.create_task(message_queue._monitor_loop())
+        try:
+            await asyncio.sleep(0.1)
+            assert len(calls) == 1
+
+            with patch("asyncio.create_task", side_effect=noop_create_task):
+                message_queue.queue_message("target", "hello", trigger_delivery=False)
+            await asyncio.sleep(0.1)
+
+            # Woken by the enqueue, then polls on the interval while work is pending
+            assert len(calls) > 2
+        finally:
+            await message_queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_monitor_skips_stale_input_check_for_paused_sessions(self, message_queue):
+        message_queue._get_sessions_with_pending = MagicMock(return_value=["paused", "live"])
+        message_queue.pause_session("paused")
+        checked = []
+
+        async def fake_check(session_id, now=None):
+            checked.append(session_id)
+            message_queue._running = False
+
+        message_queue._check_stale_input = fake_check
+        message_queue._running = True
+
+        await message_queue._monitor_loop()
+
+        assert checked == ["live"]
+
+    @pytest.mark.asyncio
+    async def test_monitor_shares_one_clock_reading_per_tick(self, message_queue):
+        message_queue._get_sessions_with_pending = MagicMock(return_value=["a", "b"])
+        seen = []
+
+        async def fake_check(session_id, now=None):
+            seen.append(now)
+            if len(seen) == 2:
+                message_queue._running = False
+
+        message_queue._check_stale_input = fake_check
+        message_queue._running = True
+
+        with patch("src.message_queue.time") as mock_time:
+            mock_time.monotonic.return_value = 123.0
+            await message_queue._monitor_loop()
+
+        assert seen == [123.0, 123.0]
+
+    @pytest.mark.asyncio
+    async def test_monitor_checks_sessions_concurrently(self, message_queue):
+        message_queue._get_sessions_with_pending = MagicMock(return_value=["a", "b"])
+        both_started = asyncio.Event()
+        started = []
+
+        async def fake_check(session_id, now=None):
+            started.append(session_id)
+            if len(started) == 2:
+                both_started.set()
+            # Serial checks would deadlock here: "a" waits for "b" to start.
+            await asyncio.wait_for(both_started.wait(), 1)
+            message_queue._running = False
+
+        message_queue._check_stale_input = fake_check
+        message_queue._running = True
+
+        await message_queue._monitor_loop()
+
+        assert sorted(started) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_monitor_failure_in_one_session_does_not_skip_others(self, message_queue):
+        message_queue._get_sessions_with_pending = MagicMock(return_value=["bad", "good"])
+        message_queue.initial_retry_delay = 0
+        checked = []
+
+        async def fake_check(session_id, now=None):
+            if session_id == "bad":
+                raise RuntimeError("capture failed")
+            checked.append(session_id)
+            message_queue._running = False
+
+        message_queue._check_stale_input = fake_check
+        message_queue._running = True
+
+        with patch("src.message_queue.logger") as mock_logger:
+            await message_queue._monitor_loop()
+
+        assert checked == ["good"]
+        # The failure still reaches the loop's error handling
+        assert mock_logger.error.called
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_in_flight_session_checks(self, message_queue):
+        message_queue._get_sessions_with_pending = MagicMock(return_value=["slow"])
+        check_started = asyncio.Event()
+        cancelled = []
+
+        async def hanging_check(session_id, now=None):
+            check_started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(session_id)
+                raise
+
+        message_queue._check_stale_input = hanging_check
+        message_queue._running = True
+        message_queue._monitor_task = asyncio.create_task(message_queue._monitor_loop())
+        await asyncio.wait_for(check_started.wait(), 1)
+
+        await message_queue.stop()
+
+        assert cancelled == ["slow"]
+        assert message_queue._monitor_task is None
+
+    @pytest.mark.asyncio
+    async def test_stale_input_timer_uses_monotonic_reading(self, message_queue, mock_session_manager):
+        session = MagicMock(provider="claude", tmux_session="claude-stale")
+        mock_session_manager.get_session = MagicMock(return_value=session)
+        message_queue._get_pending_user_input_async = AsyncMock(return_value="> draft")
+        message_queue._clear_user_input_async = AsyncMock()
+        message_queue._try_deliver_messages = AsyncMock()
+
+        await message_queue._check_stale_input("stale", now=100.0)
+        await message_queue._check_stale_input("stale", now=100.0 + message_queue.input_stale_timeout - 1)
+        message_queue._try_deliver_messages.assert_not_awaited()
+
+        await message_queue._check_stale_input("stale", now=100.0 + message_queue.input_stale_timeout)
+        message_queue._try_deliver_messages.assert_awaited_once_with("stale")
+        assert message_queue.delivery_states["stale"].saved_user_input == "> draft"
+
+
+class TestCoalescedStateSave:
+    """Deliveries mark session state dirty; one debounced write covers a burst."""
+
+    @pytest.mark.asyncio
+    async def test_burst_of_deliveries_saves_state_once(self, message_queue, mock_session_manager):
+        message_queue._STATE_SAVE_DEBOUNCE_SECONDS = 0.01
+        sessions = {
+            sid: MagicMock(id=sid, provider="claude", tmux_session=f"claude-{sid}")
+            for sid in ("a", "b", "c")
+        }
+        mock_session_manager.get_session = MagicMock(side_effect=sessions.get)
+        message_queue._get_pending_user_input_async = AsyncMock(return_value=None)
+        with patch("asyncio.create_task", side_effect=noop_create_task):
+            for sid in sessions:
+                message_queue.queue_message(sid, f"hi {sid}", trigger_delivery=False)
+
+        for sid in sessions:
+            await message_queue._try_deliver_messages(sid)
+        mock_session_manager._save_state.assert_not_called()
+
+        await asyncio.sleep(0.05)
+        mock_session_manager._save_state.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_state_save(self, message_queue, mock_session_manager):
+        message_queue._mark_state_dirty()
+
+        await message_queue.stop()
+
+        mock_session_manager._save_state.assert_called_once()
+        assert message_queue._state_save_handle is None
@@ -1,5 +1,7 @@
 """Unit tests for models - ticket #62."""
 
+import dataclasses
+
 import pytest
 from datetime import datetime, timedelta
 from src.models import (
@@ -112,7 +114,8 @@ class TestSession:
         session = Session()
 
         assert session.id is not None
-        assert len(session.id) == 8  # UUID hex[:8]
+        assert len(session.id) == 8  # 4 random bytes, hex-encoded
+        int(session.id, 16)  # lowercase hex, safe in tmux session names
         assert session.name == f"claude-{session.id}"
         assert session.working_dir == ""
         assert session.tmux_session == f"claude-{session.id}"
@@ -168,6 +171,13 @@ class TestSession:
             restored = Session.from_dict(as_dict)
             assert restored.status == status
 
+    def test_session_status_is_a_str_enum(self):
+        """SessionStatus members compare as strings; to_dict still emits the plain value."""
+        assert SessionStatus.IDLE == "idle"
+        status = Session(status=SessionStatus.IDLE).to_dict()["status"]
+        assert type(status) is str and f"{status}" == "idle"
+        assert NotificationChannel.TELEGRAM == NotificationChannel.TELEGRAM.value
+
     def test_backward_compatibility_telegram_topic_id(self):
         """from_dict handles legacy telegram_topic_id field."""
         data = {
@@ -210,6 +220,67 @@ class TestSession:
             session = Session.from_dict(data)
             assert session.status == expected_status, f"Legacy status '{legacy_status}' should map to {expected_status}"
 
+    def test_to_dict_persists_exactly_the_init_fields(self):
+        """to_dict/from_dict are hand-written; every init field must be persisted."""
+        init_fields = {f.name for f in dataclasses.fields(Session) if f.init}
+
+        assert set(Session().to_dict()) == init_fields
+
+    def test_session_uses_slots(self):
+        """Session is slotted: no per-instance __dict__, unknown attributes rejected."""
+        session = Session()
+
+        assert not hasattr(session, "__dict__")
+        with pytest.raises(AttributeError):
+            session.not_a_field = True
+
+    def test_from_dict_fast_matches_from_dict(self):
+        """The state-load fast path restores the same session as from_dict."""
+        data = Session(
+            id="fast1234",
+            provider="codex",
+            working_dir="/tmp/workspace",
+            log_file="/tmp/logs/fast.log",
+            status=SessionStatus.IDLE,
+            touched_repos={"/tmp/workspace"},
+        ).to_dict()
+
+        fast = Session._from_dict_fast(data)
+
+        assert fast == Session.from_dict(data)
+        assert fast.name == "codex-fast1234"
+        assert fast._context_warning_sent is False
+        assert fast._is_compacting is False
+
+    def test_from_dict_fast_calls_runtime_default_factory(self, monkeypatch):
+        """Runtime fields declared with default_factory get a built value, not MISSING."""
+        runtime_field = dataclasses.field(default_factory=lambda: True, init=False)
+        runtime_field.name = "_is_compacting"
+        monkeypatch.setattr("src.models._SESSION_RUNTIME_FIELDS", (runtime_field,))
+
+        fast = Session._from_dict_fast(Session(id="fact1234").to_dict())
+
+        assert fast._is_compacting is True
+
+    def test_from_dict_requires_core_keys(self):
+        """Persisted sessions missing a required key are rejected, not defaulted."""
+        data = Session(id="req12345").to_dict()
+        del data["log_file"]
+
+        with pytest.raises(KeyError):
+            Session.from_dict(data)
+
+    def test_from_dict_fast_falls_back_when_derived_fields_missing(self):
+        """Records without name/tmux_session still get __post_init__ defaults."""
+        data = Session(id="legacy12", log_file="/tmp/x.log").to_dict()
+        data["name"] = ""
+        data["tmux_session"] = ""
+
+        session = Session._from_dict_fast(data)
+
+        assert session.name == "claude-legacy12"
+        assert session.tmux_session == "claude-legacy12"
+
 
 class TestSubagent:
     """Tests for Subagent dataclass."""
@@ -531,3 +602,41 @@ class TestSessionDeliveryState:
         assert state.saved_user_input is None
         assert state.pending_user_input is None
         assert state.pending_input_first_seen is None
+
+    def test_uses_slots(self):
+        """SessionDeliveryState is slotted: compact per-session records, typos rejected."""
+        state = SessionDeliveryState(session_id="session123")
+
+        assert not hasattr(state, "__dict__")
+        with pytest.raises(AttributeError):
+            state.stop_notify_skip = 1
+
+    def test_skip_fence_arm_and_consume(self):
+        """Arming adds slots and stamps the fence; consuming drains it and clears the stamp."""
+        state = SessionDeliveryState(session_id="session123")
+        state.arm_stop_notify_skip(2)
+
+        assert state.stop_notify_skip_count == 2
+        assert state.skip_count_armed_at is not None
+
+        assert state.consume_stop_notify_skip() is True
+        assert state.skip_count_armed_at is not None
+        assert state.consume_stop_notify_skip() is True
+        assert state.stop_notify_skip_count == 0
+        assert state.skip_count_armed_at is None
+
+    def test_skip_fence_consume_never_goes_negative(self):
+        """A late /clear Stop hook on a drained fence is not absorbed."""
+        state = SessionDeliveryState(session_id="session123")
+
+        assert state.consume_stop_notify_skip() is False
+        assert state.stop_notify_skip_count == 0
+
+    def test_skip_fence_reset(self):
+        """reset_stop_notify_skip drops every slot and the arm time."""
+        state = SessionDeliveryState(session_id="session123")
+        state.arm_stop_notify_skip(3)
+        state.reset_stop_notify_skip()
+
+        assert state.stop_notify_skip_count == 0
+        assert state.skip_count_armed_at is None
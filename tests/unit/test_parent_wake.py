@@ -1,51 +1,96 @@
 """Tests for parent wake-up registration + digest (sm#225-C)."""
 
 import asyncio
-import sqlite3
-import tempfile
+import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from src.cli.commands import cmd_dispatch
 from src.message_queue import MessageQueueManager
 from src.models import ParentWakeRegistration, QueuedMessage, Session, SessionStatus
+from tests.unit.test_dispatch import SAMPLE_CONFIG
+
+
+_NOOP_TASK = MagicMock(name="task")
 
 
 def noop_create_task(coro):
     """Silently close coroutine without running it."""
     coro.close()
-    return MagicMock()
+    return _NOOP_TASK
+
+
+@dataclass
+class _FakeTmux:
+    alive: bool = True
+
+    def session_exists(self, tmux_session):
+        return self.alive
+
+
+@dataclass
+class _FakeSessionManager:
+    """The slice of SessionManager that MessageQueueManager touches in these tests."""
+
+    session: Any = None  # what get_session() returns, whatever the id
+    sessions: dict[str, Any] = field(default_factory=dict)
+    tmux: _FakeTmux = field(default_factory=_FakeTmux)
+    _deliver_direct: AsyncMock = field(default_factory=lambda: AsyncMock(return_value=True))
+
+    def get_session(self, session_id):
+        return self.session
+
+    def _save_state(self):
+        return True
 
 
 @pytest.fixture
 def mock_session_manager():
-    """Mock SessionManager."""
-    mock = MagicMock()
-    mock.sessions = {}
-    mock.get_session = MagicMock(return_value=None)
-    mock.tmux = MagicMock()
-    mock._save_state = MagicMock()
-    mock._deliver_direct = AsyncMock(return_value=True)
-    return mock
+    """Fake SessionManager."""
+    return _FakeSessionManager()
+
+
+@pytest.fixture(scope="module")
+def db_dir(tmp_path_factory):
+    """One directory for the module's DB files; each test gets its own file name."""
+    return tmp_path_factory.mktemp("parent_wake")
 
 
 @pytest.fixture
-def temp_db_path(tmp_path):
-    return str(tmp_path / "test_parent_wake.db")
+def temp_db_path(db_dir):
+    return str(db_dir / f"test_parent_wake_{uuid.uuid4().hex}.db")
 
 
 @pytest.fixture
-def mq(mock_session_manager, temp_db_path):
+def mq(mock_session_manager):
+    # In-memory DB: tests that need a manager restart over the same file use temp_db_path.
     return MessageQueueManager(
         session_manager=mock_session_manager,
-        db_path=temp_db_path,
+        db_path=":memory:",
         config={},
         notifier=None,
     )
 
 
+@pytest.fixture
+def frozen_now(monkeypatch):
+    """Pin datetime.now() in src.message_queue to one instant and return it."""
+    frozen = datetime(2024, 6, 1, 12, 0, 0)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen if tz is None else frozen.replace(tzinfo=tz)
+
+    monkeypatch.setattr("src.message_queue.datetime", FrozenDatetime)
+    return frozen
+
+
 def _make_session(session_id: str, **kwargs) -> Session:
     s = Session(id=session_id, name=f"child-{session_id[:6]}", working_dir="/tmp")
     for k, v in kwargs.items():
@@ -53,89 +98,107 @@ def _make_session(session_id: str, **kwargs) -> Session:
     return s
 
 
+def _stub_session(session_id: str, **kwargs) -> SimpleNamespace:
+    """The session fields the parent-wake digest reads, without a full Session."""
+    fields = dict(
+        id=session_id,
+        name=f"child-{session_id[:6]}",
+        friendly_name=None,
+        agent_status_text=None,
+        agent_status_at=None,
+    )
+    fields.update(kwargs)
+    return SimpleNamespace(**fields)
+
+
+def _make_reg(child_session_id: str, **kwargs) -> ParentWakeRegistration:
+    """A fresh 10-minute parent-wake registration, registered 5 minutes ago unless overridden."""
+    fields = dict(
+        id=f"reg_{child_session_id}",
+        parent_session_id=f"parent_of_{child_session_id}",
+        period_seconds=600,
+        registered_at=datetime.now() - timedelta(minutes=5),
+        last_wake_at=None,
+        last_status_at_prev_wake=None,
+    )
+    fields.update(kwargs)
+    return ParentWakeRegistration(child_session_id=child_session_id, **fields)
+
+
 # ---------------------------------------------------------------------------
 # TestParentWakeRegistration — CRUD
 # ---------------------------------------------------------------------------
 
 class TestParentWakeRegistration:
 
-    def test_register_creates_in_memory_entry(self, mq):
-        with patch("asyncio.create_task", noop_create_task):
-            reg_id = mq.register_parent_wake("child1", "parent1")
+    @pytest.fixture(autouse=True)
+    def _no_background_tasks(self, monkeypatch):
+        monkeypatch.setattr(asyncio, "create_task", noop_create_task)
+
+    def test_register_creates_and_persists_entry(self, mq):
+        reg_id = mq.register_parent_wake("child1", "parent1")
 
-        assert "child1" in mq._parent_wake_registrations
+        assert reg_id is not None
         reg = mq._parent_wake_registrations["child1"]
         assert reg.child_session_id == "child1"
         assert reg.parent_session_id == "parent1"
         assert reg.period_seconds == 600
         assert reg.is_active is True
-        assert reg_id is not None
-
-    def test_register_persists_to_db(self, mq, temp_db_path):
-        with patch("asyncio.create_task", noop_create_task):
-            mq.register_parent_wake("child2", "parent2")
 
-        conn = sqlite3.connect(temp_db_path)
-        rows = conn.execute(
+        rows = mq._db_conn.execute(
             "SELECT child_session_id, parent_session_id, is_active FROM parent_wake_registrations"
         ).fetchall()
-        conn.close()
-        assert len(rows) == 1
-        assert rows[0][0] == "child2"
-        assert rows[0][1] == "parent2"
-        assert rows[0][2] == 1
+        assert rows == [("child1", "parent1", 1)]
+
+    def test_child_lookup_uses_unique_index(self, mq):
+        """Per-child updates probe the child_session_id UNIQUE index; no is_active index exists."""
+        plan = mq._execute_query(
+            "EXPLAIN QUERY PLAN UPDATE parent_wake_registrations SET is_active = 0 WHERE child_session_id = ?",
+            ("child1",),
+        )
+        indexes = mq._execute_query(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'parent_wake_registrations'"
+        )
+
+        assert any("(child_session_id=?)" in row[-1] for row in plan)
+        assert ("idx_parent_wake_active",) not in indexes
 
     def test_register_replaces_existing(self, mq):
-        with patch("asyncio.create_task", noop_create_task):
-            mq.register_parent_wake("child3", "parent_old")
-            mq.register_parent_wake("child3", "parent_new")
+        mq.register_parent_wake("child3", "parent_old")
+        mq.register_parent_wake("child3", "parent_new")
 
         reg = mq._parent_wake_registrations["child3"]
         assert reg.parent_session_id == "parent_new"
 
-    def test_cancel_removes_in_memory_entry(self, mq):
-        with patch("asyncio.create_task", noop_create_task):
-            mq.register_parent_wake("child4", "parent4")
-
-        mq.cancel_parent_wake("child4")
-        assert "child4" not in mq._parent_wake_registrations
-
-    def test_cancel_marks_inactive_in_db(self, mq, temp_db_path):
-        with patch("asyncio.create_task", noop_create_task):
-            mq.register_parent_wake("child5", "parent5")
+    def test_cancel_removes_entry_and_marks_inactive(self, mq):
+        mq.register_parent_wake("child5", "parent5")
 
         mq.cancel_parent_wake("child5")
 
-        conn = sqlite3.connect(temp_db_path)
-        rows = conn.execute(
+        assert "child5" not in mq._parent_wake_registrations
+        rows = mq._db_conn.execute(
             "SELECT is_active FROM parent_wake_registrations WHERE child_session_id = 'child5'"
         ).fetchall()
-        conn.close()
-        assert rows[0][0] == 0
+        assert rows == [(0,)]
 
     def test_cancel_noop_when_not_registered(self, mq):
         mq.cancel_parent_wake("nonexistent")  # Should not raise
 
-    def test_cancel_parent_wake_on_stop_hook(self, mq):
-        """mark_session_idle(from_stop_hook=True) cancels parent wake."""
-        with patch("asyncio.create_task", noop_create_task):
-            mq.register_parent_wake("child6", "parent6")
-            mq.mark_session_idle("child6", from_stop_hook=True)
-        assert "child6" not in mq._parent_wake_registrations
-
-    def test_stop_hook_false_does_not_cancel(self, mq):
-        """mark_session_idle(from_stop_hook=False) does NOT cancel parent wake."""
-        with patch("asyncio.create_task", noop_create_task):
-            mq.register_parent_wake("child7", "parent7")
-            mq.mark_session_idle("child7", from_stop_hook=False)
-        assert "child7" in mq._parent_wake_registrations
-
-    def test_completion_transition_cancels_parent_wake(self, mq):
-        """Provider-native turn completion cancels parent wake like a real stop."""
-        with patch("asyncio.create_task", noop_create_task):
-            mq.register_parent_wake("child7b", "parent7b")
-            mq.mark_session_idle("child7b", completion_transition=True)
-        assert "child7b" not in mq._parent_wake_registrations
+    @pytest.mark.parametrize(
+        "idle_kwargs, cancelled",
+        [
+            ({"from_stop_hook": True}, True),
+            ({"from_stop_hook": False}, False),
+            # Provider-native turn completion cancels parent wake like a real stop
+            ({"completion_transition": True}, True),
+        ],
+        ids=["stop_hook", "not_stop_hook", "completion_transition"],
+    )
+    def test_mark_session_idle_cancels_parent_wake(self, mq, idle_kwargs, cancelled):
+        """Only a real stop (Stop hook or completion transition) cancels parent wake."""
+        mq.register_parent_wake("child6", "parent6")
+        mq.mark_session_idle("child6", **idle_kwargs)
+        assert ("child6" not in mq._parent_wake_registrations) is cancelled
 
 
 # ---------------------------------------------------------------------------
@@ -144,39 +207,38 @@ class TestParentWakeRegistration:
 
 class TestQueueMessageParentSessionId:
 
-    def test_queue_message_stores_parent_session_id(self, mq, temp_db_path):
-        with patch("asyncio.create_task", noop_create_task):
-            msg = mq.queue_message(
-                target_session_id="target1",
-                text="hello",
-                remind_soft_threshold=210,
-                remind_hard_threshold=420,
-                parent_session_id="em1",
-            )
+    @pytest.fixture(autouse=True)
+    def _no_background_tasks(self, monkeypatch):
+        monkeypatch.setattr(asyncio, "create_task", noop_create_task)
+
+    def test_queue_message_stores_parent_session_id(self, mq):
+        msg = mq.queue_message(
+            target_session_id="target1",
+            text="hello",
+            remind_soft_threshold=210,
+            remind_hard_threshold=420,
+            parent_session_id="em1",
+        )
 
         assert msg.parent_session_id == "em1"
 
-        conn = sqlite3.connect(temp_db_path)
-        rows = conn.execute(
+        rows = mq._db_conn.execute(
             "SELECT parent_session_id FROM message_queue WHERE id = ?", (msg.id,)
         ).fetchall()
-        conn.close()
         assert rows[0][0] == "em1"
 
     def test_queue_message_parent_session_id_none_by_default(self, mq):
-        with patch("asyncio.create_task", noop_create_task):
-            msg = mq.queue_message(target_session_id="target2", text="hi")
+        msg = mq.queue_message(target_session_id="target2", text="hi")
 
         assert msg.parent_session_id is None
 
     def test_get_pending_messages_returns_parent_session_id(self, mq):
-        with patch("asyncio.create_task", noop_create_task):
-            mq.queue_message(
-                target_session_id="target3",
-                text="msg",
-                remind_soft_threshold=210,
-                parent_session_id="em3",
-            )
+        mq.queue_message(
+            target_session_id="target3",
+            text="msg",
+            remind_soft_threshold=210,
+            parent_session_id="em3",
+        )
 
         pending = mq.get_pending_messages("target3")
         assert len(pending) == 1
@@ -188,23 +250,16 @@ class TestQueueMessageParentSessionId:
 # ---------------------------------------------------------------------------
 
 class TestDeliveryTriggersParentWake:
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-    @pytest.mark.asyncio
+    @pytest.mark.parametrize("parent_session_id", ["em_a", None], ids=["with_parent", "without_parent"])
     async def test_sequential_delivery_registers_parent_wake(
-        self, mock_session_manager, temp_db_path
+        self, mq, mock_session_manager, parent_session_id
     ):
-        """After sequential delivery, register_parent_wake is called when parent_session_id set."""
+        """Sequential delivery registers a parent wake only when parent_session_id is set."""
         session = _make_session("child_a")
         session.status = SessionStatus.IDLE
-
-        mock_session_manager.get_session.return_value = session
-
-        mq = MessageQueueManager(
-            session_manager=mock_session_manager,
-            db_path=temp_db_path,
-            config={},
-            notifier=None,
-        )
+        mock_session_manager.session = session
 
         with patch("asyncio.create_task", noop_create_task):
             mq.queue_message(
@@ -212,46 +267,17 @@ class TestDeliveryTriggersParentWake:
                 text="dispatch msg",
                 remind_soft_threshold=210,
                 remind_hard_threshold=420,
-                parent_session_id="em_a",
+                parent_session_id=parent_session_id,
             )
-            state = mq._get_or_create_state("child_a")
-            state.is_idle = True
+            mq._get_or_create_state("child_a").is_idle = True
 
-        with patch("asyncio.create_task", noop_create_task):
             await mq._try_deliver_messages("child_a")
 
-        assert "child_a" in mq._parent_wake_registrations
-        assert mq._parent_wake_registrations["child_a"].parent_session_id == "em_a"
-
-    @pytest.mark.asyncio
-    async def test_sequential_delivery_no_parent_wake_without_flag(
-        self, mock_session_manager, temp_db_path
-    ):
-        """Delivery without parent_session_id does not register parent wake."""
-        session = _make_session("child_b")
-        session.status = SessionStatus.IDLE
-        mock_session_manager.get_session.return_value = session
-
-        mq = MessageQueueManager(
-            session_manager=mock_session_manager,
-            db_path=temp_db_path,
-            config={},
-            notifier=None,
-        )
-        with patch("asyncio.create_task", noop_create_task):
-            mq.queue_message(
-                target_session_id="child_b",
-                text="plain send",
-                remind_soft_threshold=210,
-                remind_hard_threshold=420,
-            )
-            state = mq._get_or_create_state("child_b")
-            state.is_idle = True
-
-        with patch("asyncio.create_task", noop_create_task):
-            await mq._try_deliver_messages("child_b")
-
-        assert "child_b" not in mq._parent_wake_registrations
+        reg = mq._parent_wake_registrations.get("child_a")
+        if parent_session_id is None:
+            assert reg is None
+        else:
+            assert reg.parent_session_id == parent_session_id
 
 
 # ---------------------------------------------------------------------------
@@ -259,8 +285,8 @@ class TestDeliveryTriggersParentWake:
 # ---------------------------------------------------------------------------
 
 class TestParentWakeRecovery:
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-    @pytest.mark.asyncio
     async def test_recovery_restores_active_registrations(
         self, mock_session_manager, temp_db_path
     ):
@@ -282,8 +308,8 @@ class TestParentWakeRecovery:
             notifier=None,
         )
         active_child = _make_session("child_r", provider="claude", tmux_session="claude-child_r")
-        mock_session_manager.get_session.return_value = active_child
-        mock_session_manager.tmux.session_exists.return_value = True
+        mock_session_manager.session = active_child
+        mock_session_manager.tmux.alive = True
         with patch("asyncio.create_task", noop_create_task):
             await mq2._recover_parent_wake_registrations()
 
@@ -292,7 +318,6 @@ class TestParentWakeRecovery:
         assert reg.parent_session_id == "parent_r"
         assert reg.period_seconds == 300
 
-    @pytest.mark.asyncio
     async def test_recovery_skips_inactive_registrations(
         self, mock_session_manager, temp_db_path
     ):
@@ -318,7 +343,6 @@ class TestParentWakeRecovery:
 
         assert "child_x" not in mq2._parent_wake_registrations
 
-    @pytest.mark.asyncio
     async def test_recovery_cancels_dead_child_registrations(
         self, mock_session_manager, temp_db_path
     ):
@@ -333,8 +357,8 @@ class TestParentWakeRecovery:
             mq1.register_parent_wake("child_dead", "parent_dead", period_seconds=300)
 
         dead_child = _make_session("child_dead", provider="claude", tmux_session="claude-child_dead")
-        mock_session_manager.get_session.return_value = dead_child
-        mock_session_manager.tmux.session_exists.return_value = False
+        mock_session_manager.session = dead_child
+        mock_session_manager.tmux.alive = False
 
         mq2 = MessageQueueManager(
             session_manager=mock_session_manager,
@@ -347,17 +371,15 @@ class TestParentWakeRecovery:
 
         assert "child_dead" not in mq2._parent_wake_registrations
 
-        conn = sqlite3.connect(temp_db_path)
-        rows = conn.execute(
+        rows = mq2._db_conn.execute(
             "SELECT is_active FROM parent_wake_registrations WHERE child_session_id = 'child_dead'"
         ).fetchall()
-        conn.close()
         assert rows[0][0] == 0
 
 
 class TestParentWakeDeadChildCancellation:
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-    @pytest.mark.asyncio
     async def test_parent_wake_task_cancels_missing_child_before_digest(self, mock_session_manager, temp_db_path):
         """A missing child session stops the periodic wake loop instead of emitting <unknown> digests."""
         mq = MessageQueueManager(
@@ -366,17 +388,9 @@ class TestParentWakeDeadChildCancellation:
             config={},
             notifier=None,
         )
-        reg = ParentWakeRegistration(
-            id="dead_reg",
-            child_session_id="child_missing",
-            parent_session_id="parent_dead",
-            period_seconds=1,
-            registered_at=datetime.now() - timedelta(minutes=5),
-            last_wake_at=None,
-            last_status_at_prev_wake=None,
-        )
+        reg = _make_reg("child_missing", period_seconds=1)
         mq._parent_wake_registrations["child_missing"] = reg
-        mock_session_manager.get_session.return_value = None
+        mock_session_manager.session = None
 
         queue_calls = []
 
@@ -390,11 +404,9 @@ class TestParentWakeDeadChildCancellation:
         assert queue_calls == []
         assert "child_missing" not in mq._parent_wake_registrations
 
-        conn = sqlite3.connect(temp_db_path)
-        rows = conn.execute(
+        rows = mq._db_conn.execute(
             "SELECT is_active FROM parent_wake_registrations WHERE child_session_id = 'child_missing'"
         ).fetchall()
-        conn.close()
         assert rows == []
 
 
@@ -403,131 +415,97 @@ class TestParentWakeDeadChildCancellation:
 # ---------------------------------------------------------------------------
 
 class TestParentWakeDigest:
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-    @pytest.mark.asyncio
-    async def test_digest_basic_structure(self, mq):
+    @pytest.fixture(autouse=True)
+    def _no_tool_events(self, mq):
+        # mq is per-test, so overriding the method on the instance needs no undo
+        mq._read_child_tail = lambda *a, **kw: []
+
+    async def test_digest_basic_structure(self, mq, frozen_now):
         """Digest contains expected header, duration, and status lines."""
-        reg = ParentWakeRegistration(
-            id="test_reg",
-            child_session_id="child_d",
-            parent_session_id="parent_d",
-            period_seconds=600,
-            registered_at=datetime.now() - timedelta(minutes=15),
-            last_wake_at=None,
-            last_status_at_prev_wake=None,
-        )
+        reg = _make_reg("child_d", registered_at=frozen_now - timedelta(minutes=15))
 
-        child_session = _make_session("child_d")
+        child_session = _stub_session("child_d")
         child_session.friendly_name = "engineer-42"
         child_session.agent_status_text = "fixing the bug"
-        child_session.agent_status_at = datetime.now() - timedelta(minutes=2)
-        mq.session_manager.get_session.return_value = child_session
+        child_session.agent_status_at = frozen_now - timedelta(minutes=2)
+        mq.session_manager.session = child_session
 
-        with patch.object(mq, "_read_child_tail", return_value=[]):
-            digest = await mq._assemble_parent_wake_digest("child_d", reg)
+        digest = await mq._assemble_parent_wake_digest("child_d", reg)
 
         assert "[sm dispatch] Child update:" in digest
         assert "engineer-42" in digest
         assert "15m running" in digest
         assert "fixing the bug" in digest
 
-    @pytest.mark.asyncio
-    async def test_digest_no_progress_flag(self, mq):
+    async def test_digest_no_progress_flag(self, mq, frozen_now):
         """Digest shows NO PROGRESS DETECTED when status_at unchanged since last wake."""
-        status_time = datetime.now() - timedelta(minutes=15)
-        reg = ParentWakeRegistration(
-            id="test_reg2",
-            child_session_id="child_np",
-            parent_session_id="parent_np",
-            period_seconds=600,
-            registered_at=datetime.now() - timedelta(minutes=25),
-            last_wake_at=datetime.now() - timedelta(minutes=10),
+        status_time = frozen_now - timedelta(minutes=15)
+        reg = _make_reg(
+            "child_np",
+            registered_at=frozen_now - timedelta(minutes=25),
+            last_wake_at=frozen_now - timedelta(minutes=10),
             last_status_at_prev_wake=status_time,
         )
 
-        child_session = _make_session("child_np")
+        child_session = _stub_session("child_np")
         child_session.agent_status_text = "investigating"
         child_session.agent_status_at = status_time  # unchanged
-        mq.session_manager.get_session.return_value = child_session
+        mq.session_manager.session = child_session
 
-        with patch.object(mq, "_read_child_tail", return_value=[]):
-            digest = await mq._assemble_parent_wake_digest("child_np", reg)
+        digest = await mq._assemble_parent_wake_digest("child_np", reg)
 
         assert "NO PROGRESS DETECTED" in digest
         assert "Warning:" in digest
 
-    @pytest.mark.asyncio
-    async def test_digest_no_progress_not_shown_first_wake(self, mq):
+    async def test_digest_no_progress_not_shown_first_wake(self, mq, frozen_now):
         """NO PROGRESS DETECTED is never shown on first wake (last_wake_at=None)."""
-        status_time = datetime.now() - timedelta(minutes=5)
-        reg = ParentWakeRegistration(
-            id="test_reg3",
-            child_session_id="child_fw",
-            parent_session_id="parent_fw",
-            period_seconds=600,
-            registered_at=datetime.now() - timedelta(minutes=10),
-            last_wake_at=None,  # First wake
+        status_time = frozen_now - timedelta(minutes=5)
+        reg = _make_reg(
+            "child_fw",
+            registered_at=frozen_now - timedelta(minutes=10),
             last_status_at_prev_wake=status_time,
         )
 
-        child_session = _make_session("child_fw")
+        child_session = _stub_session("child_fw")
         child_session.agent_status_text = "working"
         child_session.agent_status_at = status_time
-        mq.session_manager.get_session.return_value = child_session
+        mq.session_manager.session = child_session
 
-        with patch.object(mq, "_read_child_tail", return_value=[]):
-            digest = await mq._assemble_parent_wake_digest("child_fw", reg)
+        digest = await mq._assemble_parent_wake_digest("child_fw", reg)
 
         assert "NO PROGRESS DETECTED" not in digest
 
-    @pytest.mark.asyncio
-    async def test_digest_includes_tool_events(self, mq):
-        """Digest includes recent tool activity when available."""
-        reg = ParentWakeRegistration(
-            id="test_reg4",
-            child_session_id="child_t",
-            parent_session_id="parent_t",
-            period_seconds=600,
-            registered_at=datetime.now() - timedelta(minutes=5),
-            last_wake_at=None,
-            last_status_at_prev_wake=None,
-        )
+    async def test_digest_includes_tool_events(self, mq, frozen_now):
+        """Digest includes recent tool activity, aged against UTC now."""
+        reg = _make_reg("child_t", registered_at=frozen_now - timedelta(minutes=5))
 
-        child_session = _make_session("child_t")
-        mq.session_manager.get_session.return_value = child_session
+        child_session = _stub_session("child_t")
+        mq.session_manager.session = child_session
 
         tool_events = [
-            {"tool_name": "Read", "target_file": "src/foo.py", "bash_command": None, "timestamp": datetime.now().isoformat()},
-            {"tool_name": "Bash", "target_file": None, "bash_command": "pytest tests/", "timestamp": datetime.now().isoformat()},
+            {"tool_name": "Read", "target_file": "src/foo.py", "bash_command": None,
+             "timestamp": (frozen_now - timedelta(minutes=3)).isoformat()},
+            {"tool_name": "Bash", "target_file": None, "bash_command": "pytest tests/",
+             "timestamp": (frozen_now - timedelta(minutes=1)).isoformat()},
         ]
-        with patch.object(mq, "_read_child_tail", return_value=tool_events):
-            digest = await mq._assemble_parent_wake_digest("child_t", reg)
+        mq._read_child_tail = lambda *a, **kw: tool_events
+        digest = await mq._assemble_parent_wake_digest("child_t", reg)
 
         assert "Recent activity:" in digest
-        assert "Read" in digest
-        assert "src/foo.py" in digest
-        assert "Bash" in digest
+        assert "Read: src/foo.py (3m ago)" in digest
+        assert "Bash: pytest tests/ (1m ago)" in digest
 
-    @pytest.mark.asyncio
     async def test_digest_unknown_child(self, mq):
         """Digest works gracefully when child session is not found."""
-        reg = ParentWakeRegistration(
-            id="test_reg5",
-            child_session_id="child_gone",
-            parent_session_id="parent_gone",
-            period_seconds=600,
-            registered_at=datetime.now() - timedelta(minutes=5),
-            last_wake_at=None,
-            last_status_at_prev_wake=None,
-        )
-        mq.session_manager.get_session.return_value = None
+        reg = _make_reg("child_gone")
+        mq.session_manager.session = None
 
-        with patch.object(mq, "_read_child_tail", return_value=[]):
-            digest = await mq._assemble_parent_wake_digest("child_gone", reg)
+        digest = await mq._assemble_parent_wake_digest("child_gone", reg)
 
         assert "[sm dispatch] Child update:" in digest
 
-    @pytest.mark.asyncio
     async def test_digest_tool_timestamps_use_utc(self, mq):
         """Recent activity ages must be positive regardless of host timezone.
 
@@ -559,30 +537,19 @@ class TestParentWakeDigest:
             def fromisoformat(cls, s):
                 return datetime.fromisoformat(s)  # delegate to real datetime
 
-        reg = ParentWakeRegistration(
-            id="r1",
-            child_session_id="child_tz",
-            parent_session_id="parent_tz",
-            period_seconds=600,
-            registered_at=UTC_8_NOW - timedelta(minutes=5),
-            last_wake_at=None,
-            last_status_at_prev_wake=None,
-        )
+        reg = _make_reg("child_tz", registered_at=UTC_8_NOW - timedelta(minutes=5))
         mq._parent_wake_registrations["child_tz"] = reg
 
-        child_session = MagicMock()
-        child_session.friendly_name = "tz-test"
-        child_session.agent_status_text = None
-        child_session.agent_status_at = None
-        mq.session_manager.get_session.return_value = child_session
+        child_session = _stub_session("child_tz", friendly_name="tz-test")
+        mq.session_manager.session = child_session
 
         tool_events = [
             {"tool_name": "Bash", "target_file": None,
              "bash_command": "pytest tests/", "timestamp": TOOL_TS},
         ]
 
-        with patch("src.message_queue.datetime", _FakeDatetime), \
-             patch.object(mq, "_read_child_tail", return_value=tool_events):
+        mq._read_child_tail = lambda *a, **kw: tool_events
+        with patch("src.message_queue.datetime", _FakeDatetime):
             digest = await mq._assemble_parent_wake_digest("child_tz", reg)
 
         # Old code: datetime.now() → UTC_8_NOW = UTC - 8h → age = -478m  (FAIL)
@@ -602,15 +569,15 @@ class TestParentWakeDigest:
 # ---------------------------------------------------------------------------
 
 class TestParentWakeEscalation:
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-    @pytest.mark.asyncio
-    async def test_escalation_on_no_progress(self, mock_session_manager, temp_db_path):
+    async def test_escalation_on_no_progress(self, mock_session_manager, temp_db_path, frozen_now):
         """Period switches to 300s when child hasn't updated status since last wake."""
-        status_time = datetime.now() - timedelta(minutes=12)
+        status_time = frozen_now - timedelta(minutes=12)
 
-        child_session = _make_session("child_esc")
+        child_session = _stub_session("child_esc")
         child_session.agent_status_at = status_time
-        mock_session_manager.get_session.return_value = child_session
+        mock_session_manager.session = child_session
 
         mq = MessageQueueManager(
             session_manager=mock_session_manager,
@@ -620,13 +587,10 @@ class TestParentWakeEscalation:
         )
 
         # Simulate a registration with previous wake where status didn't change
-        reg = ParentWakeRegistration(
-            id="esc_reg",
-            child_session_id="child_esc",
-            parent_session_id="parent_esc",
-            period_seconds=600,
-            registered_at=datetime.now() - timedelta(minutes=20),
-            last_wake_at=datetime.now() - timedelta(minutes=10),
+        reg = _make_reg(
+            "child_esc",
+            registered_at=frozen_now - timedelta(minutes=20),
+            last_wake_at=frozen_now - timedelta(minutes=10),
             last_status_at_prev_wake=status_time,  # same as current
         )
         mq._parent_wake_registrations["child_esc"] = reg
@@ -646,15 +610,14 @@ class TestParentWakeEscalation:
         assert reg.escalated is True
         assert reg.period_seconds == 300
 
-    @pytest.mark.asyncio
-    async def test_no_escalation_when_status_changes(self, mock_session_manager, temp_db_path):
+    async def test_no_escalation_when_status_changes(self, mock_session_manager, temp_db_path, frozen_now):
         """No escalation when child has updated status since last wake."""
-        prev_status_time = datetime.now() - timedelta(minutes=8)
-        new_status_time = datetime.now() - timedelta(minutes=2)
+        prev_status_time = frozen_now - timedelta(minutes=8)
+        new_status_time = frozen_now - timedelta(minutes=2)
 
-        child_session = _make_session("child_ok")
+        child_session = _stub_session("child_ok")
         child_session.agent_status_at = new_status_time  # different from prev_wake
-        mock_session_manager.get_session.return_value = child_session
+        mock_session_manager.session = child_session
 
         mq = MessageQueueManager(
             session_manager=mock_session_manager,
@@ -662,13 +625,10 @@ class TestParentWakeEscalation:
             config={},
             notifier=None,
         )
-        reg = ParentWakeRegistration(
-            id="ok_reg",
-            child_session_id="child_ok",
-            parent_session_id="parent_ok",
-            period_seconds=600,
-            registered_at=datetime.now() - timedelta(minutes=15),
-            last_wake_at=datetime.now() - timedelta(minutes=10),
+        reg = _make_reg(
+            "child_ok",
+            registered_at=frozen_now - timedelta(minutes=15),
+            last_wake_at=frozen_now - timedelta(minutes=10),
             last_status_at_prev_wake=prev_status_time,
         )
         mq._parent_wake_registrations["child_ok"] = reg
@@ -691,6 +651,13 @@ class TestParentWakeEscalation:
 class TestCmdDispatchPassesParentSessionId:
     """cmd_dispatch passes em_id as parent_session_id to cmd_send."""
 
+    @pytest.fixture(autouse=True)
+    def _dispatch_env(self, monkeypatch):
+        monkeypatch.setattr("src.cli.dispatch.load_template", lambda *a, **kw: SAMPLE_CONFIG)
+        monkeypatch.setattr("src.cli.dispatch.get_auto_remind_config", lambda *a, **kw: (210, 420))
+        monkeypatch.setattr("src.cli.commands.cmd_clear", lambda *a, **kw: 0)
+        monkeypatch.setattr("os.getcwd", lambda: "/tmp")
+
     def _make_client(self, **kwargs):
         mock_client = MagicMock()
         mock_client.send_input.return_value = (True, False)
@@ -700,45 +667,33 @@ class TestCmdDispatchPassesParentSessionId:
 
     def test_dispatch_passes_em_id_as_parent_session_id(self):
         """cmd_dispatch forwards em_id to client.send_input as parent_session_id."""
-        from src.cli.commands import cmd_dispatch
-        from tests.unit.test_dispatch import SAMPLE_CONFIG
-
         mock_client = self._make_client()
 
-        with patch("src.cli.dispatch.load_template", return_value=SAMPLE_CONFIG), \
-             patch("src.cli.dispatch.get_auto_remind_config", return_value=(210, 420)), \
-             patch("src.cli.commands.cmd_clear", return_value=0), \
-             patch("os.getcwd", return_value="/tmp"):
-            cmd_dispatch(
-                mock_client,
-                "child_sess",
-                "engineer",
-                {"issue": "123", "spec": "docs/123.md"},
-                em_id="em_parent_id",
-            )
+        cmd_dispatch(
+            mock_client,
+            "child_sess",
+            "engineer",
+            {"issue": "123", "spec": "docs/123.md"},
+            em_id="em_parent_id",
+        )
 
-        call_kwargs = mock_client.send_input.call_args[1]
+        call_args, call_kwargs = mock_client.send_input.call_args
+        assert call_args[0] == "child_sess"
         assert call_kwargs["parent_session_id"] == "em_parent_id"
 
     def test_dispatch_no_parent_wake_without_em_id(self):
         """cmd_dispatch with em_id=None passes parent_session_id=None."""
-        from src.cli.commands import cmd_dispatch
-        from tests.unit.test_dispatch import SAMPLE_CONFIG
-
         mock_client = self._make_client()
 
-        with patch("src.cli.dispatch.load_template", return_value=SAMPLE_CONFIG), \
-             patch("src.cli.dispatch.get_auto_remind_config", return_value=(210, 420)), \
-             patch("os.getcwd", return_value="/tmp"):
-            # dry_run to avoid the em_id check failing
-            cmd_dispatch(
-                mock_client,
-                "child_sess",
-                "engineer",
-                {"issue": "1", "spec": "s.md"},
-                em_id=None,
-                dry_run=True,
-            )
+        # dry_run to avoid the em_id check failing
+        cmd_dispatch(
+            mock_client,
+            "child_sess",
+            "engineer",
+            {"issue": "1", "spec": "s.md"},
+            em_id=None,
+            dry_run=True,
+        )
 
         # dry_run exits before send, so send_input should not be called
         mock_client.send_input.assert_not_called()
@@ -11,12 +11,12 @@ Tests cover:
 8. context_reset belt-and-suspenders for registered sessions
 """
 
+import asyncio
 import pytest
-import sqlite3
-import tempfile
+import uuid
 from datetime import datetime
-from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 from fastapi.testclient import TestClient
 
@@ -36,31 +36,37 @@ def noop_create_task(coro):
     return MagicMock()
 
 
-@pytest.fixture
-def temp_db_path(tmp_path):
-    return str(tmp_path / "test_mq_241.db")
-
-
 @pytest.fixture
 def mock_session_manager_mq():
-    mock = MagicMock()
-    mock.sessions = {}
-    mock.get_session = MagicMock(return_value=None)
-    mock.tmux = MagicMock()
-    mock._save_state = MagicMock()
-    return mock
+    return SimpleNamespace(
+        sessions={},
+        get_session=lambda session_id: None,
+        tmux=SimpleNamespace(),
+        _save_state=lambda: None,
+    )
 
 
 @pytest.fixture
-def message_queue(mock_session_manager_mq, temp_db_path):
+def message_queue(mock_session_manager_mq, monkeypatch):
+    # queue_message schedules background delivery; keep it from running
+    monkeypatch.setattr(asyncio, "create_task", noop_create_task)
     return MessageQueueManager(
         session_manager=mock_session_manager_mq,
-        db_path=temp_db_path,
+        db_path=":memory:",
         config={},
         notifier=None,
     )
 
 
+def _undelivered(mq, sender_session_id: str) -> int:
+    """Count undelivered messages from a sender."""
+    rows = mq._execute_query(
+        "SELECT COUNT(*) FROM message_queue WHERE sender_session_id = ? AND delivered_at IS NULL",
+        (sender_session_id,),
+    )
+    return rows[0][0]
+
+
 def _make_session(session_id: str = "abc12345", enabled: bool = True) -> Session:
     s = Session(
         id=session_id,
@@ -85,12 +91,26 @@ class TestCancelContextMonitorMessagesFrom:
     """Direct unit tests for the new cancel method."""
 
     def _queue_msg(self, mq, sender, category=None, target="em-session"):
-        with patch("asyncio.create_task", noop_create_task):
-            return mq.queue_message(
-                target_session_id=target,
-                text="test message",
-                sender_session_id=sender,
-                message_category=category,
+        return mq.queue_message(
+            target_session_id=target,
+            text="test message",
+            sender_session_id=sender,
+            message_category=category,
+        )
+
+    def _bulk_queue(self, mq, sender, categories, target="em-session"):
+        """Insert one undelivered row per category in a single transaction, bypassing queue_message."""
+        now = datetime.now().isoformat()
+        rows = [
+            (uuid.uuid4().hex, target, sender, "test message", now, category)
+            for category in categories
+        ]
+        with mq._db_lock, mq._db_conn:
+            mq._db_conn.executemany(
+                "INSERT INTO message_queue "
+                "(id, target_session_id, sender_session_id, text, queued_at, message_category) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
             )
 
     def test_cancels_context_monitor_messages_from_sender(self, message_queue):
@@ -100,10 +120,7 @@ class TestCancelContextMonitorMessagesFrom:
         assert count == 1
 
         # Verify actually deleted from DB
-        rows = message_queue._execute_query(
-            "SELECT COUNT(*) FROM message_queue WHERE sender_session_id = 'agent-A' AND delivered_at IS NULL"
-        )
-        assert rows[0][0] == 0
+        assert _undelivered(message_queue, "agent-A") == 0
 
     def test_preserves_sm_send_from_same_sender(self, message_queue):
         """sm send messages (category=NULL) from sender are NOT cancelled."""
@@ -111,25 +128,16 @@ class TestCancelContextMonitorMessagesFrom:
         count = message_queue.cancel_context_monitor_messages_from("agent-A")
         assert count == 0
 
-        rows = message_queue._execute_query(
-            "SELECT COUNT(*) FROM message_queue WHERE sender_session_id = 'agent-A' AND delivered_at IS NULL"
-        )
-        assert rows[0][0] == 1
+        assert _undelivered(message_queue, "agent-A") == 1
 
     def test_returns_correct_count_mixed(self, message_queue):
         """3 context_monitor + 2 sm send from agent-A → cancel returns 3, 2 remain."""
-        for _ in range(3):
-            self._queue_msg(message_queue, sender="agent-A", category="context_monitor")
-        for _ in range(2):
-            self._queue_msg(message_queue, sender="agent-A", category=None)
+        self._bulk_queue(message_queue, "agent-A", ["context_monitor"] * 3 + [None] * 2)
 
         count = message_queue.cancel_context_monitor_messages_from("agent-A")
         assert count == 3
 
-        remaining = message_queue._execute_query(
-            "SELECT COUNT(*) FROM message_queue WHERE sender_session_id = 'agent-A' AND delivered_at IS NULL"
-        )
-        assert remaining[0][0] == 2
+        assert _undelivered(message_queue, "agent-A") == 2
 
     def test_other_sender_messages_unaffected(self, message_queue):
         """Cancelling agent-A does not touch agent-B's context-monitor messages."""
@@ -137,10 +145,17 @@ class TestCancelContextMonitorMessagesFrom:
         count = message_queue.cancel_context_monitor_messages_from("agent-A")
         assert count == 0
 
-        rows = message_queue._execute_query(
-            "SELECT COUNT(*) FROM message_queue WHERE sender_session_id = 'agent-B' AND delivered_at IS NULL"
+        assert _undelivered(message_queue, "agent-B") == 1
+
+    def test_cancel_query_uses_sender_partial_index(self, message_queue):
+        """The cancel DELETE probes idx_pending_sender, not the full table."""
+        plan = message_queue._execute_query(
+            "EXPLAIN QUERY PLAN DELETE FROM message_queue "
+            "WHERE sender_session_id = ? AND message_category = 'context_monitor' AND delivered_at IS NULL",
+            ("agent-A",),
         )
-        assert rows[0][0] == 1
+
+        assert any("idx_pending_sender" in row[-1] for row in plan)
 
     def test_no_messages_returns_zero(self, message_queue):
         """Nothing queued → returns 0 without error."""
@@ -168,13 +183,12 @@ class TestMessageCategorySchema:
     """message_category is stored in and retrievable from the database."""
 
     def test_message_category_persisted(self, message_queue):
-        with patch("asyncio.create_task", noop_create_task):
-            msg = message_queue.queue_message(
-                target_session_id="em-session",
-                text="compaction notice",
-                sender_session_id="agent-A",
-                message_category="context_monitor",
-            )
+        msg = message_queue.queue_message(
+            target_session_id="em-session",
+            text="compaction notice",
+            sender_session_id="agent-A",
+            message_category="context_monitor",
+        )
 
         rows = message_queue._execute_query(
             "SELECT message_category FROM message_queue WHERE id = ?", (msg.id,)
@@ -182,12 +196,11 @@ class TestMessageCategorySchema:
         assert rows[0][0] == "context_monitor"
 
     def test_message_category_null_by_default(self, message_queue):
-        with patch("asyncio.create_task", noop_create_task):
-            msg = message_queue.queue_message(
-                target_session_id="em-session",
-                text="regular sm send",
-                sender_session_id="agent-A",
-            )
+        msg = message_queue.queue_message(
+            target_session_id="em-session",
+            text="regular sm send",
+            sender_session_id="agent-A",
+        )
 
         rows = message_queue._execute_query(
             "SELECT message_category FROM message_queue WHERE id = ?", (msg.id,)
@@ -195,12 +208,11 @@ class TestMessageCategorySchema:
         assert rows[0][0] is None
 
     def test_queued_message_dataclass_has_category(self, message_queue):
-        with patch("asyncio.create_task", noop_create_task):
-            msg = message_queue.queue_message(
-                target_session_id="em-session",
-                text="test",
-                message_category="context_monitor",
-            )
+        msg = message_queue.queue_message(
+            target_session_id="em-session",
+            text="test",
+            message_category="context_monitor",
+        )
         assert msg.message_category == "context_monitor"
 
 
@@ -210,12 +222,29 @@ class TestMessageCategorySchema:
 
 
 def _make_mock_sm(session):
-    mock = MagicMock()
-    mock.sessions = {session.id: session}
-    mock.get_session = MagicMock(return_value=session)
-    mock._save_state = MagicMock()
-    mock.message_queue_manager = MagicMock()
-    return mock
+    """Session manager stand-in; only message_queue_manager is a mock, since tests assert on it."""
+    sessions = {session.id: session}
+    return SimpleNamespace(
+        sessions=sessions,
+        get_session=sessions.get,
+        _save_state=lambda: None,
+        message_queue_manager=MagicMock(),
+    )
+
+
+@pytest.fixture(scope="module")
+def app():
+    """One app for the module; endpoints read the session manager from app.state."""
+    return create_app()
+
+
+@pytest.fixture
+def make_client(app):
+    """Point the shared app at a test's session manager and return a client."""
+    def _make_client(session_manager):
+        app.state.session_manager = session_manager
+        return TestClient(app)
+    return _make_client
 
 
 def _post_event(client, session_id, event, **extra):
@@ -231,37 +260,22 @@ def _post_context(client, session_id, used_pct, **extra):
 class TestQueueMessageTagging:
     """queue_message calls in context monitor handler pass category + sender."""
 
-    def test_compaction_queue_call_tagged(self):
-        session = _make_session("agent-1")
-        session.context_monitor_notify = "em-session"
-        mock_sm = _make_mock_sm(session)
-        client = TestClient(create_app(session_manager=mock_sm))
-
-        _post_event(client, session.id, event="compaction", trigger="auto")
-
-        call_kwargs = mock_sm.message_queue_manager.queue_message.call_args[1]
-        assert call_kwargs.get("message_category") == "context_monitor"
-        assert call_kwargs.get("sender_session_id") == session.id
-
-    def test_warning_queue_call_tagged(self):
-        session = _make_session("agent-1")
-        session.context_monitor_notify = "em-session"
-        mock_sm = _make_mock_sm(session)
-        client = TestClient(create_app(session_manager=mock_sm))
-
-        _post_context(client, session.id, used_pct=55)
-
-        call_kwargs = mock_sm.message_queue_manager.queue_message.call_args[1]
-        assert call_kwargs.get("message_category") == "context_monitor"
-        assert call_kwargs.get("sender_session_id") == session.id
-
-    def test_critical_queue_call_tagged(self):
+    @pytest.mark.parametrize(
+        "post, payload",
+        [
+            (_post_event, {"event": "compaction", "trigger": "auto"}),
+            (_post_context, {"used_pct": 55}),
+            (_post_context, {"used_pct": 65}),
+        ],
+        ids=["compaction", "warning", "critical"],
+    )
+    def test_queue_call_tagged(self, make_client, post, payload):
         session = _make_session("agent-1")
         session.context_monitor_notify = "em-session"
         mock_sm = _make_mock_sm(session)
-        client = TestClient(create_app(session_manager=mock_sm))
+        client = make_client(mock_sm)
 
-        _post_context(client, session.id, used_pct=65)
+        post(client, session.id, **payload)
 
         call_kwargs = mock_sm.message_queue_manager.queue_message.call_args[1]
         assert call_kwargs.get("message_category") == "context_monitor"
@@ -276,64 +290,30 @@ class TestQueueMessageTagging:
 class TestContextResetCancellation:
     """context_reset event triggers cancel_context_monitor_messages_from."""
 
-    def test_context_reset_calls_cancel(self):
-        """context_reset event calls cancel_context_monitor_messages_from on queue_mgr."""
-        session = _make_session("agent-1")
-        mock_sm = _make_mock_sm(session)
-        client = TestClient(create_app(session_manager=mock_sm))
-
-        _post_event(client, session.id, event="context_reset")
-
-        mock_sm.message_queue_manager.cancel_context_monitor_messages_from.assert_called_once_with(
-            session.id
-        )
-
-    def test_context_reset_unregistered_session_calls_cancel(self):
-        """Unregistered session context_reset also cancels and returns flags_reset (not not_registered)."""
-        session = _make_session("agent-1", enabled=False)
-        mock_sm = _make_mock_sm(session)
-        client = TestClient(create_app(session_manager=mock_sm))
-
-        resp = _post_event(client, session.id, event="context_reset")
-
-        assert resp.status_code == 200
-        assert resp.json()["status"] == "flags_reset"
-        mock_sm.message_queue_manager.cancel_context_monitor_messages_from.assert_called_once_with(
-            session.id
-        )
-
-    def test_context_reset_returns_flags_reset_not_not_registered(self):
-        """Unregistered session context_reset returns flags_reset, not not_registered."""
-        session = _make_session("agent-1", enabled=False)
-        mock_sm = _make_mock_sm(session)
-        client = TestClient(create_app(session_manager=mock_sm))
-
-        resp = _post_event(client, session.id, event="context_reset")
-        assert resp.json()["status"] == "flags_reset"
+    @pytest.mark.parametrize(
+        "enabled, has_queue_mgr",
+        [(True, True), (False, True), (True, False), (False, False)],
+        ids=["registered", "unregistered", "registered_no_queue_mgr", "unregistered_no_queue_mgr"],
+    )
+    def test_context_reset_cancels_and_returns_flags_reset(self, make_client, enabled, has_queue_mgr):
+        """context_reset cancels queued alerts for registered and unregistered sessions alike.
 
-    def test_context_reset_registered_session_also_cancels(self):
-        """Registered session context_reset also cancels."""
-        session = _make_session("agent-1", enabled=True)
+        The response is flags_reset (never not_registered), and a missing
+        queue_mgr does not crash the handler.
+        """
+        session = _make_session("agent-1", enabled=enabled)
         mock_sm = _make_mock_sm(session)
-        client = TestClient(create_app(session_manager=mock_sm))
+        queue_mgr = mock_sm.message_queue_manager
+        if not has_queue_mgr:
+            mock_sm.message_queue_manager = None
+        client = make_client(mock_sm)
 
         resp = _post_event(client, session.id, event="context_reset")
 
-        assert resp.json()["status"] == "flags_reset"
-        mock_sm.message_queue_manager.cancel_context_monitor_messages_from.assert_called_once_with(
-            session.id
-        )
-
-    def test_context_reset_no_queue_mgr_no_crash(self):
-        """context_reset without queue_mgr does not crash."""
-        session = _make_session("agent-1")
-        mock_sm = _make_mock_sm(session)
-        mock_sm.message_queue_manager = None
-        client = TestClient(create_app(session_manager=mock_sm))
-
-        resp = _post_event(client, session.id, event="context_reset")
         assert resp.status_code == 200
         assert resp.json()["status"] == "flags_reset"
+        if has_queue_mgr:
+            queue_mgr.cancel_context_monitor_messages_from.assert_called_once_with(session.id)
 
 
 # ---------------------------------------------------------------------------
@@ -344,11 +324,11 @@ class TestContextResetCancellation:
 class TestInvalidateSessionCacheCancel:
     """_invalidate_session_cache calls cancel_context_monitor_messages_from."""
 
-    def test_invalidate_cache_endpoint_calls_cancel(self):
+    def test_invalidate_cache_endpoint_calls_cancel(self, make_client):
         """POST /sessions/{id}/invalidate-cache triggers cancel_context_monitor_messages_from."""
         session = _make_session("agent-1")
         mock_sm = _make_mock_sm(session)
-        client = TestClient(create_app(session_manager=mock_sm))
+        client = make_client(mock_sm)
 
         resp = client.post(f"/sessions/{session.id}/invalidate-cache")
         assert resp.status_code == 200
@@ -369,27 +349,22 @@ class TestLegitimateCompactionAfterClear:
     def test_cancel_does_not_affect_messages_queued_after_cancel(self, message_queue):
         """Messages queued AFTER cancel() are not retroactively deleted."""
         # Step 1: queue a compaction message, then cancel it
-        with patch("asyncio.create_task", noop_create_task):
-            message_queue.queue_message(
-                target_session_id="em-session",
-                text="old compaction",
-                sender_session_id="agent-A",
-                message_category="context_monitor",
-            )
+        message_queue.queue_message(
+            target_session_id="em-session",
+            text="old compaction",
+            sender_session_id="agent-A",
+            message_category="context_monitor",
+        )
         cancelled = message_queue.cancel_context_monitor_messages_from("agent-A")
         assert cancelled == 1
 
         # Step 2: new compaction fires AFTER the clear
-        with patch("asyncio.create_task", noop_create_task):
-            message_queue.queue_message(
-                target_session_id="em-session",
-                text="new compaction",
-                sender_session_id="agent-A",
-                message_category="context_monitor",
-            )
+        message_queue.queue_message(
+            target_session_id="em-session",
+            text="new compaction",
+            sender_session_id="agent-A",
+            message_category="context_monitor",
+        )
 
         # The new message should still be in the queue
-        rows = message_queue._execute_query(
-            "SELECT COUNT(*) FROM message_queue WHERE sender_session_id = 'agent-A' AND delivered_at IS NULL"
-        )
-        assert rows[0][0] == 1
+        assert _undelivered(message_queue, "agent-A") == 1